@@ -0,0 +1,102 @@
+"""
+BENCHMARK - CHARGEMENT DES CLASSEURS EXCEL (.xlsx)
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Écrit les mêmes transactions en CSV et en .xlsx, puis compare
+              le chargement typé du CSV, la lecture en flux du classeur par
+              excel_input et, en option, la lecture ligne à ligne d'openpyxl
+              en lecture seule suivie d'un DataFrame (méthode manuelle). Chaque
+              mesure tourne dans son propre sous-processus : durée, mémoire
+              du DataFrame et pic RSS.
+
+Usage :
+    python bench_excel_ingestion.py --rows 200000 1000000
+    python bench_excel_ingestion.py --rows 200000 --openpyxl
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+
+def generer_fichiers(repertoire, nb_lignes, nb_clients):
+    """Écrit transactions.csv et transactions.xlsx (openpyxl en écriture seule)."""
+    import openpyxl
+    from bench_ingestion import generer_fichier
+    import pandas as pd
+
+    chemin_csv = os.path.join(repertoire, 'transactions.csv')
+    generer_fichier(chemin_csv, nb_lignes, nb_clients)
+    transactions = pd.read_csv(chemin_csv, sep=';')
+
+    classeur = openpyxl.Workbook(write_only=True)
+    feuille = classeur.create_sheet()
+    feuille.append(list(transactions.columns))
+    for ligne in transactions.itertuples(index=False):
+        feuille.append(list(ligne))
+    classeur.save(os.path.join(repertoire, 'transactions.xlsx'))
+
+
+def mesurer(repertoire, methode):
+    """Charge le fichier selon la méthode et imprime les mesures en JSON (sous-processus)."""
+    import pandas as pd
+    sys.path.insert(0, SRC_DIR)
+    from data_processor import DataProcessor
+
+    debut = time.perf_counter()
+    if methode == 'openpyxl':
+        import openpyxl
+        classeur = openpyxl.load_workbook(os.path.join(repertoire, 'transactions.xlsx'), read_only=True)
+        lignes = classeur.worksheets[0].iter_rows(values_only=True)
+        entete = next(lignes)
+        df = pd.DataFrame(list(lignes), columns=entete)
+        classeur.close()
+    else:
+        fichier = 'transactions.xlsx' if methode == 'xlsx' else 'transactions.csv'
+        df = DataProcessor().load_transactions(os.path.join(repertoire, fichier))
+    duree = time.perf_counter() - debut
+    print(json.dumps({
+        'duree': duree,
+        'lignes': len(df),
+        'memoire': df.memory_usage(deep=True).sum() / 1024 ** 2,
+        'rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == '--mesurer':
+        mesurer(sys.argv[2], sys.argv[3])
+        return
+
+    parser = argparse.ArgumentParser(description="Benchmark du chargement des classeurs Excel")
+    parser.add_argument('--rows', type=int, nargs='+', default=[200_000])
+    parser.add_argument('--clients', type=int, default=10_000)
+    parser.add_argument('--openpyxl', action='store_true',
+                        help="Mesure aussi la lecture ligne à ligne d'openpyxl (lente)")
+    args = parser.parse_args()
+    methodes = ['csv', 'xlsx'] + (['openpyxl'] if args.openpyxl else [])
+
+    print(f"{'lignes':>12} | {'méthode':>8} | {'durée (s)':>9} | {'DataFrame (Mo)':>14} | {'pic RSS (Mo)':>12}")
+    for nb_lignes in args.rows:
+        with tempfile.TemporaryDirectory() as repertoire:
+            subprocess.run([sys.executable, '-c',
+                            f"import sys; sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r}); "
+                            f"import bench_excel_ingestion as b; "
+                            f"b.generer_fichiers({repertoire!r}, {nb_lignes}, {args.clients})"],
+                           check=True)
+            for methode in methodes:
+                sortie = subprocess.run([sys.executable, os.path.abspath(__file__), '--mesurer', repertoire, methode],
+                                        check=True, capture_output=True, text=True).stdout
+                mesure = json.loads(sortie.strip().splitlines()[-1])
+                print(f"{nb_lignes:>12,} | {methode:>8} | {mesure['duree']:9.2f} | "
+                      f"{mesure['memoire']:14.0f} | {mesure['rss']:12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+BENCHMARK - CONVERSION DES MONTANTS EN EUR (TAUX DE CHANGE DATÉS)
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Convertit des transactions synthétiques en EUR avec la table
+              de taux datés (recherche binaire sur la clé devise + jour) et
+              compare le résultat et la durée à une jointure temporelle
+              pandas (merge_asof par devise, qui trie les transactions).
+              Code de sortie 1 si les montants convertis diffèrent.
+
+Usage :
+    python bench_fx_conversion.py --rows 1000000 5000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+from synthetic import generer_clients, generer_transactions  # noqa: E402
+from fx_rates import FxRateTable  # noqa: E402
+from schemas import SCHEMA_TRANSACTIONS, add_timestamp_columns  # noqa: E402
+
+TABLE_TAUX = os.path.join(SRC_DIR, 'config', 'taux_change.csv')
+
+
+def merge_asof(transactions, chemin_taux):
+    """Montants en EUR par jointure temporelle pandas (référence)."""
+    taux = pd.read_csv(chemin_taux, sep=';', parse_dates=['Date']).sort_values('Date')
+    gauche = pd.DataFrame({'Date': transactions['Date'], 'Devise': transactions['Devise'].astype(str),
+                           'Montant': transactions['Montant'], 'ordre': np.arange(len(transactions))})
+    joint = pd.merge_asof(gauche.sort_values('Date'), taux, on='Date', by='Devise')
+    joint.loc[joint['Devise'] == 'EUR', 'Taux'] = 1.0
+    return (joint['Montant'] / joint['Taux']).to_numpy()[np.argsort(joint['ordre'].to_numpy())]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la conversion des montants en EUR")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000])
+    parser.add_argument('--clients', type=int, default=10_000)
+    args = parser.parse_args()
+
+    table = FxRateTable.from_csv(TABLE_TAUX)
+    differents = False
+    print(f"{'lignes':>12} | {'fx_rates (s)':>12} | {'lignes/s':>12} | {'merge_asof (s)':>14} | montants")
+    for nb_lignes in args.rows:
+        transactions = generer_transactions(nb_lignes, generer_clients(args.clients))
+        transactions['Devise'] = transactions['Devise'].astype('category')
+        add_timestamp_columns(transactions, SCHEMA_TRANSACTIONS)
+
+        debut = time.perf_counter()
+        table.convert(transactions, SCHEMA_TRANSACTIONS)
+        duree = time.perf_counter() - debut
+
+        debut = time.perf_counter()
+        reference = merge_asof(transactions, TABLE_TAUX)
+        duree_reference = time.perf_counter() - debut
+
+        identiques = np.allclose(transactions['Montant_EUR'].to_numpy(), reference, equal_nan=True)
+        differents |= not identiques
+        print(f"{nb_lignes:>12,} | {duree:12.3f} | {nb_lignes / duree:12,.0f} | {duree_reference:14.3f} | "
+              f"{'identiques' if identiques else 'DIFFÉRENTS'}")
+
+    sys.exit(1 if differents else 0)
+
+
+if __name__ == "__main__":
+    main()
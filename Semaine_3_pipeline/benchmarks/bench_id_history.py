@@ -0,0 +1,67 @@
+"""
+BENCHMARK - HISTORIQUE PERSISTANT DES TRANSACTION_ID (--seen-ids)
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Alimente un historique d'identifiants par lots journaliers
+              jusqu'à plusieurs dizaines de millions d'entrées, puis mesure
+              le contrôle d'un fichier du jour (dont une fraction rejouée) :
+              durée, débit, nombre de séries et taille sur disque. La
+              mémoire résidente ajoutée par les séries projetées reste
+              limitée aux pages lues par les recherches.
+
+Usage :
+    python bench_id_history.py --historique 10000000 50000000 --lot 1000000
+"""
+
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+from id_store import TransactionIdHistory  # noqa: E402
+
+
+def identifiants(debut, nombre):
+    """Transaction_ID au format du fichier source (TXN000000001...)."""
+    return np.char.add('TXN', np.char.zfill(np.arange(debut, debut + nombre).astype(str), 9)).astype(object)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'historique persistant des Transaction_ID")
+    parser.add_argument('--historique', type=int, nargs='+', default=[10_000_000],
+                        help="Tailles d'historique mesurées (croissantes)")
+    parser.add_argument('--lot', type=int, default=1_000_000, help="Transactions par exécution journalière")
+    parser.add_argument('--rejeu', type=float, default=0.1, help="Fraction rejouée du fichier contrôlé")
+    args = parser.parse_args()
+
+    print(f"{'historique':>12} | {'séries':>6} | {'disque (Mo)':>11} | {'contrôle (s)':>12} | "
+          f"{'lignes/s':>12} | {'rejeux trouvés':>14} | {'pic RSS (Mo)':>12}")
+    with tempfile.TemporaryDirectory() as repertoire:
+        total = 0
+        for cible in sorted(args.historique):
+            while total < cible:
+                historique = TransactionIdHistory(repertoire)
+                historique.stage(identifiants(total, args.lot))
+                historique.save()
+                total += args.lot
+
+            historique = TransactionIdHistory(repertoire)
+            nb_rejeux = int(args.lot * args.rejeu)
+            fichier = identifiants(total - nb_rejeux, args.lot)
+            debut = time.perf_counter()
+            trouves = int(historique.contains(fichier).sum())
+            duree = time.perf_counter() - debut
+            disque = sum(os.path.getsize(os.path.join(repertoire, nom)) for nom in os.listdir(repertoire)) / 1024 ** 2
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            print(f"{len(historique):>12,} | {len(historique.series):>6} | {disque:11.0f} | {duree:12.2f} | "
+                  f"{args.lot / duree:12,.0f} | {trouves:>14,} | {rss:12.0f}")
+
+
+if __name__ == "__main__":
+    main()
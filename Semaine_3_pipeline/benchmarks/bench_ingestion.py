@@ -0,0 +1,88 @@
+"""
+BENCHMARK - CHARGEMENT TYPÉ DES CSV D'ENTRÉE
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Compare le chargement historique des transactions
+              (read_csv sans types puis conversion de Montant et Date au
+              nettoyage) au chargement typé de DataProcessor, moteur C et
+              moteur pyarrow. Chaque mesure tourne dans son propre
+              sous-processus : durée, mémoire du DataFrame et pic RSS.
+
+Usage :
+    python bench_ingestion.py --rows 1000000 5000000
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+METHODES = ['historique', 'type_c', 'type_pyarrow']
+
+
+def generer_fichier(chemin, nb_lignes, nb_clients):
+    """Écrit un fichier de transactions au schéma complet de src/data/transactions.csv."""
+    from synthetic import generer_clients, generer_transactions, completer_colonnes
+
+    clients = generer_clients(nb_clients)
+    transactions = completer_colonnes(generer_transactions(nb_lignes, clients))
+    transactions['Date'] = transactions['Date'].dt.strftime('%Y-%m-%d')
+    transactions.to_csv(chemin, sep=';', index=False)
+
+
+def mesurer(chemin, methode):
+    """Charge le fichier selon la méthode et imprime les mesures en JSON (sous-processus)."""
+    import pandas as pd
+    sys.path.insert(0, SRC_DIR)
+    from data_processor import DataProcessor
+
+    debut = time.perf_counter()
+    if methode == 'historique':
+        df = pd.read_csv(chemin, sep=';')
+        DataProcessor._convert_types(df)
+    else:
+        processor = DataProcessor(csv_engine='pyarrow' if methode == 'type_pyarrow' else 'c')
+        df = processor.load_transactions(chemin)
+        DataProcessor._convert_types(df)
+    duree = time.perf_counter() - debut
+    print(json.dumps({
+        'duree': duree,
+        'memoire': df.memory_usage(deep=True).sum() / 1024 ** 2,
+        'rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == '--mesurer':
+        mesurer(sys.argv[2], sys.argv[3])
+        return
+
+    parser = argparse.ArgumentParser(description="Benchmark du chargement typé des transactions")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000])
+    parser.add_argument('--clients', type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(f"{'lignes':>12} | {'taille (Mo)':>11} | {'méthode':>12} | {'durée (s)':>9} | "
+          f"{'DataFrame (Mo)':>14} | {'pic RSS (Mo)':>12}")
+    for nb_lignes in args.rows:
+        with tempfile.TemporaryDirectory() as repertoire:
+            chemin = os.path.join(repertoire, 'transactions.csv')
+            subprocess.run([sys.executable, '-c',
+                            f"import sys; sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r}); "
+                            f"import bench_ingestion as b; b.generer_fichier({chemin!r}, {nb_lignes}, {args.clients})"],
+                           check=True)
+            taille = os.path.getsize(chemin) / 1024 ** 2
+            for methode in METHODES:
+                sortie = subprocess.run([sys.executable, os.path.abspath(__file__), '--mesurer', chemin, methode],
+                                        check=True, capture_output=True, text=True).stdout
+                mesure = json.loads(sortie.strip().splitlines()[-1])
+                print(f"{nb_lignes:>12,} | {taille:11.0f} | {methode:>12} | {mesure['duree']:9.2f} | "
+                      f"{mesure['memoire']:14.0f} | {mesure['rss']:12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+BENCHMARK - CACHE DES ENTRÉES ANALYSÉES (--input-cache)
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Exécute le pipeline sans cache, puis avec un cache vide
+              (lecture, nettoyage et écriture du cache) et enfin sur les
+              mêmes fichiers avec le cache rempli, comme une relance Blue
+              Prism ; compare la durée des étapes chargement + nettoyage
+              (relevée dans le journal du pipeline), la durée totale et les
+              sorties.
+
+Usage :
+    python bench_input_cache.py --rows 1000000
+"""
+
+import argparse
+import filecmp
+import os
+import re
+import tempfile
+
+from bench_streaming import FICHIERS_COMPARES, executer, preparer_copie
+
+
+def duree_entrees(src):
+    """Durée chargement + nettoyage de la dernière exécution, lue dans pipeline_execution.log."""
+    with open(os.path.join(src, 'pipeline_execution.log'), 'r', encoding='utf-8', errors='replace') as f:
+        journal = f.read()
+    chargement = re.findall(r"- Chargement : ([0-9.]+)s", journal)[-1]
+    nettoyage = re.findall(r"- Nettoyage : ([0-9.]+)s", journal)[-1]
+    return float(chargement) + float(nettoyage)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du cache des entrées analysées")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000])
+    parser.add_argument('--clients', type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(f"{'lignes':>12} | {'exécution':>12} | {'entrées (s)':>11} | {'total (s)':>9} | sorties")
+    for nb_lignes in args.rows:
+        with tempfile.TemporaryDirectory() as racine:
+            src = preparer_copie(racine, nb_lignes, args.clients)
+            cache = ['--input-cache', os.path.join(racine, 'cache_entrees')]
+            lignes = []
+            for nom, options in (('sans cache', []), ('cache vide', cache), ('cache rempli', cache)):
+                duree, _, sortie = executer(src, options, nom.replace(' ', '_'))
+                lignes.append((nom, duree_entrees(src), duree, sortie))
+            _, differents, erreurs = filecmp.cmpfiles(lignes[0][3], lignes[-1][3], FICHIERS_COMPARES, shallow=False)
+            sorties = 'identiques' if not differents and not erreurs else f"DIFFÉRENTES {differents + erreurs}"
+
+        for nom, entrees, duree, _ in lignes:
+            print(f"{nb_lignes:>12,} | {nom:>12} | {entrees:11.2f} | {duree:9.2f} | {sorties}")
+
+
+if __name__ == "__main__":
+    main()
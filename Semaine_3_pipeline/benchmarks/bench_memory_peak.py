@@ -0,0 +1,102 @@
+"""
+BENCHMARK - PIC MÉMOIRE DE L'EXÉCUTION SANS COPIE (--in-place)
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Exécute le pipeline en mémoire avec et sans --in-place, vérifie
+              que les sorties sont identiques et rapporte le pic RSS à la taille
+              des entrées. Le pic est mesuré au-dessus du RSS de l'interpréteur
+              après import des modules du pipeline (pandas, numpy, pyarrow :
+              ~100 Mo incompressibles) et comparé à la taille en mémoire des
+              tables d'entrée chargées ; le pic RSS total rapporté aux
+              fichiers d'entrée bruts est affiché à côté. Code de sortie 1 si
+              les sorties diffèrent, ou si le rapport de l'exécution
+              --in-place dépasse --max-ratio à partir de --min-rows lignes :
+              aux petits volumes, les coûts fixes (index des listes noires,
+              tampons d'écriture) dominent ce rapport (~5× à 20 000 lignes,
+              ~2,2× à 300 000, ~1,8× à 1 000 000).
+
+Usage :
+    python bench_memory_peak.py --rows 1000000
+    python bench_memory_peak.py --rows 300000 1000000 --max-ratio 2.0
+"""
+
+import argparse
+import filecmp
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from bench_streaming import FICHIERS_COMPARES, executer, preparer_copie
+
+EXECUTIONS = {
+    'copies': [],
+    'in-place': ['--in-place'],
+}
+
+
+def mesurer_entrees(src):
+    """
+    RSS après import du pipeline et taille en mémoire des tables chargées (sous-processus).
+
+    Returns:
+        tuple: (RSS de base en Mo, tables d'entrée en Mo, fichiers d'entrée en Mo)
+    """
+    script = (
+        "import json, os, resource\n"
+        "import pipeline\n"
+        "base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024\n"
+        "from data_processor import DataProcessor\n"
+        "processor = DataProcessor()\n"
+        "tables = [processor.load_transactions('data/transactions.csv'), processor.load_clients('data/clients.csv')]\n"
+        "print(json.dumps({'base': base, 'tables': sum(t.memory_usage(deep=True).sum() for t in tables) / 1024 ** 2}))\n"
+    )
+    sortie = subprocess.run([sys.executable, '-c', script], cwd=src, check=True,
+                            capture_output=True, text=True).stdout
+    mesure = json.loads(sortie.strip().splitlines()[-1])
+    fichiers = sum(os.path.getsize(os.path.join(src, 'data', nom))
+                   for nom in ('transactions.csv', 'clients.csv')) / 1024 ** 2
+    return mesure['base'], mesure['tables'], fichiers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du pic mémoire de l'exécution sans copie")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000])
+    parser.add_argument('--clients', type=int, default=10_000)
+    parser.add_argument('--max-ratio', type=float, default=2.0,
+                        help="Pic RSS au-dessus de la base / tables d'entrée en mémoire, maximum admis (--in-place)")
+    parser.add_argument('--min-rows', type=int, default=1_000_000,
+                        help="Volume à partir duquel --max-ratio est vérifié (coûts fixes dominants en dessous)")
+    args = parser.parse_args()
+
+    depassement = False
+    print(f"{'lignes':>12} | {'exécution':>9} | {'durée (s)':>9} | {'pic RSS (Mo)':>12} | "
+          f"{'au-dessus base':>14} | {'× tables':>8} | {'pic × fichiers':>14} | sorties")
+    for nb_lignes in args.rows:
+        with tempfile.TemporaryDirectory() as racine:
+            src = preparer_copie(racine, nb_lignes, args.clients)
+            base, tables, fichiers = mesurer_entrees(src)
+
+            resultats = {nom: executer(src, options, nom) for nom, options in EXECUTIONS.items()}
+            _, differents, erreurs = filecmp.cmpfiles(resultats['copies'][2], resultats['in-place'][2],
+                                                      FICHIERS_COMPARES, shallow=False)
+            sorties = 'identiques' if not differents and not erreurs else f"DIFFÉRENTES {differents + erreurs}"
+
+            for nom, (duree, rss, _) in resultats.items():
+                travail = rss - base
+                print(f"{nb_lignes:>12,} | {nom:>9} | {duree:9.2f} | {rss:12.0f} | {travail:14.0f} | "
+                      f"{travail / tables:8.2f} | {rss / fichiers:14.2f} | {sorties}")
+            rapport = (resultats['in-place'][1] - base) / tables
+            verifie = nb_lignes >= args.min_rows
+            if (verifie and rapport > args.max_ratio) or sorties != 'identiques':
+                depassement = True
+        controle = (f"{rapport:.2f} {'>' if rapport > args.max_ratio else '<='} {args.max_ratio}" if verifie
+                    else f"non vérifié sous {args.min_rows:,} lignes")
+        print(f"{'':>12}   (base {base:.0f} Mo, tables d'entrée {tables:.0f} Mo, fichiers {fichiers:.0f} Mo ; "
+              f"--in-place × tables : {controle})")
+
+    sys.exit(1 if depassement else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+BENCHMARK - FORMATS DE SORTIE (CSV / PARQUET)
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Écrit un fichier de transactions scorées en CSV (format
+              historique) puis en Parquet, et compare durée d'écriture,
+              taille, lecture complète et lecture de deux colonnes.
+
+Usage :
+    python bench_output_formats.py --rows 1000000 10000000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from rules_engine import RulesEngine  # noqa: E402
+from columnar_output import write_parquet  # noqa: E402
+from synthetic import generer_clients, generer_transactions  # noqa: E402
+
+COLONNES_LUES = ['Montant', 'Niveau_Alerte']
+
+
+def chronometrer(fonction):
+    """Durée d'un appel en secondes."""
+    debut = time.perf_counter()
+    fonction()
+    return time.perf_counter() - debut
+
+
+def mesurer(df, chemin, ecrire, lire):
+    """Retourne (écriture s, taille Mo, lecture complète s, lecture de deux colonnes s)."""
+    ecriture = chronometrer(lambda: ecrire(df, chemin))
+    taille = os.path.getsize(chemin) / 1024 ** 2
+    lecture = chronometrer(lambda: lire(chemin, None))
+    lecture_colonnes = chronometrer(lambda: lire(chemin, COLONNES_LUES))
+    return ecriture, taille, lecture, lecture_colonnes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des formats de sortie CSV et Parquet")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000])
+    parser.add_argument('--clients', type=int, default=10_000)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    engine = RulesEngine()
+    clients = generer_clients(args.clients)
+
+    formats = {
+        'csv': (lambda df, chemin: df.to_csv(chemin, sep=';', index=False, encoding='utf-8'),
+                lambda chemin, colonnes: pd.read_csv(chemin, sep=';', usecols=colonnes)),
+        'parquet': (write_parquet,
+                    lambda chemin, colonnes: pd.read_parquet(chemin, columns=colonnes)),
+    }
+
+    print(f"{'lignes':>12} | {'format':>7} | {'écriture (s)':>12} | {'taille (Mo)':>11} | "
+          f"{'lecture (s)':>11} | {'2 colonnes (s)':>14}")
+    for nb_lignes in args.rows:
+        df = engine.apply_all_rules(generer_transactions(nb_lignes, clients), clients)
+        df.insert(df.columns.get_loc('Alertes_Flags'), 'Alertes',
+                  engine.decode_alertes(df['Alertes_Flags']).to_numpy())
+
+        with tempfile.TemporaryDirectory() as repertoire:
+            for nom, (ecrire, lire) in formats.items():
+                chemin = os.path.join(repertoire, f"transactions_enrichies.{nom}")
+                ecriture, taille, lecture, lecture_colonnes = mesurer(df, chemin, ecrire, lire)
+                print(f"{nb_lignes:>12,} | {nom:>7} | {ecriture:12.2f} | {taille:11.1f} | "
+                      f"{lecture:11.2f} | {lecture_colonnes:14.2f}")
+        del df
+
+
+if __name__ == "__main__":
+    main()
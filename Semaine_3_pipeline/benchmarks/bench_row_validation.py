@@ -0,0 +1,71 @@
+"""
+BENCHMARK - VALIDATION LIGNE À LIGNE (QUARANTAINE)
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Génère des transactions dont une fraction est invalide
+              (montant négatif ou manquant, devise inconnue, pays hors
+              ISO 3166), puis compare le débit du chargement typé à celui
+              de la validation des règles du schéma et de la séparation des
+              lignes en quarantaine. La validation doit rester nettement plus
+              rapide que la lecture pour ne pas ralentir l'ingestion.
+
+Usage :
+    python bench_row_validation.py --rows 1000000 5000000 --invalides 0.01
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+from synthetic import generer_clients, generer_transactions, completer_colonnes  # noqa: E402
+from data_processor import DataProcessor  # noqa: E402
+
+
+def generer_fichier(chemin, nb_lignes, nb_clients, fraction, seed=3):
+    """Écrit des transactions dont une fraction `fraction` viole une règle de validation."""
+    transactions = completer_colonnes(generer_transactions(nb_lignes, generer_clients(nb_clients)))
+    transactions['Date'] = transactions['Date'].dt.strftime('%Y-%m-%d')
+    rng = np.random.default_rng(seed)
+    lignes = rng.choice(nb_lignes, int(nb_lignes * fraction), replace=False)
+    for i, (colonne, valeur) in enumerate([('Montant', -100.0), ('Montant', np.nan),
+                                            ('Devise', 'XXX'), ('Pays_Bénéficiaire', 'ZZ')]):
+        transactions.loc[transactions.index[lignes[i::4]], colonne] = valeur
+    transactions.to_csv(chemin, sep=';', index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la validation ligne à ligne")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000])
+    parser.add_argument('--clients', type=int, default=10_000)
+    parser.add_argument('--invalides', type=float, default=0.01, help="Fraction de lignes invalides")
+    args = parser.parse_args()
+
+    print(f"{'lignes':>12} | {'lecture (s)':>11} | {'validation (s)':>14} | {'lignes/s validées':>17} | "
+          f"{'quarantaine':>11} | {'validation/lecture':>18}")
+    for nb_lignes in args.rows:
+        with tempfile.TemporaryDirectory() as repertoire:
+            chemin = os.path.join(repertoire, 'transactions.csv')
+            generer_fichier(chemin, nb_lignes, args.clients, args.invalides)
+
+            processor = DataProcessor()
+            debut = time.perf_counter()
+            df = processor.load_transactions(chemin)
+            DataProcessor._convert_types(df)
+            lecture = time.perf_counter() - debut
+
+            debut = time.perf_counter()
+            _, quarantaine, _ = processor.validator.split(df)
+            validation = time.perf_counter() - debut
+
+            print(f"{nb_lignes:>12,} | {lecture:11.2f} | {validation:14.3f} | {nb_lignes / validation:17,.0f} | "
+                  f"{len(quarantaine):>11,} | {validation / lecture:18.1%}")
+
+
+if __name__ == "__main__":
+    main()
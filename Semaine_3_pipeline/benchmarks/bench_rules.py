@@ -0,0 +1,95 @@
+"""
+BENCHMARK - PLAN DE RÈGLES COMPILÉ
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Rapport avant/après par règle entre l'ancien moteur (méthodes
+              _apply_* successives) et le plan compilé de RulesEngine.
+
+Usage :
+    python bench_rules.py --rows 1000000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from rules_engine import RulesEngine  # noqa: E402
+from rule_plan import compile_rules  # noqa: E402
+from legacy_rules_engine import RulesEngine as LegacyRulesEngine  # noqa: E402
+from synthetic import generer_clients, generer_transactions  # noqa: E402
+
+# Correspondance étape de l'ancien moteur -> règles du plan compilé
+ETAPES_LEGACY = [
+    ('_apply_seuil_reglementaire', ('SEUIL_REGLEMENTAIRE',)),
+    ('_apply_risque_client', ('CLIENT_RISQUE_ELEVE', 'CLIENT_PEP')),
+    ('_apply_pays_sanctionnes', ('PAYS_SANCTIONNE',)),
+    ('_apply_montant_exceptionnel', ('MONTANT_EXCEPTIONNEL',)),
+    ('_detect_structuring', ('SUSPICION_STRUCTURING',)),
+    ('_calculer_niveau_alerte', ('SCORE_ET_NIVEAUX',)),
+]
+
+
+def executer_legacy(engine, df_transactions, df_clients):
+    """Rejoue apply_all_rules de l'ancien moteur en chronométrant chaque étape."""
+    df = df_transactions.copy()
+    df['Alertes'] = ''
+    df['Niveau_Alerte'] = 'Faible'
+    df['Score_Risque'] = 0
+    df['Details_Alertes'] = ''
+
+    temps = {}
+    for methode, _ in ETAPES_LEGACY:
+        debut = time.perf_counter()
+        if methode == '_apply_risque_client':
+            df = engine._apply_risque_client(df, df_clients)
+        else:
+            df = getattr(engine, methode)(df)
+        temps[methode] = time.perf_counter() - debut
+    return df, temps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rapport de temps par règle avant/après compilation")
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--clients', type=int, default=None)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    clients = generer_clients(args.clients or max(1, args.rows // 50))
+    transactions = generer_transactions(args.rows, clients)
+
+    legacy = LegacyRulesEngine()
+    nouveau = RulesEngine()
+    # Même règle de structuring que l'ancien moteur (fenêtre d'un jour, total > 10 000)
+    nouveau.config['parametres_detection']['structuring']['seuil_total_min'] = np.nextafter(10000, np.inf)
+    nouveau.plan = compile_rules(nouveau.config)
+
+    df_legacy, temps_legacy = executer_legacy(legacy, transactions, clients)
+
+    debut = time.perf_counter()
+    df_nouveau = nouveau.apply_all_rules(transactions, clients)
+    total_nouveau = time.perf_counter() - debut
+    temps_nouveau = nouveau.rule_timings
+
+    assert np.array_equal(df_legacy['Score_Risque'].to_numpy(), df_nouveau['Score_Risque'].to_numpy())
+    assert np.array_equal(df_legacy['Niveau_Alerte'].to_numpy(), df_nouveau['Niveau_Alerte'].to_numpy())
+
+    print(f"{args.rows:,} transactions, {len(clients):,} clients")
+    print(f"{'étape (ancien moteur)':<30} | {'avant (ms)':>11} | {'après (ms)':>11} | {'gain':>8}")
+    for methode, codes in ETAPES_LEGACY:
+        avant = temps_legacy[methode] * 1000
+        apres = sum(temps_nouveau.get(code, 0.0) for code in codes) * 1000
+        print(f"{methode:<30} | {avant:11.1f} | {apres:11.1f} | x{avant / max(apres, 1e-9):7.1f}")
+    total_legacy = sum(temps_legacy.values())
+    print(f"{'TOTAL apply_all_rules':<30} | {total_legacy * 1000:11.1f} | {total_nouveau * 1000:11.1f} | "
+          f"x{total_legacy / total_nouveau:7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+BENCHMARK - RECOUVREMENT DES ÉTAPES (CHARGEMENT, NETTOYAGE)
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Exécute le pipeline et relève, dans la section `recouvrement`
+              de statistiques_pipeline.json, la durée de chaque étape dont
+              les tâches s'exécutent en parallèle (lecture transactions et
+              clients ; nettoyage et index clients), la somme des durées des
+              tâches (exécution en série) et le gain. Sur un disque local le
+              gain est faible ; il augmente avec la latence du partage réseau.
+
+Usage :
+    python bench_stage_overlap.py --rows 1000000
+    python bench_stage_overlap.py --rows 1000000 --data-dir /mnt/partage/bench
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+
+from bench_streaming import executer, preparer_copie
+
+EXECUTIONS = {
+    'moteur C': [],
+    'pyarrow': ['--csv-engine', 'pyarrow'],
+    'flux': ['--chunk-size', '200000'],
+}
+
+
+def recouvrement(sortie):
+    """Section `recouvrement` des statistiques de l'exécution."""
+    with open(os.path.join(sortie, 'statistiques_pipeline.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)['statistiques']['recouvrement']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du recouvrement des étapes du pipeline")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000])
+    parser.add_argument('--clients', type=int, default=10_000)
+    parser.add_argument('--data-dir', default=None,
+                        help="Répertoire des fichiers d'entrée (ex. partage réseau) ; par défaut src/data")
+    args = parser.parse_args()
+
+    print(f"{'lignes':>12} | {'exécution':>9} | {'étape':>10} | {'durée (s)':>9} | "
+          f"{'en série (s)':>12} | {'gain (s)':>8}")
+    for nb_lignes in args.rows:
+        with tempfile.TemporaryDirectory() as racine:
+            src = preparer_copie(racine, nb_lignes, args.clients)
+            entrees = []
+            if args.data_dir:
+                os.makedirs(args.data_dir, exist_ok=True)
+                for nom in ('transactions.csv', 'clients.csv'):
+                    shutil.copy(os.path.join(src, 'data', nom), args.data_dir)
+                entrees = ['--transactions', os.path.join(args.data_dir, 'transactions.csv'),
+                           '--clients', os.path.join(args.data_dir, 'clients.csv')]
+
+            for nom, options in EXECUTIONS.items():
+                _, _, sortie = executer(src, entrees + options, nom.replace(' ', '_'))
+                for etape, mesure in recouvrement(sortie).items():
+                    en_serie = sum(mesure['taches_s'].values())
+                    print(f"{nb_lignes:>12,} | {nom:>9} | {etape:>10} | {mesure['duree_s']:9.2f} | "
+                          f"{en_serie:12.2f} | {mesure['gain_s']:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
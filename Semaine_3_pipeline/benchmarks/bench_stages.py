@@ -0,0 +1,237 @@
+"""
+BENCHMARK - ÉTAPES DU PIPELINE PAR VOLUME (RÉFÉRENCE JSON)
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Mesure séparément chaque étape du traitement sur des données
+              synthétiques de volumes croissants : load_transactions,
+              load_clients, clean_transactions, build_client_index,
+              enrich_data, chaque règle du plan compilé (regles.<code>),
+              generate_summary_report et generate_reports (un relevé par
+              fichier écrit). Chaque volume est mesuré dans un processus
+              neuf avec le StageProfiler du pipeline : une passe pour les
+              durées, CPU et pic RSS, puis une passe tracemalloc pour le pic
+              de mémoire propre à chaque étape (le traçage fausse les
+              durées, d'où deux passes).
+
+              Les résultats sont écrits en JSON (--sortie) et comparés à une
+              référence enregistrée (--baseline) : code de sortie 1 si une
+              étape est plus lente ou plus gourmande au-delà de la
+              tolérance. Les durées dépendent de la machine : la référence
+              doit être enregistrée sur l'hôte où la comparaison est faite.
+
+Usage :
+    python bench_stages.py --rows 10000 1000000 --sortie baseline_stages.json
+    python bench_stages.py --rows 10000 1000000 --baseline baseline_stages.json
+    python bench_stages.py --rows 10000 1000000 10000000 --sans-memoire-tracee
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+from bench_streaming import preparer_copie
+
+# En deçà, un écart de durée est du bruit de mesure (ms)
+ECART_MIN_MS = 5.0
+# En deçà, un écart de pic mémoire tracée est ignoré (Mo)
+ECART_MIN_MO = 1.0
+
+
+def mesurer(src, tracer_memoire):
+    """
+    Exécute les étapes une à une (dans le processus lancé sur la copie `src`).
+
+    Returns:
+        dict: Section performance du StageProfiler
+    """
+    sys.path.insert(0, src)
+    import logging
+    from pipeline import CompliancePipeline
+
+    logging.disable(logging.WARNING)
+    pipeline = CompliancePipeline(os.path.join('data', 'transactions.csv'), os.path.join('data', 'clients.csv'),
+                                  output_dir=os.path.join(os.path.dirname(src), 'output'),
+                                  trace_memory=tracer_memoire)
+    processor, profiler = pipeline.data_processor, pipeline.profiler
+
+    profiler.start()
+    with profiler.stage('load_config'):
+        pipeline.load_config()
+        pipeline.load_fx_rates()
+    with profiler.stage('load_transactions') as mesure:
+        mesure['lignes'] = len(processor.load_transactions(pipeline.transactions_path))
+    with profiler.stage('load_clients') as mesure:
+        mesure['lignes'] = len(processor.load_clients(pipeline.clients_path))
+    with profiler.stage('clean_transactions', len(processor.transactions_df)):
+        processor.clean_transactions()
+    with profiler.stage('build_client_index', len(processor.clients_df)):
+        processor.build_client_index()
+
+    nb_lignes = len(processor.transactions_df)
+    with profiler.stage('enrich_data', nb_lignes):
+        pipeline.enriched_df = processor.enrich_data()
+    with profiler.stage('apply_all_rules', nb_lignes):
+        pipeline.enriched_df = pipeline.rules_engine.apply_all_rules(
+            pipeline.enriched_df, client_index=processor.client_index, verbose=False, profiler=profiler
+        )
+    with profiler.stage('generate_summary_report', nb_lignes):
+        pipeline.summary_stats['rules'] = pipeline.rules_engine.generate_summary_report(pipeline.enriched_df)
+    with profiler.stage('sort_alerts', nb_lignes):
+        pipeline.alert_positions = pipeline._sort_alerts(pipeline.enriched_df)
+    with profiler.stage('generate_reports', nb_lignes):
+        if not pipeline.generate_reports():
+            raise RuntimeError("generate_reports a échoué")
+    profiler.stop(nb_lignes)
+    return profiler.report()
+
+
+def lancer_mesure(src, tracer_memoire):
+    """Mesure dans un processus neuf (mémoire et caches non partagés entre passes)."""
+    commande = [sys.executable, os.path.abspath(__file__), '--mesurer', src]
+    if tracer_memoire:
+        commande.append('--trace-memory')
+    sortie = subprocess.run(commande, cwd=src, check=True, capture_output=True, text=True).stdout
+    return json.loads(sortie.strip().splitlines()[-1])
+
+
+def mesurer_volume(nb_lignes, nb_clients, repetitions, memoire_tracee):
+    """
+    Mesures d'un volume : médiane des passes de durée, pic tracé de la passe tracemalloc.
+
+    Returns:
+        dict: 'transactions', 'clients', 'total' et 'etapes' (nom -> mesures)
+    """
+    with tempfile.TemporaryDirectory() as racine:
+        src = preparer_copie(racine, nb_lignes, nb_clients)
+        passes = [lancer_mesure(src, False) for _ in range(repetitions)]
+        trace = lancer_mesure(src, True) if memoire_tracee else None
+
+    def median(cle, releves):
+        valeurs = [releve[cle] for releve in releves if releve.get(cle) is not None]
+        return statistics.median(valeurs) if valeurs else None
+
+    etapes = {}
+    for etape in passes[0]['etapes']:
+        releves = [next(e for e in passe['etapes'] if e['etape'] == etape['etape']) for passe in passes]
+        etapes[etape['etape']] = {
+            'appels': etape['appels'],
+            'lignes': etape['lignes'],
+            'duree_s': median('duree_s', releves),
+            'cpu_s': median('cpu_s', releves),
+            'lignes_par_s': median('lignes_par_s', releves),
+            'pic_rss_mo': median('pic_rss_mo', releves),
+            'pic_memoire_mo': None,
+        }
+    if trace is not None:
+        for etape in trace['etapes']:
+            if etape['etape'] in etapes:
+                etapes[etape['etape']]['pic_memoire_mo'] = etape['pic_memoire_mo']
+    total = {cle: median(cle, [passe['total'] for passe in passes])
+             for cle in ('duree_s', 'cpu_s', 'lignes_par_s', 'pic_rss_mo')}
+    total['pic_memoire_mo'] = trace['total']['pic_memoire_mo'] if trace is not None else None
+    return {'transactions': nb_lignes, 'clients': nb_clients, 'total': total, 'etapes': etapes}
+
+
+def comparer(resultats, reference, tolerance):
+    """
+    Écarts au-delà de la tolérance par rapport à la référence.
+
+    Une étape n'est comparée que si elle figure dans les deux relevés pour
+    le même volume ; les petits écarts absolus (bruit) sont ignorés.
+
+    Returns:
+        list: (volume, étape, mesure, référence, actuel) des régressions
+    """
+    regressions = []
+    for volume, mesures in resultats['volumes'].items():
+        base = reference.get('volumes', {}).get(volume)
+        if base is None:
+            continue
+        for nom, etape in mesures['etapes'].items():
+            ancien = base['etapes'].get(nom)
+            if ancien is None:
+                continue
+            for cle, ecart_min, echelle in (('duree_s', ECART_MIN_MS, 1000), ('pic_memoire_mo', ECART_MIN_MO, 1)):
+                avant, apres = ancien.get(cle), etape.get(cle)
+                if avant is None or apres is None:
+                    continue
+                if apres > avant * (1 + tolerance) and (apres - avant) * echelle > ecart_min:
+                    regressions.append((volume, nom, cle, avant, apres))
+    return regressions
+
+
+def afficher(volume, mesures, reference):
+    """Tableau d'un volume, avec le rapport à la référence si elle existe."""
+    base = reference.get('volumes', {}).get(volume, {}).get('etapes', {}) if reference else {}
+    print(f"\n{int(volume):,} transactions, {mesures['clients']:,} clients")
+    print(f"{'étape':<42} | {'durée (ms)':>11} | {'CPU (ms)':>10} | {'lignes/s':>14} | "
+          f"{'pic tracé (Mo)':>14} | {'vs réf.':>8}")
+    for nom, etape in mesures['etapes'].items():
+        cpu = f"{etape['cpu_s'] * 1000:10.1f}" if etape['cpu_s'] is not None else f"{'-':>10}"
+        debit = f"{etape['lignes_par_s']:14,.0f}" if etape['lignes_par_s'] is not None else f"{'-':>14}"
+        pic = f"{etape['pic_memoire_mo']:14.1f}" if etape['pic_memoire_mo'] is not None else f"{'-':>14}"
+        ancien = base.get(nom, {}).get('duree_s')
+        rapport = f"x{etape['duree_s'] / ancien:7.2f}" if ancien else f"{'-':>8}"
+        print(f"{nom:<42} | {etape['duree_s'] * 1000:11.1f} | {cpu} | {debit} | {pic} | {rapport}")
+    total = mesures['total']
+    print(f"{'TOTAL':<42} | {total['duree_s'] * 1000:11.1f} | {total['cpu_s'] * 1000:10.1f} | "
+          f"{total['lignes_par_s']:14,.0f} | pic RSS {total['pic_rss_mo']:.0f} Mo")
+
+
+def main():
+    if len(sys.argv) >= 3 and sys.argv[1] == '--mesurer':
+        print(json.dumps(mesurer(sys.argv[2], '--trace-memory' in sys.argv[3:])))
+        return
+
+    parser = argparse.ArgumentParser(description="Benchmark des étapes du pipeline par volume")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument('--clients', type=int, default=None,
+                        help="Taille du référentiel clients (défaut : 1 client pour 50 transactions)")
+    parser.add_argument('--repetitions', type=int, default=1, help="Passes de durée par volume (médiane)")
+    parser.add_argument('--sans-memoire-tracee', action='store_true',
+                        help="Pas de passe tracemalloc (durées, CPU et pic RSS seulement)")
+    parser.add_argument('--sortie', default=None, metavar='FICHIER', help="Résultats JSON (nouvelle référence)")
+    parser.add_argument('--baseline', default=None, metavar='FICHIER', help="Référence JSON à comparer")
+    parser.add_argument('--tolerance', type=float, default=0.20,
+                        help="Écart relatif toléré par rapport à la référence (0.20 = +20 %%)")
+    args = parser.parse_args()
+
+    reference = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            reference = json.load(f)
+
+    resultats = {
+        'genere_le': datetime.now().isoformat(),
+        'machine': {'hote': platform.node(), 'processeur': platform.processor() or platform.machine(),
+                    'cpu': os.cpu_count(), 'python': platform.python_version()},
+        'repetitions': args.repetitions,
+        'volumes': {},
+    }
+    for nb_lignes in args.rows:
+        nb_clients = args.clients or max(1_000, nb_lignes // 50)
+        mesures = mesurer_volume(nb_lignes, nb_clients, args.repetitions, not args.sans_memoire_tracee)
+        resultats['volumes'][str(nb_lignes)] = mesures
+        afficher(str(nb_lignes), mesures, reference)
+
+    if args.sortie:
+        with open(args.sortie, 'w', encoding='utf-8') as f:
+            json.dump(resultats, f, ensure_ascii=False, indent=2)
+        print(f"\nRésultats écrits dans {args.sortie}")
+
+    if reference is not None:
+        regressions = comparer(resultats, reference, args.tolerance)
+        print(f"\nComparaison à {args.baseline} (tolérance {args.tolerance:.0%}) : "
+              f"{len(regressions)} régression(s)")
+        for volume, nom, cle, avant, apres in regressions:
+            print(f"   - {int(volume):,} transactions, {nom} : {cle} {avant:.4g} -> {apres:.4g}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
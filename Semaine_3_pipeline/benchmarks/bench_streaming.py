@@ -0,0 +1,93 @@
+"""
+BENCHMARK - MODE FLUX (--chunk-size)
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Exécute le pipeline complet en mémoire puis par morceaux sur
+              des fichiers synthétiques de tailles croissantes, compare les
+              sorties et relève la durée et le pic de mémoire (RSS) de chaque
+              exécution. Les données sont générées dans un sous-processus : le
+              processus de mesure reste léger et ne gonfle pas le RSS mesuré
+              des exécutions lancées par fork.
+
+Usage :
+    python bench_streaming.py --rows 100000 1000000 --chunk-size 100000
+"""
+
+import argparse
+import filecmp
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+FICHIERS_COMPARES = ['transactions_enrichies.csv', 'alertes_compliance.csv', 'rapport_detaille.csv']
+
+
+def generer_donnees(src, nb_lignes, nb_clients):
+    """Écrit les fichiers synthétiques dans src/data (exécuté dans un sous-processus)."""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from synthetic import generer_clients, generer_transactions
+
+    clients = generer_clients(nb_clients)
+    transactions = generer_transactions(nb_lignes, clients)
+    transactions['Bénéficiaire'] = 'FR7600000000000000000000000'
+    clients.to_csv(os.path.join(src, 'data', 'clients.csv'), sep=';', index=False)
+    transactions.to_csv(os.path.join(src, 'data', 'transactions.csv'), sep=';', index=False)
+
+
+def preparer_copie(racine, nb_lignes, nb_clients):
+    """Copie src/ dans un répertoire temporaire et y génère les données synthétiques."""
+    src = os.path.join(racine, 'src')
+    shutil.copytree(SRC_DIR, src, ignore=shutil.ignore_patterns('cache', '__pycache__'))
+    subprocess.run([sys.executable, os.path.abspath(__file__), '--generer', src,
+                    str(nb_lignes), str(nb_clients)], check=True)
+    return src
+
+
+def executer(src, options, nom):
+    """Lance pipeline.py dans un sous-processus ; retourne (durée s, pic RSS Mo, répertoire de sortie)."""
+    output = os.path.join(os.path.dirname(src), 'output')
+    shutil.rmtree(output, ignore_errors=True)
+
+    debut = time.perf_counter()
+    processus = subprocess.Popen([sys.executable, 'pipeline.py', *options], cwd=src,
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    _, statut, usage = os.wait4(processus.pid, 0)
+    duree = time.perf_counter() - debut
+    if statut != 0:
+        raise RuntimeError(f"pipeline.py {' '.join(options)} a échoué (statut {statut})")
+
+    resultat = f"{output}_{nom}"
+    shutil.rmtree(resultat, ignore_errors=True)
+    os.rename(output, resultat)
+    return duree, usage.ru_maxrss / 1024, resultat
+
+
+def main():
+    if len(sys.argv) == 5 and sys.argv[1] == '--generer':
+        generer_donnees(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]))
+        return
+
+    parser = argparse.ArgumentParser(description="Benchmark du mode flux du pipeline")
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--clients', type=int, default=10_000,
+                        help="Taille du référentiel clients (fixe : seul le volume de transactions varie)")
+    parser.add_argument('--chunk-size', type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{'lignes':>12} | {'mémoire (s)':>11} | {'RSS (Mo)':>9} | {'flux (s)':>9} | {'RSS (Mo)':>9} | sorties")
+    for nb_lignes in args.rows:
+        with tempfile.TemporaryDirectory() as racine:
+            src = preparer_copie(racine, nb_lignes, args.clients)
+            duree_mem, rss_mem, out_mem = executer(src, [], 'memoire')
+            duree_flux, rss_flux, out_flux = executer(src, ['--chunk-size', str(args.chunk_size)], 'flux')
+            _, differents, erreurs = filecmp.cmpfiles(out_mem, out_flux, FICHIERS_COMPARES, shallow=False)
+            sorties = 'identiques' if not differents and not erreurs else f"DIFFÉRENTES {differents + erreurs}"
+
+        print(f"{nb_lignes:>12,} | {duree_mem:11.2f} | {rss_mem:9.0f} | {duree_flux:9.2f} | {rss_flux:9.0f} | {sorties}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+BENCHMARK - DÉTECTION DE STRUCTURING
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Compare l'ancienne détection (boucle groupby par client-jour)
+              au détecteur vectorisé sur données synthétiques.
+
+Usage :
+    python bench_structuring.py --rows 10000000 --legacy-max-rows 1000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from structuring import StructuringDetector  # noqa: E402
+
+
+def generer_transactions(nb_lignes, nb_clients, nb_jours=30, seed=42):
+    """Génère un jeu de transactions synthétiques (Client_ID, Date, Montant)."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Client_ID': rng.integers(0, nb_clients, nb_lignes),
+        'Date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, nb_jours, nb_lignes), unit='D'),
+        'Montant': np.round(rng.uniform(100, 20000, nb_lignes), 2)
+    })
+
+
+def detection_legacy(df, seuil, seuil_total):
+    """Ancienne implémentation de RulesEngine._detect_structuring (référence)."""
+    structuring_ids = []
+    df = df.copy()
+    df['Date_only'] = pd.to_datetime(df['Date']).dt.date
+
+    for (client_id, date), group in df.groupby(['Client_ID', 'Date_only']):
+        if len(group) >= 2:
+            below = group[group['Montant'] < seuil]
+            if len(below) >= 2 and below['Montant'].sum() > seuil_total:
+                structuring_ids.extend(below.index.tolist())
+
+    mask = np.zeros(len(df), dtype=bool)
+    mask[structuring_ids] = True
+    return mask
+
+
+def detection_vectorisee(df, detector):
+    """Nouvelle implémentation (mêmes étapes que RulesEngine._detect_structuring)."""
+    jours = pd.to_datetime(df['Date']).to_numpy(dtype='datetime64[D]').astype(np.int64)
+    client_codes, _ = pd.factorize(df['Client_ID'])
+    return detector.detect(client_codes, jours, df['Montant'].to_numpy(dtype=np.float64))
+
+
+def chronometrer(fonction, *args):
+    """Exécute une fonction et retourne (résultat, durée en secondes)."""
+    debut = time.perf_counter()
+    resultat = fonction(*args)
+    return resultat, time.perf_counter() - debut
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la détection de structuring")
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--rows-per-client', type=int, default=100)
+    parser.add_argument('--legacy-max-rows', type=int, default=1_000_000,
+                        help="Taille maximale pour l'ancienne implémentation (0 = toujours)")
+    parser.add_argument('--periode-jours', type=int, default=3)
+    args = parser.parse_args()
+
+    seuil, seuil_total = 9500, 10000
+
+    tailles = sorted({t for t in (10_000, 100_000, 1_000_000, args.rows) if t <= args.rows})
+    print(f"{'lignes':>12} | {'legacy (s)':>11} | {'vectorisé 1j (s)':>16} | "
+          f"{'vectorisé {0}j (s)'.format(args.periode_jours):>16} | {'gain':>8}")
+
+    for nb_lignes in tailles:
+        df = generer_transactions(nb_lignes, max(1, nb_lignes // args.rows_per_client))
+
+        # Paramètres équivalents à l'ancienne règle (fenêtre d'un jour)
+        detector_1j = StructuringDetector(seuil, 2, 1, np.nextafter(seuil_total, np.inf))
+        detector_nj = StructuringDetector(seuil, 2, args.periode_jours, seuil_total)
+
+        mask_vect, duree_vect = chronometrer(detection_vectorisee, df, detector_1j)
+        _, duree_nj = chronometrer(detection_vectorisee, df, detector_nj)
+
+        if args.legacy_max_rows == 0 or nb_lignes <= args.legacy_max_rows:
+            mask_legacy, duree_legacy = chronometrer(detection_legacy, df, seuil, seuil_total)
+            assert np.array_equal(mask_legacy, mask_vect), "Résultats divergents"
+            legacy, gain = f"{duree_legacy:11.3f}", f"x{duree_legacy / duree_vect:7.1f}"
+        else:
+            legacy, gain = f"{'-':>11}", f"{'-':>8}"
+
+        print(f"{nb_lignes:>12,} | {legacy} | {duree_vect:16.3f} | {duree_nj:16.3f} | {gain}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+BENCHMARK - MODE DÉMON (--watch) CONTRE LANCEMENTS À FROID
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Mesure la latence par fichier vue par le robot : lancement à
+              froid de `python pipeline.py` (interpréteur, imports, règles,
+              référentiel clients) contre dépôt du fichier dans le
+              répertoire surveillé par un démon déjà démarré, jusqu'à
+              l'écriture de son statut.json. Les sorties des deux modes sont
+              comparées.
+
+Usage :
+    python bench_watch_daemon.py --rows 10000 100000 --clients 100000 --fichiers 3
+"""
+
+import argparse
+import filecmp
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_streaming import FICHIERS_COMPARES, executer, preparer_copie
+
+
+def attendre(chemin, delai_max=600):
+    """Attend l'apparition d'un fichier (écriture atomique) et retourne son contenu JSON."""
+    limite = time.monotonic() + delai_max
+    while not os.path.exists(chemin):
+        if time.monotonic() > limite:
+            raise TimeoutError(f"{chemin} non écrit après {delai_max}s")
+        time.sleep(0.01)
+    with open(chemin, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def mesurer_demon(src, nb_fichiers):
+    """Latences dépôt -> statut.json d'un démon démarré (s) et répertoire de sortie du dernier fichier."""
+    entree = os.path.join(os.path.dirname(src), 'entree')
+    sortie = os.path.join(os.path.dirname(src), 'output')
+    os.makedirs(entree)
+    shutil.rmtree(sortie, ignore_errors=True)
+    demon = subprocess.Popen([sys.executable, 'pipeline.py', '--watch', entree, '--watch-interval', '0.05',
+                              '--watch-max-files', str(nb_fichiers)],
+                             cwd=src, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    debut = time.perf_counter()
+    while attendre(os.path.join(sortie, 'daemon_status.json'))['etat'] != 'en_attente':
+        time.sleep(0.05)
+    demarrage = time.perf_counter() - debut
+
+    latences = []
+    for i in range(nb_fichiers):
+        nom = f"transactions_{i}"
+        # Copie sous un nom ignoré puis renommage : le dépôt est instantané pour le démon
+        shutil.copy(os.path.join(src, 'data', 'transactions.csv'), os.path.join(entree, f"{nom}.part"))
+        debut = time.perf_counter()
+        os.rename(os.path.join(entree, f"{nom}.part"), os.path.join(entree, f"{nom}.csv"))
+        statut = attendre(os.path.join(sortie, nom, 'statut.json'))
+        latences.append(time.perf_counter() - debut)
+        if statut['code_retour'] != 0:
+            raise RuntimeError(f"Traitement de {nom} en échec")
+    demon.wait()
+    return demarrage, latences, os.path.join(sortie, f"transactions_{nb_fichiers - 1}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du mode démon")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000])
+    parser.add_argument('--clients', type=int, default=10_000)
+    parser.add_argument('--fichiers', type=int, default=3, help="Fichiers traités par mode")
+    args = parser.parse_args()
+
+    print(f"{'lignes':>12} | {'à froid (s)':>11} | {'démarrage démon (s)':>19} | {'démon (s)':>9} | "
+          f"{'gain':>6} | sorties")
+    for nb_lignes in args.rows:
+        with tempfile.TemporaryDirectory() as racine:
+            src = preparer_copie(racine, nb_lignes, args.clients)
+            froid = [executer(src, [], 'froid') for _ in range(args.fichiers)]
+            demarrage, latences, sortie_demon = mesurer_demon(src, args.fichiers)
+
+            _, differents, erreurs = filecmp.cmpfiles(froid[-1][2], sortie_demon, FICHIERS_COMPARES, shallow=False)
+            sorties = 'identiques' if not differents and not erreurs else f"DIFFÉRENTES {differents + erreurs}"
+            duree_froid = statistics.median(duree for duree, _, _ in froid)
+            duree_demon = statistics.median(latences)
+            print(f"{nb_lignes:>12,} | {duree_froid:11.2f} | {demarrage:19.2f} | {duree_demon:9.2f} | "
+                  f"{duree_froid / duree_demon:5.1f}x | {sorties}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+BENCHMARK - MODE PARALLÈLE (--workers)
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Exécute le pipeline complet en série puis avec N processus
+              (partitions par Client_ID), vérifie que les sorties sont
+              identiques et relève l'accélération obtenue (RSS : processus
+              principal seulement).
+
+Usage :
+    python bench_workers.py --rows 2000000 --workers 2 4 8 16
+"""
+
+import argparse
+import filecmp
+import os
+import tempfile
+
+from bench_streaming import preparer_copie, executer, FICHIERS_COMPARES
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du mode parallèle du pipeline")
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--clients', type=int, default=10_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, 4, 8, 16])
+    args = parser.parse_args()
+
+    print(f"{args.rows:,} transactions, {args.clients:,} clients, {os.cpu_count()} coeurs")
+    print(f"{'processus':>9} | {'durée (s)':>9} | {'RSS (Mo)':>9} | {'accélération':>12} | sorties")
+
+    with tempfile.TemporaryDirectory() as racine:
+        src = preparer_copie(racine, args.rows, args.clients)
+        duree_serie, rss_serie, out_serie = executer(src, [], 'serie')
+        print(f"{1:>9} | {duree_serie:9.2f} | {rss_serie:9.0f} | {'x1.0':>12} | référence")
+
+        for workers in args.workers:
+            duree, rss, out = executer(src, ['--workers', str(workers)], f"workers_{workers}")
+            _, differents, erreurs = filecmp.cmpfiles(out_serie, out, FICHIERS_COMPARES, shallow=False)
+            sorties = 'identiques' if not differents and not erreurs else f"DIFFÉRENTES {differents + erreurs}"
+            print(f"{workers:>9} | {duree:9.2f} | {rss:9.0f} | {'x%.1f' % (duree_serie / duree):>12} | {sorties}")
+
+
+if __name__ == "__main__":
+    main()
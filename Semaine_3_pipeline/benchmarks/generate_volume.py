@@ -0,0 +1,405 @@
+"""
+GÉNÉRATEUR DE DONNÉES DE VOLUME (TESTS DE CHARGE)
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Version vectorisée et parallèle de generate_data.py (Semaine 1)
+              pour produire des fichiers clients.csv et transactions.csv de
+              taille production (jusqu'à 100M de transactions). Mêmes
+              colonnes, mêmes distributions et mêmes schémas de fraude
+              (STRUCTURING, GROS_MONTANT, contreparties sanctionnées), tirés
+              par NumPy pour un bloc entier de lignes.
+
+              Les transactions sont générées par blocs dans des processus de
+              travail ; chaque bloc a sa propre graine (graine, flux, numéro
+              de bloc) : le résultat ne dépend ni du nombre de processus ni
+              de l'ordre d'exécution. Chaque bloc est écrit dans un fichier
+              partiel, ajouté au fichier final dans l'ordre puis supprimé :
+              la mémoire est bornée par les blocs en cours.
+
+              Les chaînes (identifiants, comptes, dates) sont construites et
+              écrites par pyarrow (dépendance optionnelle du pipeline,
+              requise ici). Pas d'export Excel : un classeur est limité à
+              1 048 576 lignes.
+
+Usage :
+    python generate_volume.py --clients 1000000 --transactions 100000000 --sortie ./volume --workers 8
+"""
+
+import argparse
+import os
+import shutil
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pcsv
+except ImportError as e:
+    raise ImportError("generate_volume.py nécessite pyarrow (pip install pyarrow)") from e
+
+# Référentiels de generate_data.py
+PRENOMS = ["Jean", "Marie", "Pierre", "Sophie", "Thomas", "Julie", "Nicolas", "Isabelle", "Alexandre", "Camille"]
+NOMS = ["Martin", "Bernard", "Dubois", "Thomas", "Robert", "Richard", "Petit", "Durand", "Leroy", "Moreau"]
+SUFFIXES_SOCIETE = ["SARL", "SA", "GmbH", "Ltd", "SPA"]
+SEGMENTS = ["Comptant", "Privilege", "Entreprise", "Institutionnel", "Digital"]
+POIDS_SEGMENTS = [40, 20, 0, 5, 35]
+PAYS_EUROPE = ["FR", "DE", "IT", "ES", "BE", "NL", "LU", "CH", "GB", "PT", "SE", "DK"]
+INDUSTRIES = ["Technologie", "Finance", "Commerce", "Industrie", "Services", "Santé", "Immobilier", "Transport"]
+RISQUES = ["Faible", "Moyen", "Élevé"]
+FAIBLE, MOYEN, ELEVE = range(3)
+CLIENTS_BASE = [
+    ["DUPONT Martin", "FR", "Moyen", "2020-03-15", "Comptant", 125000, "Particulier", "Non"],
+    ["SCHULZ GmbH", "DE", "Élevé", "2021-11-22", "Entreprise", 2500000, "Finance", "Oui"],
+    ["ROSSI SPA", "IT", "Faible", "2019-06-10", "Entreprise", 500000, "Industrie", "Non"],
+    ["JOHANSSON AB", "SE", "Moyen", "2022-05-30", "Entreprise", 750000, "Technologie", "Non"],
+    ["COSTA SILVA", "PT", "Élevé", "2023-01-14", "Comptant", 30000, "Particulier", "Non"],
+]
+
+DEVISES = ["EUR", "USD", "GBP", "CHF"]
+TYPES_OPERATION = ["Virement", "Retrait", "Paiement", "Dépôt", "Conversion", "Prélèvement"]
+CANAUX = ["Agence", "Internet", "Mobile", "Téléphone"]
+PAYS_BENEFICIAIRE = ["FR", "DE", "IT", "ES", "BE", "NL", "LU", "CH"]
+PAYS_RISQUE = ["RU", "SY", "IR", "KP", "CU", "VE"]
+CONTREPARTIES_SUSPECTES = {
+    "US123456789": "OFAC Sanctions List",
+    "RU987654321": "Liste noire UE - Sanctions Russie",
+    "SY112233445": "OFAC SDN List",
+    "XY9988776655": "Liste interne - Fraude confirmée",
+    "IR5566778899": "Programme nucléaire iranien",
+}
+PATTERNS = ["NORMAL", "STRUCTURING", "GROS_MONTANT"]
+STATUTS = [
+    ("ALERTE: Pays sous sanctions", "Haute"),
+    ("Vérification seuil réglementaire", "Moyenne"),
+    ("Surveillance client risque élevé", "Moyenne"),
+    ("Suspicion de structuring", "Haute"),
+    ("ALERTE: Contrepartie sanctionnée", "Critique"),
+    ("À traiter", "Normale"),
+]
+PRIORITES = ["Haute", "Moyenne", "Critique", "Normale"]
+
+COLONNES_CLIENTS = ["Client_ID", "Nom", "Pays", "Niveau_Risque", "Date_Inscription",
+                    "Segment", "Encours_Annuel", "Industrie", "Est_PEP", "Score_Risque"]
+COLONNES_TRANSACTIONS = ["Transaction_ID", "Date", "Heure", "Client_ID", "Type_Operation",
+                         "Montant", "Devise", "Bénéficiaire", "Pays_Bénéficiaire", "Canal",
+                         "Statut_Compliance", "Priorité", "Pattern", "Commentaire"]
+
+# Flux de graines indépendants des clients et des transactions
+FLUX_CLIENTS, FLUX_TRANSACTIONS = 0, 1
+
+
+def _rng(graine, flux, bloc):
+    """Générateur d'un bloc : même graine, même bloc -> mêmes tirages."""
+    return np.random.default_rng(np.random.SeedSequence([graine, flux, bloc]))
+
+
+def _categorie(codes, modalites):
+    """Colonne texte à partir de codes : seules les modalités sont des chaînes."""
+    return pa.DictionaryArray.from_arrays(pa.array(np.asarray(codes, dtype=np.int32)), pa.array(modalites))
+
+
+def _choix(rng, n, poids):
+    """Codes tirés selon des poids relatifs (random.choices vectorisé)."""
+    poids = np.asarray(poids, dtype=float)
+    return rng.choice(len(poids), n, p=poids / poids.sum())
+
+
+def _dates(jours):
+    """Dates AAAA-MM-JJ à partir de jours depuis 1970."""
+    return pc.cast(pa.array(np.asarray(jours, dtype=np.int32), type=pa.date32()), pa.string())
+
+
+def identifiants_clients(indices, largeur):
+    """Client_ID 'CLT-' + numéro (indice + 1) complété à `largeur` chiffres."""
+    numeros = pc.utf8_lpad(pc.cast(pa.array(np.asarray(indices, dtype=np.int64) + 1), pa.string()), largeur, '0')
+    return pc.binary_join_element_wise('CLT-', numeros, '')
+
+
+def generer_clients_bloc(debut, fin, largeur, graine, jour_reference):
+    """
+    Clients d'indices [debut, fin), mêmes règles que generate_data.py.
+
+    Returns:
+        tuple: (Table pyarrow, codes de risque int8 : 0 Faible, 1 Moyen, 2 Élevé)
+    """
+    n = fin - debut
+    rng = _rng(graine, FLUX_CLIENTS, debut)
+
+    # 30 % d'entreprises (nom suivi d'une forme sociale), segment pondéré sinon
+    entreprise = rng.random(n) < 0.3
+    segment = np.where(entreprise, SEGMENTS.index("Entreprise"), _choix(rng, n, POIDS_SEGMENTS))
+    suffixe = np.where(entreprise, rng.integers(0, len(SUFFIXES_SOCIETE), n) + 1, 0)
+    noms = [f"{p} {nom}{' ' + s if s else ''}" for p in PRENOMS for nom in NOMS for s in [''] + SUFFIXES_SOCIETE]
+    code_nom = ((rng.integers(0, len(PRENOMS), n) * len(NOMS) + rng.integers(0, len(NOMS), n))
+                * (len(SUFFIXES_SOCIETE) + 1) + suffixe)
+    pays = rng.integers(0, len(PAYS_EUROPE), n)
+
+    # Risque pondéré selon le pays, puis le segment (seuils cumulés par groupe)
+    seuils = np.array([[0.5, 0.9], [0.3, 0.8], [0.4, 0.8], [0.6, 0.9]])
+    groupe = np.select([np.isin(pays, [PAYS_EUROPE.index("LU"), PAYS_EUROPE.index("CH")]),
+                        segment == SEGMENTS.index("Entreprise"), segment == SEGMENTS.index("Digital")],
+                       [0, 1, 2], default=3)
+    tirage = rng.random(n)
+    risque = ((tirage >= seuils[groupe, 0]).astype(np.int8) + (tirage >= seuils[groupe, 1]))
+
+    jours_inscription = jour_reference - rng.integers(0, 1826, n)
+    bornes_encours = np.array([[1000, 100000], [100000, 1000000], [50000, 5000000],
+                               [1000000, 10000000], [1000, 100000]], dtype=float)
+    encours = np.round(rng.uniform(bornes_encours[segment, 0], bornes_encours[segment, 1]), 2)
+
+    # Industrie des entreprises ; Finance et Immobilier au moins en risque moyen
+    industrie = np.where(entreprise, rng.integers(0, len(INDUSTRIES), n), len(INDUSTRIES))
+    sensible = entreprise & np.isin(industrie, [INDUSTRIES.index("Finance"), INDUSTRIES.index("Immobilier")])
+    risque[sensible & (risque == FAIBLE)] = MOYEN
+    pep = rng.random(n) < 0.05
+    risque[pep] = ELEVE
+
+    colonnes = {
+        "Client_ID": identifiants_clients(np.arange(debut, fin), largeur),
+        "Nom": _categorie(code_nom, noms),
+        "Pays": _categorie(pays, PAYS_EUROPE),
+        "Niveau_Risque": _categorie(risque, RISQUES),
+        "Date_Inscription": _dates(jours_inscription),
+        "Segment": _categorie(segment, SEGMENTS),
+        "Encours_Annuel": pa.array(encours),
+        "Industrie": _categorie(industrie, INDUSTRIES + ["Particulier"]),
+        "Est_PEP": _categorie(pep, ["Non", "Oui"]),
+        "Score_Risque": pa.array(risque.astype(np.int64) + 1),
+    }
+    # Profils de base des scénarios de test en tête du référentiel
+    if debut < len(CLIENTS_BASE):
+        colonnes = _remplacer_clients_base(colonnes, risque, debut, min(fin, len(CLIENTS_BASE)))
+    return pa.table(colonnes), risque
+
+
+def _remplacer_clients_base(colonnes, risque, debut, fin):
+    """Substitue les profils CLIENTS_BASE aux lignes [debut, fin) du bloc."""
+    valeurs = {nom: colonnes[nom].to_pylist() for nom in COLONNES_CLIENTS[1:]}
+    for i in range(debut, fin):
+        nom, pays, niveau, inscription, segment, encours, industrie, pep = CLIENTS_BASE[i]
+        ligne = {"Nom": nom, "Pays": pays, "Niveau_Risque": niveau, "Date_Inscription": inscription,
+                 "Segment": segment, "Encours_Annuel": float(encours), "Industrie": industrie,
+                 "Est_PEP": pep, "Score_Risque": RISQUES.index(niveau) + 1}
+        for cle, valeur in ligne.items():
+            valeurs[cle][i - debut] = valeur
+        risque[i - debut] = RISQUES.index(niveau)
+    return {"Client_ID": colonnes["Client_ID"], **{nom: pa.array(v) for nom, v in valeurs.items()}}
+
+
+# Référentiel clients des processus de travail (initialisé une fois par processus)
+_CLIENTS = {}
+
+
+def init_worker(risques, largeur):
+    """Transmet aux processus de travail le risque de chaque client et la largeur des Client_ID."""
+    _CLIENTS['risques'] = risques
+    _CLIENTS['eleves'] = np.flatnonzero(risques == ELEVE)
+    _CLIENTS['largeur'] = largeur
+
+
+def generer_transactions_bloc(debut, fin, graine, jour_debut):
+    """
+    Transactions d'indices [debut, fin), mêmes règles que generate_data.py.
+
+    Returns:
+        tuple: (Table pyarrow, comptes du bloc pour le récapitulatif)
+    """
+    n = fin - debut
+    rng = _rng(graine, FLUX_TRANSACTIONS, debut)
+    risques, eleves = _CLIENTS['risques'], _CLIENTS['eleves']
+
+    # Client aléatoire, biais de 30 % vers les clients à risque élevé
+    client = rng.integers(0, len(risques), n)
+    if len(eleves):
+        biais = rng.random(n) < 0.3
+        client[biais] = eleves[rng.integers(0, len(eleves), int(biais.sum()))]
+
+    # 10 % de dates regroupées (structuring), 31 jours sinon
+    regroupe = rng.random(n) < 0.1
+    jours = jour_debut + np.where(regroupe, np.array([10, 11, 12, 15, 16])[rng.integers(0, 5, n)],
+                                  rng.integers(0, 31, n))
+
+    # 20 % de transactions suspectes : moitié structuring, moitié gros montants
+    suspect = rng.random(n) < 0.2
+    structuring = suspect & (rng.random(n) < 0.5)
+    montant = np.round(np.select([structuring, suspect], [rng.uniform(8000, 9999, n), rng.uniform(50000, 250000, n)],
+                                 default=rng.uniform(100, 50000, n)), 2)
+    pattern = np.select([structuring, suspect], [1, 2], default=0)
+
+    type_operation = np.select(
+        [montant > 20000, montant < 1000],
+        [TYPES_OPERATION.index("Virement"),
+         np.array([TYPES_OPERATION.index(t) for t in ("Paiement", "Retrait", "Prélèvement")])[rng.integers(0, 3, n)]],
+        default=_choix(rng, n, [40, 15, 20, 10, 5, 10]))
+
+    # Contrepartie : 40 % des suspectes sur une liste, compte bancaire généré sinon
+    contreparties = list(CONTREPARTIES_SUSPECTES)
+    listee = suspect & (rng.random(n) < 0.4)
+    code_contrepartie = rng.integers(0, len(contreparties), n)
+    modalites_pays = PAYS_BENEFICIAIRE + [c[:2] for c in contreparties if c[:2] not in PAYS_BENEFICIAIRE]
+    pays = np.where(listee, np.array([modalites_pays.index(c[:2]) for c in contreparties])[code_contrepartie],
+                    rng.integers(0, len(PAYS_BENEFICIAIRE), n))
+    compte = (rng.integers(1000, 10000, n).astype(np.uint64) * np.uint64(10 ** 15)
+              + rng.integers(1000, 10000, n).astype(np.uint64) * np.uint64(10 ** 11)
+              + rng.integers(10 ** 10, 10 ** 11, n).astype(np.uint64))
+    beneficiaire = pc.if_else(
+        pa.array(listee),
+        pc.take(pa.array(contreparties), pa.array(code_contrepartie)),
+        pc.binary_join_element_wise(pc.take(pa.array(modalites_pays), pa.array(pays)),
+                                    pc.cast(pa.array(compte), pa.string()), ''))
+    commentaires = ["Transaction standard"] + [f"Contrepartie à risque: {r}" for r in CONTREPARTIES_SUSPECTES.values()]
+    commentaire = np.where(listee, code_contrepartie + 1, 0)
+    sanctionnee = np.array(["OFAC" in c or "Liste noire" in c for c in commentaires])[commentaire]
+
+    # Statut et priorité : premier cas applicable, dans l'ordre de generate_data.py
+    pays_risque = np.array([p in PAYS_RISQUE for p in modalites_pays])[pays]
+    statut = np.select([pays_risque, montant > 10000, risques[client] == ELEVE, structuring, sanctionnee],
+                       np.arange(5), default=5)
+    priorite = np.array([PRIORITES.index(p) for _, p in STATUTS])[statut]
+
+    pays_code = np.array(modalites_pays)
+    devise = np.select([(pays_code[pays] == "US") | (rng.random(n) < 0.1), pays_code[pays] == "GB",
+                        pays_code[pays] == "CH"], [1, 2, 3], default=_choix(rng, n, [80, 10, 5, 5]))
+    heures = [f"{h:02d}:{m:02d}" for h in range(8, 21) for m in range(60)]
+
+    table = pa.table({
+        "Transaction_ID": pc.binary_join_element_wise(
+            'TXN-', pc.cast(pa.array(np.arange(debut, fin, dtype=np.int64) + 10001), pa.string()), ''),
+        "Date": _dates(jours),
+        "Heure": _categorie(rng.integers(0, len(heures), n), heures),
+        "Client_ID": identifiants_clients(client, _CLIENTS['largeur']),
+        "Type_Operation": _categorie(type_operation, TYPES_OPERATION),
+        "Montant": pa.array(montant),
+        "Devise": _categorie(devise, DEVISES),
+        "Bénéficiaire": beneficiaire,
+        "Pays_Bénéficiaire": _categorie(pays, modalites_pays),
+        "Canal": _categorie(_choix(rng, n, [30, 40, 25, 5]), CANAUX),
+        "Statut_Compliance": _categorie(statut, [s for s, _ in STATUTS]),
+        "Priorité": _categorie(priorite, PRIORITES),
+        "Pattern": _categorie(pattern, PATTERNS),
+        "Commentaire": _categorie(commentaire, commentaires),
+    })
+    comptes = {
+        'critiques': int(np.count_nonzero(priorite == PRIORITES.index("Critique"))),
+        'superieures_10k': int(np.count_nonzero(montant > 10000)),
+        'structuring': int(np.count_nonzero(structuring)),
+        'pays_risque': int(np.count_nonzero(pays_risque)),
+    }
+    return table, comptes
+
+
+def ecrire_csv(table, destination):
+    """Ajoute les lignes d'une table (sans en-tête) à un fichier ouvert en binaire."""
+    # Aucune valeur générée ne contient ';', '"' ni retour à la ligne : pas de guillemets
+    pcsv.write_csv(table, destination, write_options=pcsv.WriteOptions(
+        include_header=False, delimiter=';', quoting_style='none'))
+
+
+def ecrire_bloc_transactions(repertoire, debut, fin, graine, jour_debut):
+    """Génère un bloc dans un processus de travail et l'écrit dans un fichier partiel."""
+    table, comptes = generer_transactions_bloc(debut, fin, graine, jour_debut)
+    chemin = os.path.join(repertoire, f"transactions_{debut:012d}.part")
+    with open(chemin, 'wb') as f:
+        ecrire_csv(table, f)
+    return chemin, comptes
+
+
+def _entete(f, colonnes):
+    f.write((';'.join(colonnes) + '\n').encode('utf-8'))
+
+
+def generer(sortie, nb_clients, nb_transactions, workers=None, taille_bloc=1_000_000, graine=42,
+            date_debut='2024-01-01'):
+    """
+    Écrit clients.csv et transactions.csv dans `sortie`.
+
+    Args:
+        sortie (str): Répertoire de sortie
+        nb_clients (int): Taille du référentiel clients
+        nb_transactions (int): Nombre de transactions
+        workers (int): Processus de génération des transactions (None = nombre de CPU)
+        taille_bloc (int): Lignes par bloc (mémoire d'un processus proportionnelle)
+        graine (int): Graine commune ; un bloc a la graine (graine, flux, début du bloc)
+        date_debut (str): Première date des transactions (et référence des dates d'inscription)
+
+    Returns:
+        dict: Comptes du récapitulatif (critiques, supérieures à 10k, structuring, pays à risque)
+    """
+    os.makedirs(sortie, exist_ok=True)
+    jour_debut = int(np.datetime64(date_debut, 'D').astype(np.int64))
+    largeur = max(3, len(str(nb_clients)))
+
+    # 1. Clients, bloc par bloc dans ce processus ; seul le risque de chaque client est conservé
+    risques = np.empty(nb_clients, dtype=np.int8)
+    with open(os.path.join(sortie, 'clients.csv'), 'wb') as f:
+        _entete(f, COLONNES_CLIENTS)
+        for debut in range(0, nb_clients, taille_bloc):
+            fin = min(debut + taille_bloc, nb_clients)
+            table, risques[debut:fin] = generer_clients_bloc(debut, fin, largeur, graine, jour_debut)
+            ecrire_csv(table, f)
+
+    # 2. Transactions : blocs en parallèle, ajoutés dans l'ordre au fichier final
+    repertoire_parts = os.path.join(sortie, 'transactions.parts')
+    os.makedirs(repertoire_parts, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    totaux = {}
+    blocs = iter(range(0, nb_transactions, taille_bloc))
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(risques, largeur)) as pool, \
+            open(os.path.join(sortie, 'transactions.csv'), 'wb') as f:
+        _entete(f, COLONNES_TRANSACTIONS)
+        # Au plus deux blocs en cours par processus : disque et mémoire bornés
+        en_cours = deque()
+        for debut in blocs:
+            en_cours.append(pool.submit(ecrire_bloc_transactions, repertoire_parts, debut,
+                                        min(debut + taille_bloc, nb_transactions), graine, jour_debut))
+            if len(en_cours) >= 2 * workers:
+                _ajouter(en_cours.popleft(), f, totaux)
+        while en_cours:
+            _ajouter(en_cours.popleft(), f, totaux)
+    os.rmdir(repertoire_parts)
+    return totaux
+
+
+def _ajouter(future, f, totaux):
+    """Ajoute un fichier partiel terminé au fichier final puis le supprime."""
+    chemin, comptes = future.result()
+    with open(chemin, 'rb') as part:
+        shutil.copyfileobj(part, f, 16 * 1024 ** 2)
+    os.remove(chemin)
+    for cle, valeur in comptes.items():
+        totaux[cle] = totaux.get(cle, 0) + valeur
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génération de données de volume pour les tests de charge")
+    parser.add_argument('--clients', type=int, default=100_000)
+    parser.add_argument('--transactions', type=int, default=10_000_000)
+    parser.add_argument('--sortie', default='./volume', help="Répertoire de clients.csv et transactions.csv")
+    parser.add_argument('--workers', type=int, default=None, help="Processus de génération (défaut : nombre de CPU)")
+    parser.add_argument('--chunk-size', type=int, default=1_000_000, help="Lignes par bloc")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--date-debut', default='2024-01-01', help="Première date des transactions")
+    args = parser.parse_args()
+
+    debut = time.perf_counter()
+    totaux = generer(args.sortie, args.clients, args.transactions, args.workers, args.chunk_size,
+                     args.seed, args.date_debut)
+    duree = time.perf_counter() - debut
+
+    tailles = {nom: os.path.getsize(os.path.join(args.sortie, nom)) / 1024 ** 2
+               for nom in ('clients.csv', 'transactions.csv')}
+    print(f"{args.clients:,} clients, {args.transactions:,} transactions en {duree:.1f}s "
+          f"({args.transactions / duree:,.0f} transactions/s)")
+    for nom, taille in tailles.items():
+        print(f"   - {os.path.join(args.sortie, nom)} : {taille:,.1f} Mo")
+    print(f"   - Alertes critiques : {totaux.get('critiques', 0):,}")
+    print(f"   - Transactions > 10k€ : {totaux.get('superieures_10k', 0):,}")
+    print(f"   - Suspicion de structuring : {totaux.get('structuring', 0):,}")
+    print(f"   - Pays à risque : {totaux.get('pays_risque', 0):,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+DONNÉES SYNTHÉTIQUES POUR LES BENCHMARKS
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Génération vectorisée de clients et transactions au schéma
+              du pipeline (mêmes colonnes que src/data/*.csv).
+"""
+
+import numpy as np
+import pandas as pd
+
+PAYS = np.array(["FR", "DE", "IT", "ES", "BE", "NL", "LU", "CH", "RU", "SY", "IR", "KP"])
+POIDS_PAYS = np.array([20, 15, 12, 10, 8, 8, 6, 6, 4, 4, 4, 3], dtype=float)
+
+
+def generer_clients(nb_clients, seed=0):
+    """Génère un référentiel clients (Client_ID, Niveau_Risque, Est_PEP, Pays, Segment)."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Client_ID': [f"CLT-{i:07d}" for i in range(nb_clients)],
+        'Pays': rng.choice(PAYS[:8], nb_clients),
+        'Niveau_Risque': rng.choice(np.array(['Faible', 'Moyen', 'Élevé'], dtype=object), nb_clients, p=[0.5, 0.35, 0.15]),
+        'Segment': rng.choice(np.array(['Comptant', 'Privilege', 'Entreprise', 'Digital'], dtype=object), nb_clients),
+        'Est_PEP': np.where(rng.random(nb_clients) < 0.05, 'Oui', 'Non').astype(object),
+    })
+
+
+def generer_transactions(nb_lignes, clients, nb_jours=30, seed=1):
+    """Génère des transactions rattachées aux clients fournis."""
+    rng = np.random.default_rng(seed)
+    client_ids = clients['Client_ID'].to_numpy(dtype=object)
+    montants = np.where(
+        rng.random(nb_lignes) < 0.2,
+        rng.uniform(8000, 9999, nb_lignes),
+        rng.uniform(100, 150000, nb_lignes)
+    )
+    return pd.DataFrame({
+        'Transaction_ID': np.char.add('TXN-', np.arange(nb_lignes).astype(str)).astype(object),
+        'Date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, nb_jours, nb_lignes), unit='D'),
+        'Client_ID': client_ids[rng.integers(0, len(client_ids), nb_lignes)],
+        'Montant': np.round(montants, 2),
+        'Devise': rng.choice(np.array(['EUR', 'USD', 'GBP', 'CHF'], dtype=object), nb_lignes, p=[0.8, 0.1, 0.05, 0.05]),
+        'Pays_Bénéficiaire': rng.choice(PAYS, nb_lignes, p=POIDS_PAYS / POIDS_PAYS.sum()).astype(object),
+    })
+
+
+def completer_colonnes(transactions, seed=2):
+    """
+    Ajoute les colonnes descriptives du fichier réel (Heure, Type_Operation,
+    Bénéficiaire, Canal, ...) dans l'ordre de src/data/transactions.csv.
+    """
+    rng = np.random.default_rng(seed)
+    nb_lignes = len(transactions)
+    choix = lambda valeurs: rng.choice(np.array(valeurs, dtype=object), nb_lignes)  # noqa: E731
+    heures = rng.integers(0, 24 * 60, nb_lignes)
+    complet = transactions.assign(
+        Heure=np.char.add(np.char.add(np.char.zfill((heures // 60).astype(str), 2), ':'),
+                          np.char.zfill((heures % 60).astype(str), 2)).astype(object),
+        Type_Operation=choix(['Virement', 'Paiement', 'Prélèvement', 'Retrait', 'Conversion']),
+        Bénéficiaire=np.char.add('FR76', rng.integers(10 ** 17, 10 ** 18, nb_lignes).astype(str)).astype(object),
+        Canal=choix(['Agence', 'Internet', 'Mobile', 'Téléphone']),
+        Statut_Compliance=choix(['Vérification seuil réglementaire', 'Suspicion de structuring', 'À traiter']),
+        Priorité=choix(['Basse', 'Moyenne', 'Haute']),
+        Pattern=choix(['NORMAL', 'STRUCTURING', 'SANCTIONS']),
+        Commentaire=choix(['Transaction standard', 'Contrepartie à risque: OFAC Sanctions List']),
+    )
+    colonnes = ['Transaction_ID', 'Date', 'Heure', 'Client_ID', 'Type_Operation', 'Montant', 'Devise',
+                'Bénéficiaire', 'Pays_Bénéficiaire', 'Canal', 'Statut_Compliance', 'Priorité',
+                'Pattern', 'Commentaire']
+    return complet[colonnes]
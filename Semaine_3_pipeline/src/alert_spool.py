@@ -0,0 +1,102 @@
+"""
+TAMPON DISQUE DES ALERTES - MODE FLUX
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Les alertes de chaque morceau sont rangées sur disque par clé
+              de tri (priorité, score) ; le fichier final est la concaténation
+              des paniers dans l'ordre, sans garder les alertes en mémoire.
+              Les paniers existent en CSV et/ou en Parquet selon les formats
+              de sortie demandés.
+"""
+
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+
+from columnar_output import ParquetAppender, require_pyarrow
+
+PRIORITY_ORDER = {'Critique': 3, 'Eleve': 2, 'Moyen': 1, 'Faible': 0}
+
+
+class AlertSpool:
+    """
+    Alertes triées par priorité puis score décroissants, accumulées par morceau.
+
+    Le score ne prend qu'un petit nombre de valeurs (une par combinaison
+    de règles) : chaque couple (priorité, score) a son fichier, alimenté
+    dans l'ordre d'arrivée. L'ordre obtenu est celui d'un tri stable du
+    fichier complet (les niveaux absents de la table de priorité en
+    dernier, comme `sort_values`).
+    """
+
+    def __init__(self, colonnes, formats=('csv',)):
+        self.colonnes = list(colonnes)
+        self.formats = tuple(formats)
+        self.repertoire = tempfile.mkdtemp(prefix='alertes_')
+        self.paniers = {}
+        self.paniers_parquet = {}
+        self.par_niveau = {}
+        self.total = 0
+        self._entetes = self.colonnes
+
+    def __len__(self):
+        return self.total
+
+    def add(self, alerts_df):
+        """Ajoute les alertes d'un morceau."""
+        if len(alerts_df) == 0:
+            return
+        alerts_df = alerts_df[[col for col in self.colonnes if col in alerts_df.columns]]
+        priorites = alerts_df['Niveau_Alerte'].map(PRIORITY_ORDER).fillna(-1).astype(int)
+
+        for (priorite, score), groupe in alerts_df.groupby([priorites, alerts_df['Score_Risque']], sort=False):
+            if 'csv' in self.formats:
+                chemin = self.paniers.setdefault(
+                    (priorite, score), os.path.join(self.repertoire, f"{priorite}_{score}.csv")
+                )
+                groupe.to_csv(chemin, sep=';', index=False, encoding='utf-8', mode='a', header=False)
+            if 'parquet' in self.formats:
+                if (priorite, score) not in self.paniers_parquet:
+                    self.paniers_parquet[(priorite, score)] = ParquetAppender(
+                        os.path.join(self.repertoire, f"{priorite}_{score}.parquet")
+                    )
+                self.paniers_parquet[(priorite, score)].write(groupe)
+
+        for niveau, count in alerts_df['Niveau_Alerte'].value_counts().items():
+            self.par_niveau[niveau] = self.par_niveau.get(niveau, 0) + int(count)
+        self.total += len(alerts_df)
+        self._entetes = list(alerts_df.columns)
+
+    def write(self, output_path):
+        """Écrit le fichier d'alertes CSV trié."""
+        with open(output_path, 'w', encoding='utf-8', newline='') as sortie:
+            pd.DataFrame(columns=self._entetes).to_csv(sortie, sep=';', index=False)
+            for cle in sorted(self.paniers, reverse=True):
+                with open(self.paniers[cle], 'r', encoding='utf-8', newline='') as panier:
+                    shutil.copyfileobj(panier, sortie)
+
+    def write_parquet(self, output_path):
+        """Écrit le fichier d'alertes Parquet trié (paniers relus par groupes de lignes)."""
+        pa, pq = require_pyarrow()
+        sortie = ParquetAppender(output_path)
+        try:
+            for cle in sorted(self.paniers_parquet, reverse=True):
+                panier = self.paniers_parquet[cle]
+                panier.close()
+                for lot in pq.ParquetFile(panier.chemin).iter_batches():
+                    sortie.write_table(pa.Table.from_batches([lot]))
+        finally:
+            sortie.close()
+
+    def close(self):
+        """Supprime les fichiers temporaires."""
+        for panier in self.paniers_parquet.values():
+            panier.close()
+        shutil.rmtree(self.repertoire, ignore_errors=True)
+        self.paniers = {}
+        self.paniers_parquet = {}
+
+    def level_counts(self):
+        """Nombre d'alertes par niveau (effectif décroissant, comme value_counts)."""
+        return dict(sorted(self.par_niveau.items(), key=lambda item: -item[1]))
@@ -0,0 +1,199 @@
+"""
+INDEX DES LISTES NOIRES - FILTRAGE DES CONTREPARTIES
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Index haché trié des listes noires (OFAC, UE, interne),
+              persisté sur disque et chargé en mémoire mappée, pour un test
+              d'appartenance vectorisé sur toute une colonne.
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Clé fixe : les empreintes doivent être identiques d'une exécution à l'autre
+CLE_HACHAGE = "bnp-listes-noire"
+VERSION_INDEX = 1
+
+
+def _normaliser(valeur):
+    if isinstance(valeur, str):
+        return valeur.upper().replace(' ', '')
+    if valeur is None or valeur != valeur:
+        return ''
+    return str(valeur).upper().replace(' ', '')
+
+
+def normaliser_identifiants(valeurs):
+    """Normalise des identifiants (majuscules, sans espaces ; '' pour les valeurs manquantes)."""
+    return np.array([_normaliser(v) for v in valeurs], dtype=object)
+
+
+def hacher_identifiants(valeurs):
+    """
+    Empreintes 64 bits stables d'identifiants normalisés (0 pour les valeurs vides).
+
+    Seules les valeurs distinctes sont normalisées et hachées : une colonne
+    de contreparties répétées ne crée pas une chaîne normalisée par ligne.
+    """
+    if not isinstance(valeurs, (pd.Series, pd.Index, np.ndarray)):
+        valeurs = np.asarray(valeurs, dtype=object)
+    codes, distinctes = pd.factorize(valeurs)
+    normalises = normaliser_identifiants(distinctes)
+    empreintes = pd.util.hash_array(normalises, hash_key=CLE_HACHAGE, categorize=False)
+    empreintes[normalises == ''] = 0
+    # Code -1 (valeur manquante) : dernière case, empreinte nulle
+    return np.append(empreintes, np.uint64(0))[codes]
+
+
+def lire_liste(source):
+    """Retourne les entrées d'une liste (liste en ligne ou chemin de fichier, une entrée par ligne)."""
+    if isinstance(source, str):
+        with open(source, 'r', encoding='utf-8') as f:
+            return [ligne.strip() for ligne in f if ligne.strip()]
+    return list(source)
+
+
+class BlacklistIndex:
+    """
+    Index haché des listes noires.
+
+    L'index est un tableau trié d'empreintes 64 bits et un tableau parallèle
+    de bits de listes (bit i = présence dans la i-ème liste). Une recherche
+    est un `searchsorted` sur toute la colonne à contrôler. Le risque de
+    collision entre empreintes 64 bits est négligeable pour des listes de
+    quelques centaines de milliers d'entrées.
+    """
+
+    def __init__(self, empreintes, bits_listes, noms_listes):
+        self.empreintes = empreintes
+        self.bits_listes = bits_listes
+        self.noms_listes = list(noms_listes)
+
+    def __len__(self):
+        return len(self.empreintes)
+
+    @classmethod
+    def build(cls, listes):
+        """
+        Construit l'index à partir des listes noires de la configuration.
+
+        Args:
+            listes (dict): Nom de liste -> liste d'identifiants ou chemin de fichier
+
+        Returns:
+            BlacklistIndex: Index construit en mémoire
+        """
+        noms = list(listes)
+        if len(noms) > 8:
+            raise ValueError("L'index des listes noires supporte au plus 8 listes")
+
+        morceaux_empreintes = []
+        morceaux_bits = []
+        for i, nom in enumerate(noms):
+            empreintes = hacher_identifiants(lire_liste(listes[nom]))
+            empreintes = empreintes[empreintes != 0]
+            morceaux_empreintes.append(empreintes)
+            morceaux_bits.append(np.full(len(empreintes), 1 << i, dtype=np.uint8))
+
+        empreintes = np.concatenate(morceaux_empreintes) if noms else np.empty(0, dtype=np.uint64)
+        bits = np.concatenate(morceaux_bits) if noms else np.empty(0, dtype=np.uint8)
+
+        # Tri puis fusion des doublons (une entrée peut figurer dans plusieurs listes)
+        ordre = np.argsort(empreintes, kind='stable')
+        empreintes, bits = empreintes[ordre], bits[ordre]
+        debut = np.ones(len(empreintes), dtype=bool)
+        debut[1:] = empreintes[1:] != empreintes[:-1]
+        positions = np.flatnonzero(debut)
+        bits = np.bitwise_or.reduceat(bits, positions) if len(positions) else bits
+
+        return cls(empreintes[positions], bits, noms)
+
+    @staticmethod
+    def empreinte_config(listes):
+        """Empreinte du contenu des listes (les fichiers sont identifiés par chemin, taille et date)."""
+        description = {}
+        for nom, source in listes.items():
+            if isinstance(source, str):
+                stat = os.stat(source)
+                description[nom] = [os.path.abspath(source), stat.st_size, stat.st_mtime_ns]
+            else:
+                description[nom] = sorted(str(v) for v in source)
+        contenu = json.dumps([VERSION_INDEX, description], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(contenu.encode('utf-8')).hexdigest()[:16]
+
+    def save(self, prefixe):
+        """Persiste l'index sous forme de fichiers .npy (mappables) et d'un fichier de métadonnées."""
+        np.save(f"{prefixe}_empreintes.npy", self.empreintes)
+        np.save(f"{prefixe}_listes.npy", self.bits_listes)
+        with open(f"{prefixe}.json", 'w', encoding='utf-8') as f:
+            json.dump({'version': VERSION_INDEX, 'listes': self.noms_listes,
+                       'nb_entrees': len(self)}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, prefixe):
+        """Charge un index persisté en mémoire mappée (coût quasi nul)."""
+        with open(f"{prefixe}.json", 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        return cls(
+            np.load(f"{prefixe}_empreintes.npy", mmap_mode='r'),
+            np.load(f"{prefixe}_listes.npy", mmap_mode='r'),
+            meta['listes']
+        )
+
+    @classmethod
+    def load_or_build(cls, listes, index_dir=None):
+        """
+        Charge l'index correspondant aux listes, ou le construit et le persiste.
+
+        Args:
+            listes (dict): Section `listes_noires` de la configuration
+            index_dir (str): Répertoire de persistance (None = index en mémoire seulement)
+
+        Returns:
+            BlacklistIndex: Index prêt pour la recherche
+        """
+        if index_dir is None:
+            return cls.build(listes)
+
+        prefixe = os.path.join(index_dir, f"listes_noires_{cls.empreinte_config(listes)}")
+        if os.path.exists(f"{prefixe}.json"):
+            index = cls.load(prefixe)
+            logger.info(f"Index listes noires chargé : {len(index)} entrées ({prefixe})")
+            return index
+
+        index = cls.build(listes)
+        os.makedirs(index_dir, exist_ok=True)
+        index.save(prefixe)
+        logger.info(f"Index listes noires construit : {len(index)} entrées ({prefixe})")
+        return index
+
+    def lookup(self, valeurs):
+        """
+        Recherche vectorisée des valeurs dans l'index.
+
+        Args:
+            valeurs (array-like): Identifiants à contrôler (ex. colonne Bénéficiaire)
+
+        Returns:
+            ndarray: Bits des listes contenant chaque valeur (0 = absente)
+        """
+        empreintes = hacher_identifiants(valeurs)
+        resultat = np.zeros(len(empreintes), dtype=np.uint8)
+        if len(self.empreintes) == 0:
+            return resultat
+
+        positions = np.searchsorted(self.empreintes, empreintes)
+        np.minimum(positions, len(self.empreintes) - 1, out=positions)
+        trouve = (np.asarray(self.empreintes[positions]) == empreintes) & (empreintes != 0)
+        resultat[trouve] = self.bits_listes[positions[trouve]]
+        return resultat
+
+    def bit_liste(self, nom):
+        """Bit associé à une liste de l'index."""
+        return 1 << self.noms_listes.index(nom)
@@ -0,0 +1,193 @@
+"""
+POINTS DE REPRISE DU PIPELINE
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Sauvegarde du résultat des étapes longues (transactions
+              nettoyées et enrichies, puis scorées par les règles) au format
+              Arrow IPC, avec un identifiant d'exécution et l'empreinte des
+              fichiers d'entrée. Après un échec (rapports, timeout Blue
+              Prism), une relance avec --resume repart de la dernière étape
+              terminée au lieu de tout recalculer, si les entrées n'ont pas
+              changé. Les points de reprise sont supprimés après une
+              exécution réussie.
+"""
+
+import json
+import logging
+import os
+import uuid
+from datetime import datetime
+
+from columnar_output import require_pyarrow
+from input_cache import empreinte_fichier, _json_defaut
+
+logger = logging.getLogger(__name__)
+
+# À incrémenter si le contenu d'une étape change (les points existants sont ignorés)
+VERSION_REPRISE = 2
+MANIFESTE = 'reprise.json'
+EXTENSION = '.arrow'
+# Étapes sauvegardées, dans l'ordre d'exécution
+ETAPES = ('enrichi', 'score')
+
+
+class CheckpointStore:
+    """
+    Répertoire de points de reprise d'une exécution.
+
+    `reprise.json` décrit l'exécution (identifiant, empreintes des entrées)
+    et les étapes terminées ; chaque étape range ses tables dans
+    `<étape>.<table>.arrow`. Tables et manifeste sont écrits dans un fichier
+    temporaire puis remplacés : une étape interrompue pendant l'écriture
+    n'est pas inscrite et sera recalculée. Seule la dernière étape sert à la
+    reprise : les tables des étapes précédentes sont alors supprimées.
+    L'empreinte d'un fichier n'est recalculée que si sa taille ou sa date a
+    changé.
+    """
+
+    def __init__(self, repertoire):
+        require_pyarrow()
+        self.repertoire = repertoire
+        self.manifeste = None
+        os.makedirs(repertoire, exist_ok=True)
+
+    @property
+    def run_id(self):
+        """Identifiant de l'exécution dont les étapes sont sauvegardées."""
+        return self.manifeste['run_id'] if self.manifeste else None
+
+    def open(self, entrees, resume=False):
+        """
+        Prépare les points de reprise de l'exécution.
+
+        Args:
+            entrees (dict): Nom -> fichier dont dépendent les résultats
+                (transactions, clients, configuration, taux...) ; les
+                chemins None ou absents sont ignorés
+            resume (bool): Reprendre l'exécution précédente si ses entrées sont identiques
+
+        Returns:
+            str: Dernière étape terminée à reprendre (None = exécution complète)
+        """
+        precedent = self._lire_manifeste()
+        empreintes = self._empreintes(entrees, precedent)
+
+        if resume and precedent is not None:
+            identiques = (precedent.get('version') == VERSION_REPRISE and
+                          {nom: e['sha256'] for nom, e in precedent.get('empreintes', {}).items()} ==
+                          {nom: e['sha256'] for nom, e in empreintes.items()})
+            etapes = [etape for etape in ETAPES if etape in precedent.get('etapes', {})]
+            if identiques and etapes:
+                self.manifeste = {**precedent, 'empreintes': empreintes}
+                self._ecrire_manifeste()
+                logger.info(f"Reprise de l'execution {self.run_id} apres l'etape '{etapes[-1]}'")
+                return etapes[-1]
+            if not identiques:
+                logger.warning(f"Points de reprise de l'execution {precedent.get('run_id')} ignores : "
+                               "entrees modifiees depuis")
+        elif resume:
+            logger.info("Aucun point de reprise : execution complete")
+
+        self.clear()
+        self.manifeste = {
+            'version': VERSION_REPRISE,
+            'run_id': f"{datetime.now():%Y%m%d_%H%M%S}_{uuid.uuid4().hex[:8]}",
+            'cree_le': datetime.now().isoformat(),
+            'empreintes': empreintes,
+            'etapes': {},
+        }
+        self._ecrire_manifeste()
+        return None
+
+    def _empreintes(self, entrees, precedent):
+        """Empreinte SHA-256 de chaque entrée (reprise du manifeste si le fichier est inchangé)."""
+        connues = (precedent or {}).get('empreintes', {})
+        empreintes = {}
+        for nom, chemin in entrees.items():
+            if not chemin or not os.path.exists(chemin):
+                continue
+            stat = os.stat(chemin)
+            signature = {'chemin': os.path.abspath(chemin), 'taille': stat.st_size, 'modifie_ns': stat.st_mtime_ns}
+            connue = connues.get(nom)
+            if connue is not None and all(connue.get(cle) == valeur for cle, valeur in signature.items()):
+                empreintes[nom] = connue
+            else:
+                empreintes[nom] = {**signature, 'sha256': empreinte_fichier(chemin)}
+        return empreintes
+
+    def save(self, etape, tables, metadonnees=None):
+        """
+        Sauvegarde une étape terminée, l'inscrit dans le manifeste puis
+        supprime les étapes précédentes.
+
+        Args:
+            etape (str): Étape (voir ETAPES)
+            tables (dict): Nom -> DataFrame (les valeurs None sont ignorées)
+            metadonnees (dict): Données JSON nécessaires à la reprise (statistiques...)
+        """
+        pa, _ = require_pyarrow()
+        lignes = {}
+        for nom, df in tables.items():
+            if df is None:
+                continue
+            table = pa.Table.from_pandas(df, preserve_index=True)
+            chemin = self._chemin(etape, nom)
+            temporaire = f"{chemin}.tmp"
+            with pa.OSFile(temporaire, 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(temporaire, chemin)
+            lignes[nom] = len(df)
+        self.manifeste['etapes'][etape] = {
+            'termine_le': datetime.now().isoformat(),
+            'tables': lignes,
+            'metadonnees': metadonnees or {},
+        }
+        precedentes = [nom for nom in self.manifeste['etapes'] if nom != etape]
+        for nom in precedentes:
+            for table in self.manifeste['etapes'].pop(nom)['tables']:
+                os.remove(self._chemin(nom, table))
+        self._ecrire_manifeste()
+        logger.info(f"Point de reprise '{etape}' sauvegarde ({self.run_id}, "
+                    f"{', '.join(f'{nom} {n}' for nom, n in lignes.items())} lignes)")
+
+    def load(self, etape):
+        """
+        Tables et métadonnées d'une étape sauvegardée.
+
+        Returns:
+            tuple: (dict nom -> DataFrame, métadonnées)
+        """
+        pa, _ = require_pyarrow()
+        description = self.manifeste['etapes'][etape]
+        tables = {}
+        for nom in description['tables']:
+            with pa.memory_map(self._chemin(etape, nom), 'r') as source:
+                table = pa.ipc.open_file(source).read_all()
+                # Conversion avant fermeture : la table référence le fichier mappé
+                tables[nom] = table.to_pandas(split_blocks=True)
+            del table
+        return tables, description['metadonnees']
+
+    def clear(self):
+        """Supprime les points de reprise (exécution réussie ou entrées modifiées)."""
+        for nom in os.listdir(self.repertoire):
+            if nom.startswith(MANIFESTE) or nom.endswith((EXTENSION, f"{EXTENSION}.tmp")):
+                os.remove(os.path.join(self.repertoire, nom))
+        self.manifeste = None
+
+    def _chemin(self, etape, nom):
+        return os.path.join(self.repertoire, f"{etape}.{nom}{EXTENSION}")
+
+    def _lire_manifeste(self):
+        try:
+            with open(os.path.join(self.repertoire, MANIFESTE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _ecrire_manifeste(self):
+        chemin = os.path.join(self.repertoire, MANIFESTE)
+        temporaire = f"{chemin}.tmp"
+        with open(temporaire, 'w', encoding='utf-8') as f:
+            json.dump(self.manifeste, f, ensure_ascii=False, indent=2, default=_json_defaut)
+        os.replace(temporaire, chemin)
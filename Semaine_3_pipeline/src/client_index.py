@@ -0,0 +1,96 @@
+"""
+INDEX DU RÉFÉRENTIEL CLIENTS
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Référentiel clients construit une fois par exécution :
+              Client_ID -> code entier, attributs stockés en tableaux
+              catégoriels. Les consommateurs (enrichissement, règles)
+              récupèrent les attributs par simple indexation, sans jointure.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+ATTRIBUTS_CLIENT = ['Niveau_Risque', 'Est_PEP', 'Pays', 'Segment']
+
+
+class ClientIndex:
+    """Référentiel clients indexé par Client_ID (un code entier par client)."""
+
+    def __init__(self, clients_df, attributs=ATTRIBUTS_CLIENT):
+        """
+        Construit l'index à partir du DataFrame clients.
+
+        Args:
+            clients_df (DataFrame): Référentiel clients (colonne Client_ID requise)
+            attributs (list): Attributs à indexer (ignorés s'ils sont absents)
+        """
+        # Un Client_ID en double garde sa première occurrence
+        uniques = clients_df.drop_duplicates(subset=['Client_ID'])
+        uniques = uniques[uniques['Client_ID'].notna()]
+
+        self.index = pd.Index(uniques['Client_ID'].to_numpy())
+        self.attributs = {
+            col: pd.Categorical(uniques[col].to_numpy())
+            for col in attributs if col in uniques.columns
+        }
+
+        logger.info(f"Index clients construit : {len(self.index)} clients, attributs {list(self.attributs)}")
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, colonne):
+        return colonne in self.attributs
+
+    def codes(self, client_ids):
+        """
+        Code entier de chaque Client_ID (position dans le référentiel).
+
+        Args:
+            client_ids (array-like): Client_ID des transactions
+
+        Returns:
+            ndarray: Codes int64, -1 pour les clients absents du référentiel
+        """
+        return self.index.get_indexer(client_ids)
+
+    def gather(self, colonne, codes, defaut=None):
+        """
+        Attribut client aligné sur des codes (valeur `defaut` si absent ou manquant).
+
+        Returns:
+            Categorical: Valeurs de l'attribut pour chaque code
+        """
+        attribut = self.attributs[colonne]
+        codes_attribut = self._codes_attribut(attribut, codes)
+        categories = attribut.categories
+
+        if defaut is not None:
+            if defaut not in categories:
+                categories = categories.append(pd.Index([defaut]))
+                codes_attribut = codes_attribut.astype(
+                    np.promote_types(codes_attribut.dtype, np.min_scalar_type(-len(categories)))
+                )
+            codes_attribut[codes_attribut == -1] = categories.get_loc(defaut)
+
+        return pd.Categorical.from_codes(codes_attribut, categories=categories)
+
+    def mask(self, colonne, codes, valeur):
+        """Masque booléen `attribut == valeur`, calculé sur les codes entiers."""
+        attribut = self.attributs[colonne]
+        cible = attribut.categories.get_indexer([valeur])[0]
+        if cible < 0:
+            return np.zeros(len(codes), dtype=bool)
+        return self._codes_attribut(attribut, codes) == cible
+
+    @staticmethod
+    def _codes_attribut(attribut, codes):
+        codes = np.asarray(codes)
+        resultat = np.full(len(codes), -1, dtype=attribut.codes.dtype)
+        trouve = codes >= 0
+        resultat[trouve] = attribut.codes[codes[trouve]]
+        return resultat
@@ -0,0 +1,209 @@
+"""
+ÉTAT CLIENT PERSISTÉ - TRAITEMENT JOURNALIER INCRÉMENTAL
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Historique compact par client conservé entre deux exécutions :
+              statistiques de montants (nombre, moyenne, M2 de Welford),
+              dernier jour d'activité et agrégats (client, jour) des derniers
+              jours pour les fenêtres de structuring. Une exécution
+              journalière ne lit que le fichier du jour puis fusionne son
+              résumé dans l'état.
+"""
+
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+from structuring import NAT_JOUR, StructuringState
+
+logger = logging.getLogger(__name__)
+
+VERSION_ETAT = 1
+
+
+class ClientStateStore:
+    """
+    Historique par client, indexé par Client_ID.
+
+    Les statistiques de montants sont fusionnées par la formule de Chan
+    (moyenne et M2 de deux lots), donc indépendamment de l'ordre et du
+    découpage des lots. Les fenêtres de structuring ne gardent que les
+    `periode_jours - 1` derniers jours, seuls utiles à la prochaine
+    exécution.
+    """
+
+    def __init__(self, client_ids=(), nb=None, moyenne=None, m2=None, dernier_jour=None,
+                 fenetres=None, dernier_jour_traite=None):
+        # Identifiants stockés en texte (format du fichier persisté)
+        self.index = pd.Index(np.asarray(client_ids, dtype=object).astype(str), dtype=object)
+        taille = len(self.index)
+        self.nb = np.zeros(taille, dtype=np.int64) if nb is None else np.asarray(nb, dtype=np.int64)
+        self.moyenne = np.zeros(taille) if moyenne is None else np.asarray(moyenne, dtype=np.float64)
+        self.m2 = np.zeros(taille) if m2 is None else np.asarray(m2, dtype=np.float64)
+        self.dernier_jour = (np.full(taille, NAT_JOUR, dtype=np.int64) if dernier_jour is None
+                             else np.asarray(dernier_jour, dtype=np.int64))
+        # Agrégats de structuring : (code client, jour, nombre, total) triés par (code, jour)
+        vide = np.empty(0, dtype=np.int64)
+        self.fenetres = fenetres if fenetres is not None else (vide, vide, vide, np.empty(0))
+        self.dernier_jour_traite = dernier_jour_traite
+        # Premier jour des lots fusionnés (non persisté, sert au contrôle des rejeux)
+        self.premier_jour = None
+
+    def __len__(self):
+        return len(self.index)
+
+    @classmethod
+    def from_transactions(cls, client_ids, jours, montants, detector=None):
+        """
+        Résume un lot de transactions nettoyées.
+
+        Args:
+            client_ids (array-like): Client_ID des transactions
+            jours (ndarray): Numéro de jour int64 (NaT = NAT_JOUR)
+            montants (ndarray): Montants float64
+            detector (StructuringDetector): Détecteur dont les agrégats sont conservés (optionnel)
+
+        Returns:
+            ClientStateStore: État du lot seul
+        """
+        client_ids = pd.Series(client_ids).reset_index(drop=True)
+        jours = np.asarray(jours, dtype=np.int64)
+        montants = np.asarray(montants, dtype=np.float64)
+
+        codes, uniques = pd.factorize(client_ids)
+        valide = (codes >= 0) & ~np.isnan(montants)
+        lot = pd.DataFrame({'code': codes[valide], 'montant': montants[valide]})
+        groupes = lot.groupby('code')['montant']
+        agregat = groupes.agg(['count', 'mean', 'var'])
+
+        # NAT_JOUR est le plus petit int64 : le maximum ignore les dates manquantes
+        dernier = pd.Series(jours[codes >= 0]).groupby(codes[codes >= 0]).max()
+
+        etat = cls(
+            uniques.to_numpy(dtype=object),
+            nb=agregat['count'].reindex(range(len(uniques)), fill_value=0).to_numpy(),
+            moyenne=agregat['mean'].reindex(range(len(uniques)), fill_value=0.0).to_numpy(),
+            m2=(agregat['var'].fillna(0.0) * (agregat['count'] - 1)).reindex(
+                range(len(uniques)), fill_value=0.0).to_numpy(),
+            dernier_jour=dernier.reindex(range(len(uniques)), fill_value=NAT_JOUR).to_numpy(),
+        )
+
+        jours_connus = jours[jours != NAT_JOUR]
+        if len(jours_connus):
+            etat.premier_jour = int(jours_connus.min())
+            etat.dernier_jour_traite = int(jours_connus.max())
+
+        if detector is not None:
+            candidats = (montants < detector.seuil) & (jours != NAT_JOUR) & (codes >= 0)
+            etat.fenetres = StructuringState._agreger(
+                codes[candidats], jours[candidats],
+                np.ones(int(candidats.sum()), dtype=np.int64), montants[candidats]
+            )
+        return etat
+
+    def merge(self, autre, periode_jours=1):
+        """
+        Fusionne l'état d'un nouveau lot (ex. le fichier du jour).
+
+        Args:
+            autre (ClientStateStore): État du lot à intégrer
+            periode_jours (int): Fenêtre de structuring (jours d'agrégats conservés)
+        """
+        # 1. Union des clients
+        nouveaux = autre.index[self.index.get_indexer(autre.index) < 0]
+        if len(nouveaux):
+            self.index = self.index.append(nouveaux)
+            extension = len(nouveaux)
+            self.nb = np.concatenate((self.nb, np.zeros(extension, dtype=np.int64)))
+            self.moyenne = np.concatenate((self.moyenne, np.zeros(extension)))
+            self.m2 = np.concatenate((self.m2, np.zeros(extension)))
+            self.dernier_jour = np.concatenate((self.dernier_jour, np.full(extension, NAT_JOUR, dtype=np.int64)))
+        positions = self.index.get_indexer(autre.index)
+
+        # 2. Statistiques de montants (Chan et al.)
+        na, nb = self.nb[positions], autre.nb
+        total = na + nb
+        delta = autre.moyenne - self.moyenne[positions]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            poids = np.where(total > 0, nb / np.maximum(total, 1), 0.0)
+        self.moyenne[positions] = self.moyenne[positions] + delta * poids
+        self.m2[positions] = self.m2[positions] + autre.m2 + delta ** 2 * na * poids
+        self.nb[positions] = total
+        self.dernier_jour[positions] = np.maximum(self.dernier_jour[positions], autre.dernier_jour)
+
+        # 3. Fenêtres de structuring : codes ramenés à l'index fusionné, puis élagage
+        a_codes, a_jours, a_nb, a_totaux = autre.fenetres
+        codes, jours, nbs, totaux = (np.concatenate(parts) for parts in zip(
+            self.fenetres, (positions[a_codes], a_jours, a_nb, a_totaux)
+        ))
+        codes, jours, nbs, totaux = StructuringState._agreger(codes, jours, nbs, totaux)
+
+        if autre.premier_jour is not None:
+            self.premier_jour = (autre.premier_jour if self.premier_jour is None
+                                 else min(self.premier_jour, autre.premier_jour))
+        if self.dernier_jour_traite is None:
+            self.dernier_jour_traite = autre.dernier_jour_traite
+        elif autre.dernier_jour_traite is not None:
+            self.dernier_jour_traite = max(self.dernier_jour_traite, autre.dernier_jour_traite)
+        if self.dernier_jour_traite is not None:
+            garde = jours > self.dernier_jour_traite - (periode_jours - 1)
+            codes, jours, nbs, totaux = codes[garde], jours[garde], nbs[garde], totaux[garde]
+        self.fenetres = (codes, jours, nbs, totaux)
+
+    def history(self, client_ids):
+        """
+        Historique aligné sur des transactions.
+
+        Returns:
+            tuple: (nombre de transactions passées, montant moyen passé) ; 0 et NaN si inconnu
+        """
+        positions = self.index.get_indexer(pd.Series(client_ids).astype(str))
+        connu = positions >= 0
+        nb = np.zeros(len(positions), dtype=np.int64)
+        moyenne = np.full(len(positions), np.nan)
+        nb[connu] = self.nb[positions[connu]]
+        moyenne[connu] = self.moyenne[positions[connu]]
+        return nb, moyenne
+
+    def structuring_aggregates(self):
+        """Agrégats (Client_ID, jour, nombre, total) des derniers jours, pour amorcer le structuring."""
+        codes, jours, nbs, totaux = self.fenetres
+        return self.index.to_numpy()[codes], jours, nbs, totaux
+
+    def save(self, chemin):
+        """Persiste l'état (écriture dans un fichier temporaire puis remplacement atomique)."""
+        os.makedirs(os.path.dirname(os.path.abspath(chemin)), exist_ok=True)
+        codes, jours, nbs, totaux = self.fenetres
+        temporaire = f"{chemin}.tmp.npz"
+        np.savez(
+            temporaire,
+            client_ids=self.index.to_numpy(dtype=str),
+            nb=self.nb, moyenne=self.moyenne, m2=self.m2, dernier_jour=self.dernier_jour,
+            fenetre_codes=codes, fenetre_jours=jours, fenetre_nb=nbs, fenetre_totaux=totaux,
+            meta=np.array(json.dumps({'version': VERSION_ETAT,
+                                      'dernier_jour_traite': self.dernier_jour_traite}))
+        )
+        os.replace(temporaire, chemin)
+
+    @classmethod
+    def load(cls, chemin):
+        """Charge l'état persisté, ou un état vide si le fichier n'existe pas."""
+        if not os.path.exists(chemin):
+            logger.info(f"Aucun etat client existant ({chemin}), historique vide")
+            return cls()
+
+        with np.load(chemin) as donnees:
+            meta = json.loads(str(donnees['meta']))
+            if meta.get('version') != VERSION_ETAT:
+                raise ValueError(f"Version d'état client non supportée : {meta.get('version')}")
+            etat = cls(
+                donnees['client_ids'].astype(object), donnees['nb'], donnees['moyenne'],
+                donnees['m2'], donnees['dernier_jour'],
+                fenetres=(donnees['fenetre_codes'], donnees['fenetre_jours'],
+                          donnees['fenetre_nb'], donnees['fenetre_totaux']),
+                dernier_jour_traite=meta.get('dernier_jour_traite')
+            )
+        logger.info(f"Etat client charge : {len(etat)} clients, {len(etat.fenetres[0])} agregats client-jour")
+        return etat
@@ -0,0 +1,135 @@
+"""
+SORTIES COLONNAIRES (PARQUET) ET MANIFESTE
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Écriture des fichiers de sortie au format Parquet (typé,
+              compressé, lisible colonne par colonne) en plus ou à la place
+              du CSV, et manifeste JSON décrivant les fichiers générés.
+              pyarrow n'est requis que si le format Parquet est demandé.
+"""
+
+import json
+import os
+from datetime import datetime
+
+FORMATS_SORTIE = ('csv', 'parquet', 'both')
+COMPRESSION_PARQUET = 'zstd'
+MANIFESTE = 'manifest.json'
+
+
+def require_pyarrow():
+    """Importe pyarrow à la demande (dépendance optionnelle)."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Le format parquet nécessite pyarrow (pip install pyarrow)") from e
+    return pa, pq
+
+
+def formats_actifs(output_format):
+    """Formats de fichiers à écrire pour l'option --output-format."""
+    if output_format not in FORMATS_SORTIE:
+        raise ValueError(f"Format de sortie inconnu : {output_format} (attendu : {', '.join(FORMATS_SORTIE)})")
+    return ('csv', 'parquet') if output_format == 'both' else (output_format,)
+
+
+def _schema_stable(schema):
+    """
+    Schéma commun à tous les morceaux d'un fichier.
+
+    Une colonne texte entièrement vide dans le premier morceau est typée
+    `null` par pyarrow : elle est ramenée au texte. Les index des
+    dictionnaires (colonnes catégorielles) sont fixés en int32, leur
+    largeur variant sinon avec le nombre de modalités du morceau.
+    """
+    pa, _ = require_pyarrow()
+    champs = []
+    for champ in schema:
+        if pa.types.is_null(champ.type):
+            champ = champ.with_type(pa.string())
+        elif pa.types.is_dictionary(champ.type):
+            champ = champ.with_type(pa.dictionary(pa.int32(), champ.type.value_type))
+        champs.append(champ)
+    return pa.schema(champs, metadata=schema.metadata)
+
+
+class ParquetAppender:
+    """Fichier Parquet écrit par morceaux (un groupe de lignes par appel)."""
+
+    def __init__(self, chemin):
+        self.chemin = chemin
+        self.schema = None
+        self.lignes = 0
+        self._writer = None
+
+    def write(self, df, colonnes=None):
+        """Ajoute un DataFrame (colonnes choisies, None = toutes) ; le schéma est fixé par le premier."""
+        pa, _ = require_pyarrow()
+        self.write_table(pa.Table.from_pandas(df, columns=colonnes, preserve_index=False))
+
+    def write_table(self, table):
+        """Ajoute une table Arrow (convertie au schéma du fichier)."""
+        _, pq = require_pyarrow()
+        if self._writer is None:
+            self.schema = _schema_stable(table.schema)
+            self._writer = pq.ParquetWriter(self.chemin, self.schema, compression=COMPRESSION_PARQUET)
+        self._writer.write_table(table.cast(self.schema))
+        self.lignes += table.num_rows
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def write_parquet(df, chemin, colonnes=None):
+    """Écrit un DataFrame complet au format Parquet (colonnes choisies, None = toutes)."""
+    appender = ParquetAppender(chemin)
+    try:
+        appender.write(df, colonnes)
+    finally:
+        appender.close()
+
+
+def _description(output_dir, nom, lignes):
+    """Entrée du manifeste : format, taille, lignes et types des colonnes."""
+    chemin = os.path.join(output_dir, nom)
+    entree = {
+        'fichier': nom,
+        'format': os.path.splitext(nom)[1].lstrip('.'),
+        'taille_octets': os.path.getsize(chemin),
+    }
+    if entree['format'] == 'parquet':
+        _, pq = require_pyarrow()
+        metadonnees = pq.read_metadata(chemin)
+        entree['lignes'] = metadonnees.num_rows
+        entree['colonnes'] = {champ.name: str(champ.type) for champ in metadonnees.schema.to_arrow_schema()}
+    elif entree['format'] == 'csv':
+        with open(chemin, 'r', encoding='utf-8') as f:
+            entete = f.readline().rstrip('\r\n')
+        entree['lignes'] = lignes
+        entree['colonnes'] = entete.split(';') if entete else []
+    return entree
+
+
+def write_manifest(output_dir, fichiers):
+    """
+    Écrit manifest.json listant les fichiers générés.
+
+    Args:
+        output_dir (str): Répertoire de sortie
+        fichiers (dict): Nom de fichier -> nombre de lignes (None si non compté),
+                         dans l'ordre d'écriture
+
+    Returns:
+        str: Chemin du manifeste
+    """
+    manifeste = {
+        'timestamp': datetime.now().isoformat(),
+        'fichiers': [_description(output_dir, nom, lignes) for nom, lignes in fichiers.items()
+                     if os.path.exists(os.path.join(output_dir, nom))],
+    }
+    chemin = os.path.join(output_dir, MANIFESTE)
+    with open(chemin, 'w', encoding='utf-8') as f:
+        json.dump(manifeste, f, ensure_ascii=False, indent=2)
+    return chemin
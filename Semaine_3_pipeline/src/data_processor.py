@@ -8,6 +8,18 @@ Description : Module de chargement, nettoyage et enrichissement des données.
 import pandas as pd
 import numpy as np
 import logging
+import time
+
+from client_index import ClientIndex, ATTRIBUTS_CLIENT
+from schemas import SCHEMA_TRANSACTIONS, SCHEMA_CLIENTS, read_typed_csv, parse_dates, add_timestamp_columns
+from excel_input import is_excel, read_typed_xlsx
+from input_cache import restaurer_stats
+from row_validation import RowValidator
+
+try:
+    import resource
+except ImportError:  # Windows : pic de mémoire du processus non disponible
+    resource = None
 
 logger = logging.getLogger(__name__)
 
@@ -17,26 +29,68 @@ class DataProcessor:
     Gère le chargement, validation, nettoyage et enrichissement.
     """
     
-    def __init__(self):
-        """Initialise le processeur de données."""
+    def __init__(self, csv_engine='c', cache=None, in_place=False, fx_rates=None):
+        """
+        Initialise le processeur de données.
+        
+        Args:
+            csv_engine (str): Moteur de lecture CSV ('c' ou 'pyarrow', multithread)
+            cache (InputCache): Cache des tables analysées (None = désactivé)
+            in_place (bool): L'enrichissement ajoute les colonnes clients aux transactions
+                elles-mêmes au lieu de produire une nouvelle table
+            fx_rates (FxRateTable): Taux de change datés ; ajoute Montant_EUR au nettoyage
+                (None = montants non convertis)
+        """
+        self.csv_engine = csv_engine
+        self.cache = cache
+        self.in_place = in_place
+        self.fx_rates = fx_rates
+        # Transactions relues du cache : déjà nettoyées, statistiques du fichier brut conservées
+        self.from_cache = False
+        self.raw_stats = None
+        self.cached_duplicates = 0
+        self._cache_key = None
         self.transactions_df = None
         self.clients_df = None
+        self.client_index = None
         self.enriched_df = None
+        self.linked_count = 0
+        # Historique persistant des Transaction_ID (TransactionIdHistory, None = désactivé)
+        self.id_history = None
+        self.replayed_count = 0
+        # Validation ligne à ligne (règles déclarées dans SCHEMA_TRANSACTIONS)
+        self.validator = RowValidator.from_schema(SCHEMA_TRANSACTIONS)
+        self.quarantine_df = None
+        self.validation_counts = {}
+        # Transactions converties avec un taux de change ancien (dernier nettoyage complet)
+        self.stale_rate_count = 0
+        # Durée et mémoire de chargement par fichier
+        self.load_metrics = {}
         
     def load_transactions(self, filepath, sep=';'):
         """
-        Charge le fichier de transactions.
+        Charge le fichier de transactions (types déclarés dans SCHEMA_TRANSACTIONS).
         
         Args:
-            filepath (str): Chemin vers le fichier CSV
-            sep (str): Séparateur (par défaut ';')
+            filepath (str): Chemin vers le fichier CSV ou le classeur .xlsx
+            sep (str): Séparateur CSV (par défaut ';')
             
         Returns:
             DataFrame: Transactions chargées
         """
         try:
-            self.transactions_df = pd.read_csv(filepath, sep=sep)
-            logger.info(f"✅ Transactions chargées : {len(self.transactions_df)} lignes")
+            self.transactions_df, self._cache_key, meta = self._load_typed(
+                filepath, SCHEMA_TRANSACTIONS, sep, 'transactions'
+            )
+            self.from_cache = meta is not None
+            if self.from_cache:
+                self.raw_stats = restaurer_stats(meta['stats_brutes'])
+                self.cached_duplicates = meta['doublons']
+                logger.info(f"✅ Transactions chargées depuis le cache (déjà nettoyées) : "
+                            f"{len(self.transactions_df)} lignes")
+            else:
+                self.raw_stats = None
+                logger.info(f"✅ Transactions chargées : {len(self.transactions_df)} lignes")
             return self.transactions_df
         except Exception as e:
             logger.error(f"❌ Erreur lors du chargement des transactions : {str(e)}")
@@ -44,23 +98,77 @@ class DataProcessor:
     
     def load_clients(self, filepath, sep=';'):
         """
-        Charge le fichier des clients.
+        Charge le fichier des clients (types déclarés dans SCHEMA_CLIENTS).
         
         Args:
-            filepath (str): Chemin vers le fichier CSV
-            sep (str): Séparateur (par défaut ';')
+            filepath (str): Chemin vers le fichier CSV ou le classeur .xlsx
+            sep (str): Séparateur CSV (par défaut ';')
             
         Returns:
             DataFrame: Clients chargés
         """
         try:
-            self.clients_df = pd.read_csv(filepath, sep=sep)
+            self.clients_df, cle, meta = self._load_typed(filepath, SCHEMA_CLIENTS, sep, 'clients')
+            self.client_index = None
+            if cle is not None and meta is None:
+                self.cache.put(cle, self.clients_df)
             logger.info(f"✅ Clients chargés : {len(self.clients_df)} lignes")
             return self.clients_df
         except Exception as e:
             logger.error(f"❌ Erreur lors du chargement des clients : {str(e)}")
             raise
     
+    def _load_typed(self, filepath, schema, sep, nom):
+        """
+        Lit un fichier typé (ou sa table en cache) et relève durée, mémoire du DataFrame et pic RSS.
+        
+        Returns:
+            tuple: (DataFrame, clé de cache ou None, métadonnées si lu depuis le cache sinon None)
+        """
+        debut = time.perf_counter()
+        cle, entree = None, None
+        if self.cache is not None:
+            cle = self.cache.key(filepath, nom, schema)
+            entree = self.cache.get(cle)
+        if entree is not None:
+            (df, meta), moteur = entree, 'cache'
+        elif is_excel(filepath):
+            df = read_typed_xlsx(filepath, schema)
+            meta, moteur = None, 'xlsx'
+        else:
+            df = read_typed_csv(filepath, schema, sep=sep, engine=self.csv_engine)
+            meta, moteur = None, self.csv_engine
+        metriques = {
+            'fichier': filepath,
+            'moteur': moteur,
+            'lignes': len(df),
+            'duree_s': round(time.perf_counter() - debut, 3),
+            'memoire_mo': round(self._memoire_estimee(df) / 1024 ** 2, 1),
+        }
+        if resource is not None:
+            metriques['pic_rss_mo'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+        self.load_metrics[nom] = metriques
+        logger.info(f"   • {nom} : {metriques['duree_s']} s, {metriques['memoire_mo']} Mo en mémoire "
+                    f"(moteur {moteur})")
+        return df, cle, meta
+    
+    @staticmethod
+    def _memoire_estimee(df, echantillon=10000):
+        """
+        Mémoire occupée par un DataFrame, en octets.
+        
+        Les chaînes des colonnes texte sont mesurées sur les premières lignes
+        puis extrapolées : `memory_usage(deep=True)` parcourt chaque objet
+        (environ 0,5 s par million de lignes).
+        """
+        total = int(df.memory_usage(index=True, deep=False).sum())
+        for col in df.columns[df.dtypes == object]:
+            debut = df[col].iloc[:echantillon]
+            if len(debut):
+                objets = debut.memory_usage(index=False, deep=True) - debut.memory_usage(index=False, deep=False)
+                total += int(objets * len(df) / len(debut))
+        return total
+    
     def validate_data(self):
         """
         Valide l'intégrité des données chargées.
@@ -129,6 +237,14 @@ class DataProcessor:
         """
         Nettoie les données de transactions.
         
+        Après conversion des types et suppression des doublons (dans le
+        fichier puis, si un historique est ouvert, d'une exécution à l'autre),
+        les montants sont convertis en EUR (si une table de taux est fournie) et
+        chaque ligne est contrôlée par les règles de validation du schéma ;
+        les lignes en échec sont retirées et conservées dans `quarantine_df`,
+        qui liste aussi les lignes signalées par un contrôle non bloquant
+        (taux de change absent) et gardées dans le traitement.
+        
         Returns:
             DataFrame: Transactions nettoyées
         """
@@ -137,46 +253,201 @@ class DataProcessor:
         
         logger.info("Nettoyage des transactions...")
         
-        # Sauvegarde du nombre initial
-        initial_count = len(self.transactions_df)
+        # 0. Transactions relues du cache : déjà typées et dédoublonnées
+        if self.from_cache:
+            if self.cached_duplicates > 0:
+                logger.info(f"   • {self.cached_duplicates} doublons supprimés (cache)")
+            self.from_cache = False
+            self.raw_stats = None
+        else:
+            # Sauvegarde du nombre initial
+            initial_count = len(self.transactions_df)
+            stats_brutes = self.get_summary_stats()['transactions'] if self._cache_key else None
+            
+            # 1. Conversion des types de données
+            self._convert_types(self.transactions_df)
+            
+            # 2. Suppression des doublons (sélection uniquement s'il y en a)
+            doublons = self.transactions_df.duplicated(subset=['Transaction_ID']).to_numpy()
+            if doublons.any():
+                self.transactions_df = self.transactions_df.take(np.flatnonzero(~doublons))
+            duplicates_removed = initial_count - len(self.transactions_df)
+            
+            if duplicates_removed > 0:
+                logger.info(f"   • {duplicates_removed} doublons supprimés")
+            
+            # 3. Gestion des valeurs manquantes
+            numeric_cols = self.transactions_df.select_dtypes(include=[np.number]).columns
+            for col in numeric_cols:
+                missing = self.transactions_df[col].isnull().sum()
+                if missing > 0:
+                    # Pour les montants, on ne remplit pas, on garde NaN
+                    logger.debug(f"   • {missing} valeurs manquantes dans {col}")
+            
+            # 4. Mise en cache de la table typée et dédoublonnée (la quarantaine est recalculée à la relecture)
+            if self._cache_key:
+                self.cache.put(self._cache_key, self.transactions_df,
+                               {'stats_brutes': stats_brutes, 'doublons': duplicates_removed})
+                self._cache_key = None
+        
+        # 5. Transactions déjà traitées par une exécution précédente (rejeu) : écartées
+        self.transactions_df, self.replayed_count = self._drop_replayed(self.transactions_df)
+        if self.replayed_count > 0:
+            logger.warning(f"   • {self.replayed_count} transactions deja traitees (rejeu) ignorees")
+        
+        # 6. Conversion des montants en EUR au taux du jour de la transaction
+        self.stale_rate_count = self._convert_currency(self.transactions_df)
+        
+        # 7. Validation ligne à ligne : les lignes en échec partent en quarantaine
+        self.transactions_df, self.quarantine_df, self.validation_counts = \
+            self.validator.split(self.transactions_df)
+        self._log_quarantine(self.validator.rejected_count(self.quarantine_df), self.validation_counts,
+                             len(self.quarantine_df) - self.validator.rejected_count(self.quarantine_df))
+        
+        logger.info(f"✅ Nettoyage terminé : {len(self.transactions_df)} transactions valides")
         
-        # 1. Conversion des types de données
-        self.transactions_df['Montant'] = pd.to_numeric(
-            self.transactions_df['Montant'], errors='coerce'
-        )
+        return self.transactions_df
+    
+    def _convert_currency(self, df):
+        """
+        Ajoute Montant_EUR et le taux appliqué (sans effet sans table de taux).
         
-        if 'Date' in self.transactions_df.columns:
-            self.transactions_df['Date'] = pd.to_datetime(
-                self.transactions_df['Date'], errors='coerce'
-            )
+        Returns:
+            int: Transactions converties avec un taux ancien (voir fx_rates.ANCIENNETE_MAX_JOURS)
+        """
+        if self.fx_rates is None:
+            return 0
+        return self.fx_rates.convert(df, SCHEMA_TRANSACTIONS)
+    
+    def _drop_replayed(self, df):
+        """
+        Écarte les transactions dont l'identifiant figure dans l'historique persistant.
+        
+        Returns:
+            tuple: (transactions restantes, nombre de transactions écartées)
+        """
+        if self.id_history is None:
+            return df, 0
+        deja_traitees = self.id_history.contains(df['Transaction_ID'])
+        nb = int(np.count_nonzero(deja_traitees))
+        if nb > 0:
+            df = df.take(np.flatnonzero(~deja_traitees))
+        return df, nb
+    
+    def _log_quarantine(self, nb_rejetees, comptes, nb_signalees=0):
+        """Journalise les lignes en quarantaine, les lignes signalées et les échecs par règle."""
+        if nb_rejetees > 0:
+            logger.warning(f"   • {nb_rejetees} transactions en quarantaine")
+        if nb_signalees > 0:
+            logger.warning(f"   • {nb_signalees} transactions signalees (scorees, regles de montant ignorees)")
+        for code, count in comptes.items():
+            if count > 0:
+                logger.warning(f"      - {code} : {count}")
+    
+    def validation_stats(self, nb_controlees=None, nb_rejetees=None, comptes=None, nb_signalees=0,
+                         nb_taux_anciens=None):
+        """
+        Statistiques de la validation ligne à ligne (section `validation` du JSON).
+        
+        Sans argument, décrit le dernier nettoyage complet (clean_transactions).
+        Les lignes signalées (contrôle non bloquant) restent dans le traitement.
+        
+        Returns:
+            dict: Lignes contrôlées, lignes en quarantaine, lignes signalées,
+                rejets et signalements par règle, transactions converties avec un
+                taux de change ancien
+        """
+        if comptes is None:
+            quarantaine = self.quarantine_df
+            nb_rejetees = self.validator.rejected_count(quarantaine) if quarantaine is not None else 0
+            nb_signalees = len(quarantaine) - nb_rejetees if quarantaine is not None else 0
+            nb_controlees = len(self.transactions_df) + nb_rejetees
+            comptes = self.validation_counts
+        if nb_taux_anciens is None:
+            nb_taux_anciens = self.stale_rate_count
+        signalements = self.validator.signalements
+        return {
+            'lignes_controlees': int(nb_controlees),
+            'lignes_en_quarantaine': int(nb_rejetees),
+            'lignes_signalees': int(nb_signalees),
+            'rejets_par_regle': {code: int(count) for code, count in comptes.items() if code not in signalements},
+            'signalements_par_regle': {code: int(count) for code, count in comptes.items() if code in signalements},
+            'taux_change_anciens': int(nb_taux_anciens),
+        }
+    
+    @staticmethod
+    def _convert_types(df):
+        """
+        Convertit Montant en numérique et Date en datetime au format du schéma
+        (valeurs invalides -> NaN/NaT),
+        puis ajoute l'horodatage int64 (Date + Heure) et le numéro de jour entier.
+        
+        Sans effet sur les colonnes déjà typées ou calculées (schéma déclaré, cache).
+        """
+        if not pd.api.types.is_float_dtype(df['Montant']):
+            df['Montant'] = pd.to_numeric(df['Montant'], errors='coerce')
+        
+        parse_dates(df, SCHEMA_TRANSACTIONS)
+        return add_timestamp_columns(df, SCHEMA_TRANSACTIONS)
+    
+    def iter_transactions(self, filepath, chunk_size, sep=';'):
+        """
+        Lit le fichier de transactions par morceaux typés (traitement en flux).
+        
+        Args:
+            filepath (str): Chemin vers le fichier CSV ou le classeur .xlsx
+            chunk_size (int): Nombre de lignes par morceau
+            sep (str): Séparateur CSV (par défaut ';')
+            
+        Yields:
+            DataFrame: Morceau de transactions brutes
+        """
+        if is_excel(filepath):
+            yield from read_typed_xlsx(filepath, SCHEMA_TRANSACTIONS, chunksize=chunk_size)
+        else:
+            yield from read_typed_csv(filepath, SCHEMA_TRANSACTIONS, sep=sep, chunksize=chunk_size)
+    
+    def clean_chunk(self, df, seen_ids):
+        """
+        Nettoie un morceau de transactions (mêmes étapes que clean_transactions).
         
-        # 2. Suppression des doublons
-        self.transactions_df = self.transactions_df.drop_duplicates(
-            subset=['Transaction_ID']
-        )
-        duplicates_removed = initial_count - len(self.transactions_df)
+        Les doublons sont recherchés dans tout le fichier grâce à l'ensemble
+        des identifiants déjà vus lors des morceaux précédents.
         
+        Args:
+            df (DataFrame): Morceau de transactions brutes
+            seen_ids (SeenIdStore): Identifiants des morceaux précédents
+            
+        Returns:
+            tuple: (morceau nettoyé, comptes 'doublons', 'rejeux', 'rejets' par règle et
+                'taux_anciens', lignes en quarantaine)
+        """
+        self._convert_types(df)
+        garde = seen_ids.first_seen(df['Transaction_ID'])
+        duplicates_removed = int(len(df) - garde.sum())
         if duplicates_removed > 0:
-            logger.info(f"   • {duplicates_removed} doublons supprimés")
-        
-        # 3. Gestion des valeurs manquantes
-        numeric_cols = self.transactions_df.select_dtypes(include=[np.number]).columns
-        for col in numeric_cols:
-            missing = self.transactions_df[col].isnull().sum()
-            if missing > 0:
-                # Pour les montants, on ne remplit pas, on garde NaN
-                logger.debug(f"   • {missing} valeurs manquantes dans {col}")
-        
-        # 4. Filtrage des données aberrantes (montants négatifs)
-        negative_mask = self.transactions_df['Montant'] < 0
-        if negative_mask.any():
-            logger.warning(f"   • {negative_mask.sum()} transactions avec montant négatif")
-            # Optionnel : les supprimer ou les marquer
-            # self.transactions_df = self.transactions_df[~negative_mask]
+            df = df.take(np.flatnonzero(garde))
+        df, rejeux = self._drop_replayed(df)
+        taux_anciens = self._convert_currency(df)
+        df, quarantaine, rejets = self.validator.split(df)
+        return df, {'doublons': duplicates_removed, 'rejeux': rejeux, 'rejets': rejets,
+                    'taux_anciens': taux_anciens}, quarantaine
+    
+    def build_client_index(self):
+        """
+        Construit l'index du référentiel clients (une fois par référentiel chargé).
         
-        logger.info(f"✅ Nettoyage terminé : {len(self.transactions_df)} transactions valides")
+        Sans effet si l'index du référentiel courant existe déjà (mode démon).
         
-        return self.transactions_df
+        Returns:
+            ClientIndex: Index partagé par l'enrichissement et les règles
+        """
+        if self.clients_df is None:
+            raise ValueError("Les clients doivent être chargés avant l'indexation")
+        
+        if self.client_index is None:
+            self.client_index = ClientIndex(self.clients_df)
+        return self.client_index
     
     def enrich_data(self):
         """
@@ -190,41 +461,58 @@ class DataProcessor:
         
         logger.info("Enrichissement des données...")
         
-        # Sélection des colonnes clients nécessaires
-        client_cols = ['Client_ID', 'Niveau_Risque', 'Est_PEP', 'Pays', 'Segment']
-        available_cols = [col for col in client_cols if col in self.clients_df.columns]
+        if self.client_index is None:
+            self.build_client_index()
         
-        # Jointure
-        self.enriched_df = pd.merge(
-            self.transactions_df,
-            self.clients_df[available_cols],
-            on='Client_ID',
-            how='left',
-            suffixes=('', '_client')
-        )
+        self.enriched_df, codes = self._gather_client_attributes(self.transactions_df)
         
         # Statistiques sur l'enrichissement
-        missing_clients = self.enriched_df['Client_ID'].isin(self.clients_df['Client_ID']).sum()
-        matched_percentage = (missing_clients / len(self.enriched_df)) * 100
-        
-        logger.info(f"   • {missing_clients}/{len(self.enriched_df)} transactions liées à un client ({matched_percentage:.1f}%)")
+        self.linked_count = int((codes >= 0).sum())
+        matched_percentage = (self.linked_count / len(self.enriched_df)) * 100 if len(self.enriched_df) else 0.0
         
-        # Valeurs par défaut pour les clients non trouvés
-        if 'Niveau_Risque' in self.enriched_df.columns:
-            missing_risk = self.enriched_df['Niveau_Risque'].isnull().sum()
-            if missing_risk > 0:
-                self.enriched_df['Niveau_Risque'].fillna('Inconnu', inplace=True)
-                logger.info(f"   • {missing_risk} transactions avec risque client inconnu")
+        logger.info(f"   • {self.linked_count}/{len(self.enriched_df)} transactions liées à un client ({matched_percentage:.1f}%)")
         
-        if 'Est_PEP' in self.enriched_df.columns:
-            missing_pep = self.enriched_df['Est_PEP'].isnull().sum()
-            if missing_pep > 0:
-                self.enriched_df['Est_PEP'].fillna('Non', inplace=True)
+        missing_risk = len(codes) - self.linked_count
+        if 'Niveau_Risque' in self.client_index and missing_risk > 0:
+            logger.info(f"   • {missing_risk} transactions avec risque client inconnu")
         
         logger.info(f"✅ Données enrichies : {len(self.enriched_df)} transactions")
         
         return self.enriched_df
     
+    def _gather_client_attributes(self, df):
+        """
+        Ajoute les attributs clients à des transactions (une recherche de code par ligne).
+        
+        En mode `in_place`, les colonnes sont ajoutées à `df` lui-même.
+        """
+        codes = self.client_index.codes(df['Client_ID'])
+        defauts = {'Niveau_Risque': 'Inconnu', 'Est_PEP': 'Non'}
+        
+        colonnes = {}
+        for col in ATTRIBUTS_CLIENT:
+            if col in self.client_index:
+                nom = col if col not in df.columns else f"{col}_client"
+                colonnes[nom] = self.client_index.gather(col, codes, defaut=defauts.get(col))
+        
+        if not self.in_place:
+            return df.assign(**colonnes), codes
+        for nom, valeurs in colonnes.items():
+            df[nom] = valeurs
+        return df, codes
+    
+    def enrich_chunk(self, df):
+        """
+        Enrichit un morceau de transactions nettoyées.
+        
+        Returns:
+            tuple: (morceau enrichi, nombre de transactions liées à un client)
+        """
+        if self.client_index is None:
+            self.build_client_index()
+        enriched, codes = self._gather_client_attributes(df)
+        return enriched, int((codes >= 0).sum())
+    
     def get_summary_stats(self):
         """
         Génère des statistiques descriptives sur les données.
@@ -234,13 +522,18 @@ class DataProcessor:
         """
         stats = {}
         
-        if self.transactions_df is not None:
+        if self.raw_stats is not None:
+            # Table relue du cache, pas encore passée au nettoyage : statistiques du fichier brut
+            stats['transactions'] = dict(self.raw_stats)
+        elif self.transactions_df is not None:
+            # Table brute : les montants non numériques sont ignorés (mis en quarantaine au nettoyage)
+            montants = pd.to_numeric(self.transactions_df['Montant'], errors='coerce')
             stats['transactions'] = {
                 'count': len(self.transactions_df),
-                'montant_total': self.transactions_df['Montant'].sum(),
-                'montant_moyen': self.transactions_df['Montant'].mean(),
-                'montant_max': self.transactions_df['Montant'].max(),
-                'montant_min': self.transactions_df['Montant'].min(),
+                'montant_total': montants.sum(),
+                'montant_moyen': montants.mean(),
+                'montant_max': montants.max(),
+                'montant_min': montants.min(),
                 'period_min': self.transactions_df['Date'].min() if 'Date' in self.transactions_df.columns else None,
                 'period_max': self.transactions_df['Date'].max() if 'Date' in self.transactions_df.columns else None
             }
@@ -255,7 +548,48 @@ class DataProcessor:
         if self.enriched_df is not None:
             stats['enriched'] = {
                 'count': len(self.enriched_df),
-                'transactions_avec_client': self.enriched_df['Client_ID'].isin(self.clients_df['Client_ID']).sum()
+                'transactions_avec_client': self.linked_count
             }
         
-        return stats
\ No newline at end of file
+        return stats
+
+
+class TransactionStatsAccumulator:
+    """Statistiques descriptives des transactions cumulées morceau par morceau."""
+    
+    def __init__(self):
+        self.count = 0
+        self.montant_count = 0
+        self.montant_total = 0.0
+        self.extremes = {}
+    
+    def _extreme(self, cle, valeur, fonction):
+        if pd.isna(valeur):
+            return
+        courant = self.extremes.get(cle)
+        self.extremes[cle] = valeur if courant is None else fonction(courant, valeur)
+    
+    def update(self, df):
+        """Ajoute un morceau de transactions."""
+        self.count += len(df)
+        # Morceau brut : les montants non numériques sont ignorés (mis en quarantaine au nettoyage)
+        montants = pd.to_numeric(df['Montant'], errors='coerce')
+        self.montant_count += int(montants.count())
+        self.montant_total += montants.sum()
+        self._extreme('montant_max', montants.max(), max)
+        self._extreme('montant_min', montants.min(), min)
+        if 'Date' in df.columns:
+            self._extreme('period_min', df['Date'].min(), min)
+            self._extreme('period_max', df['Date'].max(), max)
+    
+    def as_dict(self):
+        """Statistiques au format de DataProcessor.get_summary_stats()['transactions']."""
+        return {
+            'count': self.count,
+            'montant_total': self.montant_total,
+            'montant_moyen': self.montant_total / self.montant_count if self.montant_count else np.nan,
+            'montant_max': self.extremes.get('montant_max', np.nan),
+            'montant_min': self.extremes.get('montant_min', np.nan),
+            'period_min': self.extremes.get('period_min'),
+            'period_max': self.extremes.get('period_max')
+        }
\ No newline at end of file
@@ -0,0 +1,456 @@
+"""
+LECTURE DES CLASSEURS EXCEL (.xlsx)
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Lecture en flux de la première feuille d'un classeur .xlsx
+              (exports de generate_data.py, systèmes amont qui ne livrent
+              que de l'Excel) avec les types déclarés de schemas.py. Le
+              classeur est ouvert par openpyxl en lecture seule (chaînes
+              partagées, styles de date) ; la feuille est décompressée par
+              blocs de lignes dont les cellules sont rangées dans des
+              tampons par colonne, convertis en DataFrame typé par lots. La
+              mémoire reste bornée par la taille d'un lot.
+"""
+
+import datetime
+import gc
+import logging
+import os
+import re
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from schemas import VALEURS_MANQUANTES, parse_dates
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONS_EXCEL = ('.xlsx', '.xlsm')
+TAILLE_LOT = 50_000
+# Octets décompressés lus à la fois dans la feuille
+TAILLE_BLOC = 4 * 1024 ** 2
+
+MANQUANTES = frozenset(VALEURS_MANQUANTES)
+
+# Forme des cellules écrites par Excel et openpyxl (attributs r, s, t dans cet
+# ordre, une valeur <v> ou un texte en ligne) : une seule expression pour
+# toute la feuille. Les blocs qui s'en écartent (formules, texte enrichi,
+# cellules vides, préfixe d'espace de noms) sont relus par ElementTree.
+_CELLULE = re.compile(
+    r'<c r="([A-Z]+)\d+"(?: s="(\d+)")?(?: t="(\w+)")?>'
+    r'<(?:v|is><t(?: xml:space="preserve")?)>([^<]*)</'
+)
+_DEBUT_DONNEES = re.compile(r'<(\w+:)?sheetData\s*(/?)>')
+_DECLARATIONS = re.compile(r'xmlns(?::\w+)?="[^"]*"')
+_LETTRES = re.compile(r'[A-Z]+')
+
+
+def is_excel(chemin):
+    """Indique si un fichier d'entrée est un classeur Excel (d'après son extension)."""
+    return os.path.splitext(str(chemin))[1].lower() in EXTENSIONS_EXCEL
+
+
+def require_openpyxl():
+    """Retourne le module openpyxl (ImportError explicite s'il n'est pas installé)."""
+    try:
+        import openpyxl
+    except ImportError as e:
+        raise ImportError("La lecture des fichiers .xlsx nécessite openpyxl (pip install openpyxl)") from e
+    return openpyxl
+
+
+def read_typed_xlsx(filepath, schema, chunksize=None):
+    """
+    Lit la première feuille d'un classeur avec les types déclarés du schéma.
+
+    Args:
+        filepath (str): Chemin du classeur .xlsx
+        schema (dict): SCHEMA_TRANSACTIONS ou SCHEMA_CLIENTS
+        chunksize (int): Lecture par morceaux (None = feuille complète)
+
+    Returns:
+        DataFrame, ou itérateur de DataFrame si chunksize est donné
+    """
+    if chunksize:
+        return iter_typed_xlsx(filepath, schema, chunksize)
+    return _concat_lots(list(iter_typed_xlsx(filepath, schema)))
+
+
+def iter_typed_xlsx(filepath, schema, taille_lot=TAILLE_LOT):
+    """
+    Lots typés de `taille_lot` lignes de la première feuille (index continu).
+
+    Les lignes entièrement vides sont ignorées, comme les lignes blanches
+    d'un CSV.
+    """
+    archive, lecteur = _ouvrir_feuille(filepath)
+    try:
+        debut = 0
+        tampons, nb_lignes = None, 0
+        for bloc, taille in lecteur.blocs():
+            if tampons is None:
+                tampons = {nom: [] for nom in lecteur.noms}
+            for nom in lecteur.noms:
+                tampons[nom].append(bloc[nom])
+            nb_lignes += taille
+            while nb_lignes >= taille_lot:
+                lot, tampons = _decouper(tampons, taille_lot)
+                yield _typer_lot(lot, schema, debut)
+                debut += taille_lot
+                nb_lignes -= taille_lot
+        if tampons is not None and nb_lignes:
+            yield _typer_lot({nom: np.concatenate(valeurs) for nom, valeurs in tampons.items()}, schema, debut)
+        elif debut == 0:
+            yield _typer_lot({nom: np.empty(0, dtype=object) for nom in lecteur.noms}, schema, 0)
+    finally:
+        archive.close()
+
+
+def _ouvrir_feuille(filepath):
+    """
+    Ouvre le classeur en lecture seule et la première feuille de calcul.
+
+    Seules les parties du classeur utiles sont lues (manifeste, chaînes
+    partagées, classeur, styles) : les objets feuille d'openpyxl ne sont pas
+    créés, car openpyxl parcourt alors toute la feuille pour en calculer les
+    dimensions lorsque l'élément <dimension> est absent (fichiers écrits en
+    mode write_only).
+
+    Returns:
+        tuple: (archive zip à fermer, _LecteurFeuille)
+    """
+    require_openpyxl()
+    from openpyxl.reader.excel import ExcelReader
+    from openpyxl.styles.stylesheet import apply_stylesheet
+
+    reader = ExcelReader(filepath, read_only=True, data_only=True)
+    try:
+        reader.read_manifest()
+        reader.read_strings()
+        reader.read_workbook()
+        apply_stylesheet(reader.archive, reader.wb)
+        feuilles = [rel.target for _, rel in reader.parser.find_sheets()
+                    if rel.target in reader.valid_files and 'chartsheet' not in rel.Type]
+        if not feuilles:
+            raise ValueError(f"Aucune feuille de calcul dans {filepath}")
+        lecteur = _LecteurFeuille(
+            reader.archive.open(feuilles[0]),
+            np.asarray(list(reader.shared_strings), dtype=object),
+            {str(style) for style in getattr(reader.wb, '_date_formats', ())},
+            reader.wb.epoch,
+        )
+    except Exception:
+        reader.archive.close()
+        raise
+    return reader.archive, lecteur
+
+
+def _decouper(tampons, taille):
+    """Sépare les `taille` premières lignes des tampons (lot complet) du reste."""
+    lot, reste = {}, {}
+    for nom, valeurs in tampons.items():
+        valeurs = np.concatenate(valeurs)
+        lot[nom], reste[nom] = valeurs[:taille], [valeurs[taille:]]
+    return lot, reste
+
+
+class _LecteurFeuille:
+    """Flux XML d'une feuille lu par blocs de lignes complètes."""
+
+    def __init__(self, source, partagees, styles_date, epoque):
+        self.source = source
+        self.partagees = partagees
+        self.styles_date = styles_date
+        self.epoque = epoque
+        self.noms = None
+        self.lettres = None
+        self.prefixe = ''
+        self.declarations = ''
+
+    def blocs(self):
+        """
+        Blocs de lignes de données, convertis en colonnes.
+
+        Yields:
+            tuple: (dict nom de colonne -> ndarray object, nombre de lignes)
+        """
+        try:
+            reste = self._lire_entete()
+            fin_ligne = f'</{self.prefixe}row>'.encode()
+            fin_donnees = f'</{self.prefixe}sheetData>'.encode()
+            while True:
+                donnees = self.source.read(TAILLE_BLOC)
+                tampon = reste + donnees
+                coupure = tampon.rfind(fin_ligne)
+                coupure = coupure + len(fin_ligne) if coupure >= 0 else 0
+                fin = tampon.find(fin_donnees, coupure)
+                if fin >= 0:
+                    tampon, donnees, coupure = tampon[:fin], b'', fin
+                elif not donnees:
+                    coupure = len(tampon)
+                elif coupure == 0:
+                    reste = tampon
+                    continue
+                reste = tampon[coupure:]
+                colonnes = self._colonnes(tampon[:coupure].decode('utf-8'))
+                if colonnes is not None:
+                    yield colonnes
+                if not donnees:
+                    return
+        finally:
+            self.source.close()
+
+    def _lire_entete(self):
+        """Lit la ligne d'en-tête ; retourne les octets lus au-delà."""
+        tampon = b''
+        while True:
+            donnees = self.source.read(TAILLE_BLOC)
+            tampon += donnees
+            texte = tampon.decode('utf-8', errors='ignore')
+            debut = _DEBUT_DONNEES.search(texte)
+            if debut is None and donnees:
+                continue
+            if debut is None or debut.group(2):
+                raise ValueError("Feuille Excel sans données (en-tête absent)")
+            self.prefixe = debut.group(1) or ''
+            self.declarations = ' '.join(_DECLARATIONS.findall(texte[:debut.start()]))
+            fin_ligne = f'</{self.prefixe}row>'
+            fin = texte.find(fin_ligne, debut.end())
+            if fin < 0 and donnees:
+                continue
+            if fin < 0:
+                raise ValueError("Feuille Excel sans données (en-tête absent)")
+            fin += len(fin_ligne)
+            break
+
+        # Texte décodé éventuellement tronqué au milieu d'un caractère : la suite repart des octets
+        octets_lus = len(texte[:fin].encode('utf-8'))
+        lignes = self._lignes_xml(texte[debut.end():fin])
+        if not lignes:
+            raise ValueError("Feuille Excel sans données (en-tête absent)")
+        lettres, styles, types, valeurs = lignes[0]
+        entete = self._decoder(np.array(types, dtype=object), np.array(valeurs, dtype=object),
+                               np.array(styles, dtype=object))
+        self.lettres = tuple(lettres)
+        self.noms = [str(nom) if nom is not None else f"Unnamed: {i}" for i, nom in enumerate(entete)]
+        return tampon[octets_lus:]
+
+    def _colonnes(self, bloc):
+        """Colonnes d'un bloc de lignes : forme courante par expression régulière, sinon ElementTree."""
+        nb_colonnes = len(self.lettres)
+        if not self.prefixe:
+            # Des millions de petits objets créés d'un coup : le ramasse-miettes est suspendu
+            gc_actif = gc.isenabled()
+            gc.disable()
+            try:
+                cellules = _CELLULE.findall(bloc)
+                nb_lignes = len(cellules) // nb_colonnes
+                if cellules and len(cellules) == nb_lignes * nb_colonnes and bloc.count('</row>') == nb_lignes:
+                    lettres, styles, types, valeurs = zip(*cellules)
+                    if lettres == self.lettres * nb_lignes:
+                        forme = (nb_lignes, nb_colonnes)
+                        echappe = '&' in bloc
+                        styles = np.array(styles, dtype=object).reshape(forme)
+                        types = np.array(types, dtype=object).reshape(forme)
+                        valeurs = np.array(valeurs, dtype=object).reshape(forme)
+                        colonnes = {
+                            nom: self._decoder(types[:, j], valeurs[:, j], styles[:, j], echappe=echappe)
+                            for j, nom in enumerate(self.noms)
+                        }
+                        return colonnes, nb_lignes
+            finally:
+                if gc_actif:
+                    gc.enable()
+        return self._colonnes_xml(bloc)
+
+    def _colonnes_xml(self, bloc):
+        """Lecture générale d'un bloc (cellules manquantes, formules, texte enrichi)."""
+        lignes = [ligne for ligne in self._lignes_xml(bloc) if ligne[0]]
+        if not lignes:
+            return None
+        positions = {lettre: j for j, lettre in enumerate(self.lettres)}
+        forme = (len(lignes), len(self.lettres))
+        styles = np.full(forme, '', dtype=object)
+        types = np.full(forme, 'e', dtype=object)
+        valeurs = np.full(forme, '', dtype=object)
+        for i, (lettres, styles_ligne, types_ligne, valeurs_ligne) in enumerate(lignes):
+            for lettre, style, type_cellule, valeur in zip(lettres, styles_ligne, types_ligne, valeurs_ligne):
+                j = positions.get(lettre)
+                if j is not None:
+                    styles[i, j], types[i, j], valeurs[i, j] = style, type_cellule, valeur
+        colonnes = {
+            nom: self._decoder(types[:, j], valeurs[:, j], styles[:, j])
+            for j, nom in enumerate(self.noms)
+        }
+        return colonnes, len(lignes)
+
+    def _lignes_xml(self, bloc):
+        """Cellules de chaque ligne d'un bloc : (lettres, styles, types, valeurs) avec entités décodées."""
+        # Import différé : seuls les blocs atypiques passent par ElementTree
+        import xml.etree.ElementTree as ET
+        racine = ET.fromstring(f'<{self.prefixe}sheetData {self.declarations}>{bloc}</{self.prefixe}sheetData>')
+        lignes = []
+        for ligne in racine:
+            lettres, styles, types, valeurs = [], [], [], []
+            for numero, cellule in enumerate(ligne):
+                if cellule.tag.rsplit('}', 1)[-1] != 'c':
+                    continue
+                reference = _LETTRES.match(cellule.get('r', ''))
+                type_cellule = cellule.get('t', 'n')
+                valeur = None
+                for enfant in cellule:
+                    nom = enfant.tag.rsplit('}', 1)[-1]
+                    if nom == 'v':
+                        valeur = enfant.text or ''
+                    elif nom == 'is':
+                        # Texte en ligne, éventuellement enrichi (plusieurs <r><t>)
+                        valeur = ''.join(t.text or '' for t in enfant.iter() if t.tag.rsplit('}', 1)[-1] == 't')
+                if valeur is None:
+                    continue
+                lettres.append(reference.group() if reference else _lettre_colonne(numero))
+                styles.append(cellule.get('s', ''))
+                types.append(type_cellule)
+                valeurs.append(valeur)
+            lignes.append((lettres, styles, types, valeurs))
+        return lignes
+
+    def _decoder(self, types, valeurs, styles, echappe=False):
+        """
+        Valeurs Python d'une colonne de cellules.
+
+        Args:
+            types (ndarray): Attribut t de chaque cellule ('' = nombre, 'e' = absente ou en erreur)
+            valeurs (ndarray): Contenu brut (<v> ou texte en ligne)
+            styles (ndarray): Attribut s (les styles de date donnent des datetime)
+            echappe (bool): Entités XML encore présentes dans les textes (lecture par expression régulière)
+
+        Returns:
+            ndarray: Valeurs (str, float, bool, datetime, None)
+        """
+        sortie = np.full(len(valeurs), None, dtype=object)
+        types_presents = set(types.tolist())
+        for type_cellule in types_presents:
+            # Colonne homogène (cas courant) : pas de masque
+            masque = slice(None) if len(types_presents) == 1 else types == type_cellule
+            brutes = valeurs[masque]
+            if type_cellule in ('', 'n'):
+                sortie[masque] = pd.to_numeric(brutes, errors='coerce')
+            elif type_cellule == 's':
+                sortie[masque] = self.partagees[brutes.astype(np.int64)]
+            elif type_cellule in ('inlineStr', 'str', 'd'):
+                if echappe:
+                    import html
+                    brutes = [html.unescape(v) if '&' in v else v for v in brutes]
+                sortie[masque] = brutes
+            elif type_cellule == 'b':
+                sortie[masque] = brutes == '1'
+            # 'e' (erreur ou cellule absente) : None
+
+        # Nombres au format date ou heure
+        if types_presents & {'', 'n'} and self.styles_date & set(styles.tolist()):
+            dates = np.isin(styles, list(self.styles_date)) & ((types == '') | (types == 'n'))
+            from openpyxl.utils.datetime import from_excel
+            sortie[dates] = [from_excel(valeur, self.epoque) for valeur in sortie[dates]]
+        return sortie
+
+
+def _lettre_colonne(numero):
+    """Lettres de la colonne d'indice `numero` (0 -> A) pour les cellules sans référence."""
+    lettres = ''
+    numero += 1
+    while numero:
+        numero, reste = divmod(numero - 1, 26)
+        lettres = chr(65 + reste) + lettres
+    return lettres
+
+
+def _en_texte(valeur):
+    """Valeur de cellule -> texte tel qu'il figurerait dans l'export CSV (None si manquante)."""
+    if valeur is None:
+        return None
+    if isinstance(valeur, str):
+        return None if valeur in MANQUANTES else valeur
+    if isinstance(valeur, float):
+        if np.isnan(valeur):
+            return None
+        return str(int(valeur)) if valeur.is_integer() else repr(valeur)
+    if isinstance(valeur, datetime.datetime):
+        if valeur.time() == datetime.time(0):
+            return valeur.strftime('%Y-%m-%d')
+        return valeur.isoformat(sep=' ')
+    if isinstance(valeur, datetime.time):
+        return valeur.strftime('%H:%M' if not valeur.second else '%H:%M:%S')
+    return str(valeur)
+
+
+def _textes(valeurs):
+    """Colonne texte : valeurs non textuelles converties, marqueurs de valeur manquante -> None."""
+    return np.array([v if v.__class__ is str and v not in MANQUANTES else _en_texte(v) for v in valeurs],
+                    dtype=object)
+
+
+def _categories(valeurs):
+    """Colonne catégorielle : conversion en texte faite une fois par modalité."""
+    categoriel = pd.Categorical(valeurs)
+    textes = [_en_texte(c) for c in categoriel.categories]
+    if textes == list(categoriel.categories):
+        return categoriel
+    return pd.Categorical(np.array(textes + [None], dtype=object)[categoriel.codes])
+
+
+def _numerique(nom, valeurs):
+    """Colonne numérique : valeurs non numériques -> NaN (comme la conversion de DataProcessor)."""
+    serie = pd.to_numeric(pd.Series(valeurs, dtype=object), errors='coerce').astype('float64')
+    invalides = int(serie.isna().sum()) - sum(1 for v in valeurs if v is None or (isinstance(v, str) and v in MANQUANTES))
+    if invalides > 0:
+        logger.warning(f"   • {nom} : {invalides} valeurs non numériques (NaN)")
+    return serie.to_numpy()
+
+
+def _infere(valeurs):
+    """Colonne hors schéma : nombres entiers -> int64, sinon inférence de pandas."""
+    serie = pd.Series(valeurs, dtype=object)
+    serie = serie.where(~serie.isin(MANQUANTES), None).infer_objects()
+    if serie.dtype == np.float64 and serie.notna().all() and (serie % 1 == 0).all():
+        return serie.astype(np.int64).to_numpy()
+    return serie.to_numpy()
+
+
+def _typer_lot(colonnes, schema, debut):
+    """DataFrame typé d'un lot (index à partir de `debut`, comme un morceau de read_csv)."""
+    donnees = {}
+    for nom, valeurs in colonnes.items():
+        declare = 'category' if nom in schema['dates'] else schema['colonnes'].get(nom)
+        if declare == 'category':
+            donnees[nom] = _categories(valeurs)
+        elif declare == 'object':
+            donnees[nom] = _textes(valeurs)
+        elif declare == 'float64':
+            donnees[nom] = _numerique(nom, valeurs)
+        else:
+            donnees[nom] = _infere(valeurs)
+    lot = pd.DataFrame(donnees, index=pd.RangeIndex(debut, debut + len(next(iter(colonnes.values()), ()))))
+    return parse_dates(lot, schema)
+
+
+def _concat_lots(lots):
+    """
+    Assemble les lots en un DataFrame (catégories unifiées et triées).
+
+    Les colonnes sont assemblées une à une et retirées des lots au fur et à
+    mesure : le pic mémoire reste proche de la taille du DataFrame final.
+    """
+    if len(lots) == 1:
+        return lots[0]
+    nb_lignes = sum(len(lot) for lot in lots)
+    colonnes = {}
+    for nom in list(lots[0].columns):
+        parties = [lot[nom] for lot in lots]
+        if isinstance(parties[0].dtype, pd.CategoricalDtype):
+            colonnes[nom] = union_categoricals(parties, sort_categories=True)
+        else:
+            colonnes[nom] = np.concatenate([partie.to_numpy() for partie in parties])
+        del parties
+        for lot in lots:
+            del lot[nom]
+    return pd.DataFrame(colonnes, index=pd.RangeIndex(nb_lignes))
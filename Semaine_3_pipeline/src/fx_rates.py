@@ -0,0 +1,170 @@
+"""
+TAUX DE CHANGE - CONVERSION DES MONTANTS EN EUR
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Table locale des taux de référence datés (convention BCE :
+              unités de devise pour 1 EUR) et conversion vectorisée des
+              montants en EUR avant l'application des seuils. Le taux d'une
+              transaction est le dernier publié à sa date ou avant : une
+              recherche binaire sur une clé (devise, jour) pour tout le lot,
+              sans conversion ligne à ligne. Un taux plus ancien que
+              ANCIENNETE_MAX_JOURS est signalé (et compté dans les
+              statistiques) ; au-delà d'un âge maximal configurable, la
+              conversion échoue pour que l'exécution s'arrête.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+COLONNES_TAUX = ('Date', 'Devise', 'Taux')
+# Décalage du numéro de jour dans la clé (devise << 32) | jour
+DECALAGE_JOUR = 1 << 31
+# Au-delà, le taux appliqué est signalé comme ancien (table au moins mensuelle attendue)
+ANCIENNETE_MAX_JOURS = 31
+
+
+def _cles(codes_devise, jours):
+    """Clé int64 triable (devise, jour) : l'ordre des clés est celui des couples."""
+    return (codes_devise.astype(np.int64) << 32) | (jours + DECALAGE_JOUR)
+
+
+class FxRateTable:
+    """
+    Taux de référence par devise et par date, triés par (devise, jour).
+
+    La devise de référence (EUR) vaut toujours 1 et n'a pas à figurer dans
+    le fichier. Aucun taux n'est extrapolé avant la première date publiée
+    d'une devise : la transaction reste sans taux.
+    """
+
+    def __init__(self, devises, jours, taux, devise_reference='EUR', anciennete_erreur_jours=None):
+        """
+        Args:
+            devises (array-like): Devise de chaque taux
+            jours (ndarray): Date de publication en jours depuis 1970 (int64)
+            taux (ndarray): Unités de devise pour 1 unité de la devise de référence
+            devise_reference (str): Devise de conversion
+            anciennete_erreur_jours (int): Âge maximal d'un taux appliqué ; au-delà, la
+                conversion lève ValueError (None = avertissement seul)
+        """
+        codes, devises = pd.factorize(np.asarray(devises, dtype=object), sort=True)
+        self.devises = pd.Index(devises)
+        cles = _cles(codes, np.asarray(jours, dtype=np.int64))
+        # Même devise et même date : le dernier taux du fichier l'emporte
+        ordre = np.argsort(cles, kind='stable')
+        garde = np.ones(len(ordre), dtype=bool)
+        garde[:-1] = cles[ordre][1:] != cles[ordre][:-1]
+        ordre = ordre[garde]
+        self.cles = cles[ordre]
+        self.codes = codes[ordre]
+        self.taux = np.asarray(taux, dtype=np.float64)[ordre]
+        self.devise_reference = devise_reference
+        self.anciennete_erreur_jours = anciennete_erreur_jours
+
+    @classmethod
+    def from_csv(cls, chemin, sep=';', devise_reference='EUR', anciennete_erreur_jours=None):
+        """
+        Charge un fichier de taux Date;Devise;Taux (dates au format AAAA-MM-JJ).
+
+        Raises:
+            ValueError: Colonnes manquantes, date invalide ou taux non strictement positif
+        """
+        df = pd.read_csv(chemin, sep=sep, dtype={'Devise': str, 'Taux': np.float64})
+        manquantes = [col for col in COLONNES_TAUX if col not in df.columns]
+        if manquantes:
+            raise ValueError(f"Colonnes manquantes dans {chemin} : {manquantes}")
+        dates = pd.to_datetime(df['Date'], format='%Y-%m-%d', errors='coerce')
+        invalides = dates.isna() | df['Devise'].isna() | ~(df['Taux'] > 0)
+        if df.empty:
+            raise ValueError(f"Aucun taux dans {chemin}")
+        if invalides.any():
+            lignes = (np.flatnonzero(invalides.to_numpy()) + 2).tolist()[:10]
+            raise ValueError(f"Taux invalides dans {chemin} (lignes {lignes})")
+
+        table = cls(df['Devise'].str.strip().str.upper(), dates.to_numpy(dtype='datetime64[D]').astype(np.int64),
+                    df['Taux'].to_numpy(), devise_reference, anciennete_erreur_jours)
+        logger.info(f"Taux de change charges : {len(table)} taux, devises {list(table.devises)}, "
+                    f"du {dates.min():%Y-%m-%d} au {dates.max():%Y-%m-%d}")
+        return table
+
+    def __len__(self):
+        return len(self.taux)
+
+    def rates(self, devises, jours):
+        """
+        Taux applicable à chaque transaction (dernier publié à sa date ou avant).
+
+        Les devises sont factorisées : la correspondance avec la table n'est
+        faite qu'une fois par devise distincte.
+
+        Args:
+            devises (Series): Devise de chaque transaction
+            jours (ndarray): Numéro de jour int64 (NAT_JOUR = plus petit int64 si date manquante)
+
+        Returns:
+            tuple: (taux float64 : 1 pour la devise de référence, NaN si aucun taux ;
+                nombre de transactions dont le taux a plus de ANCIENNETE_MAX_JOURS jours)
+
+        Raises:
+            ValueError: Taux appliqué plus ancien que `anciennete_erreur_jours`
+        """
+        codes, modalites = pd.factorize(devises)
+        modalites = np.asarray(modalites, dtype=object)
+        # Code -1 (devise manquante) : dernière case, devise absente de la table
+        codes_table = np.append(self.devises.get_indexer(modalites), -1)[codes]
+        reference = np.append(modalites == self.devise_reference, False)[codes]
+
+        jours = np.asarray(jours, dtype=np.int64)
+        connus = (codes_table >= 0) & (jours != np.iinfo(np.int64).min)
+        cles = _cles(codes_table[connus], jours[connus])
+        positions = np.searchsorted(self.cles, cles, side='right') - 1
+        # Position avant le premier taux de la devise : aucun taux publié à cette date
+        trouves = (positions >= 0) & (self.codes[np.maximum(positions, 0)] == codes_table[connus])
+
+        positions = positions[trouves]
+        anciennete = jours[connus][trouves] - ((self.cles[positions] & 0xFFFFFFFF) - DECALAGE_JOUR)
+        anciens = int(np.count_nonzero(anciennete > ANCIENNETE_MAX_JOURS))
+        if self.anciennete_erreur_jours is not None and len(anciennete) \
+                and anciennete.max() > self.anciennete_erreur_jours:
+            trop_anciens = int(np.count_nonzero(anciennete > self.anciennete_erreur_jours))
+            raise ValueError(f"{trop_anciens} transactions avec un taux de change de plus de "
+                             f"{self.anciennete_erreur_jours} jours (jusqu'a {int(anciennete.max())} jours) : "
+                             "table de taux a mettre a jour")
+        if anciens:
+            logger.warning(f"   • {anciens} transactions converties avec un taux de plus de "
+                           f"{ANCIENNETE_MAX_JOURS} jours (table de taux a mettre a jour)")
+
+        taux = np.full(len(jours), np.nan)
+        taux[np.flatnonzero(connus)[trouves]] = self.taux[positions]
+        taux[reference] = 1.0
+        return taux, anciens
+
+    def convert(self, df, schema):
+        """
+        Ajoute le taux appliqué et le montant converti décrits par le schéma.
+
+        Une transaction sans taux (devise absente de la table, date
+        antérieure au premier taux ou manquante) garde un taux et un montant
+        converti manquants : les règles de montant l'ignorent, les autres
+        règles (pays, listes, profil client) s'appliquent, et le contrôle non
+        bloquant du taux la signale dans le rapport de quarantaine. Sans
+        effet si la colonne convertie existe déjà.
+
+        Args:
+            df (DataFrame): Transactions après conversion des types (colonne de jour présente)
+            schema (dict): SCHEMA_TRANSACTIONS
+
+        Returns:
+            int: Transactions converties avec un taux de plus de ANCIENNETE_MAX_JOURS jours
+                (df est modifié en place)
+        """
+        conversion = schema['conversion_eur']
+        if conversion['colonne'] in df.columns:
+            return 0
+        taux, anciens = self.rates(df[conversion['devise']], df[conversion['jour']].to_numpy(dtype=np.int64))
+        df[conversion['taux']] = taux
+        df[conversion['colonne']] = df[conversion['montant']].to_numpy(dtype=np.float64) / taux
+        return anciens
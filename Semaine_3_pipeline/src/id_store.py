@@ -0,0 +1,238 @@
+"""
+ENSEMBLE DES IDENTIFIANTS DÉJÀ VUS - DÉDOUBLONNAGE PAR LOTS
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Empreintes 64 bits des Transaction_ID déjà traités, rangées en
+              séries triées fusionnées par niveaux, pour dédoublonner un
+              fichier traité par morceaux sans conserver les identifiants.
+              L'historique persistant applique le même principe sur disque
+              pour écarter les transactions rejouées d'une exécution à
+              l'autre.
+"""
+
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Clés fixes : les empreintes doivent être identiques d'une exécution à l'autre
+CLE_HACHAGE = "bnp-transactions"
+CLE_VERIFICATION = "bnp-verification"
+
+VERSION_HISTORIQUE = 1
+MANIFESTE_HISTORIQUE = 'historique.json'
+# Taille maximale d'une série issue d'une fusion (borne la mémoire de la compaction : 1 Go)
+TAILLE_MAX_FUSION = 1 << 26
+
+
+def hacher_ids(ids, cle=CLE_HACHAGE):
+    """Empreintes 64 bits stables d'une série d'identifiants."""
+    return pd.util.hash_pandas_object(pd.Series(ids), index=False, hash_key=cle).to_numpy()
+
+
+class SeenIdStore:
+    """
+    Ensemble d'empreintes d'identifiants, testable et alimenté par lots.
+
+    Chaque lot ajouté forme une série triée ; deux séries de tailles
+    comparables sont fusionnées, ce qui garde un nombre logarithmique de
+    séries. Un test d'appartenance est un `searchsorted` par série.
+    """
+
+    def __init__(self):
+        self.series = []
+
+    def __len__(self):
+        return sum(len(serie) for serie in self.series)
+
+    def contains(self, empreintes):
+        """Masque des empreintes déjà présentes dans l'ensemble."""
+        empreintes = np.asarray(empreintes, dtype=np.uint64)
+        trouve = np.zeros(len(empreintes), dtype=bool)
+        for serie in self.series:
+            positions = np.searchsorted(serie, empreintes)
+            np.minimum(positions, len(serie) - 1, out=positions)
+            trouve |= serie[positions] == empreintes
+        return trouve
+
+    def add(self, empreintes):
+        """Ajoute des empreintes (supposées absentes de l'ensemble)."""
+        empreintes = np.unique(np.asarray(empreintes, dtype=np.uint64))
+        if len(empreintes) == 0:
+            return
+        self.series.append(empreintes)
+        while len(self.series) > 1 and len(self.series[-2]) <= 2 * len(self.series[-1]):
+            derniere = self.series.pop()
+            self.series[-1] = np.sort(np.concatenate((self.series[-1], derniere)), kind='mergesort')
+
+    def first_seen(self, ids):
+        """
+        Marque les premières occurrences d'un lot et les enregistre.
+
+        Équivaut à `drop_duplicates(keep='first')` appliqué à la
+        concaténation de tous les lots passés à cette méthode.
+
+        Args:
+            ids (array-like): Identifiants du lot
+
+        Returns:
+            ndarray: Masque des lignes à conserver
+        """
+        empreintes = hacher_ids(ids)
+        garde = ~pd.Series(empreintes).duplicated().to_numpy()
+        garde[garde] = ~self.contains(empreintes[garde])
+        self.add(empreintes[garde])
+        return garde
+
+
+class TransactionIdHistory:
+    """
+    Historique persistant des Transaction_ID traités par les exécutions précédentes.
+
+    Chaque exécution réussie ajoute une série triée de couples d'empreintes
+    (h1, h2) obtenues avec deux clés de hachage indépendantes. Un test
+    d'appartenance est un `searchsorted` de h1 par série, chargée en mémoire
+    mappée ; h2 confirme la correspondance, ce qui équivaut à une empreinte
+    de 128 bits (collision négligeable après des années d'historique). Les
+    séries de tailles comparables sont fusionnées jusqu'à TAILLE_MAX_FUSION :
+    le nombre de séries reste faible et la mémoire résidente se limite aux
+    pages lues.
+
+    Un seul processus doit écrire dans un répertoire d'historique à la fois.
+    """
+
+    def __init__(self, repertoire):
+        """
+        Ouvre l'historique d'un répertoire (vide s'il n'existe pas encore).
+
+        Args:
+            repertoire (str): Répertoire des séries et du manifeste
+        """
+        self.repertoire = repertoire
+        self.series = []
+        self.en_attente = []
+        self.prochain = 0
+
+        chemin = os.path.join(repertoire, MANIFESTE_HISTORIQUE)
+        if not os.path.exists(chemin):
+            logger.info(f"Aucun historique d'identifiants existant ({repertoire}), historique vide")
+            return
+        with open(chemin, 'r', encoding='utf-8') as f:
+            manifeste = json.load(f)
+        if manifeste.get('version') != VERSION_HISTORIQUE:
+            raise ValueError(f"Version d'historique non supportée : {manifeste.get('version')}")
+        self.prochain = manifeste['prochain']
+        for nom in manifeste['series']:
+            self.series.append((nom, *self._lire_serie(nom)))
+        logger.info(f"Historique d'identifiants charge : {len(self)} transactions, {len(self.series)} series")
+
+    def __len__(self):
+        return sum(len(h1) for _, h1, _ in self.series)
+
+    def _chemins(self, nom):
+        return (os.path.join(self.repertoire, f"{nom}_h1.npy"),
+                os.path.join(self.repertoire, f"{nom}_h2.npy"))
+
+    def _lire_serie(self, nom):
+        return tuple(np.load(chemin, mmap_mode='r') for chemin in self._chemins(nom))
+
+    def _ecrire_serie(self, h1, h2):
+        """Écrit une nouvelle série triée et la rouvre en mémoire mappée."""
+        nom = f"serie_{self.prochain:06d}"
+        self.prochain += 1
+        for chemin, valeurs in zip(self._chemins(nom), (h1, h2)):
+            temporaire = f"{chemin}.tmp.npy"
+            np.save(temporaire, valeurs)
+            os.replace(temporaire, chemin)
+        return (nom, *self._lire_serie(nom))
+
+    def _contient(self, h1, h2):
+        trouve = np.zeros(len(h1), dtype=bool)
+        for _, s1, s2 in self.series:
+            positions = np.searchsorted(s1, h1)
+            np.minimum(positions, len(s1) - 1, out=positions)
+            meme_h1 = np.asarray(s1[positions]) == h1
+            egal = meme_h1 & (np.asarray(s2[positions]) == h2)
+            trouve |= egal
+            # h1 identique pour deux identifiants différents (très rare) : h2 cherché parmi les suivants
+            for i in np.flatnonzero(meme_h1 & ~egal):
+                debut, fin = positions[i], np.searchsorted(s1, h1[i], side='right')
+                trouve[i] |= h2[i] in np.asarray(s2[debut:fin])
+        return trouve
+
+    def contains(self, ids):
+        """
+        Marque les identifiants déjà traités par une exécution précédente.
+
+        Args:
+            ids (array-like): Transaction_ID à contrôler
+
+        Returns:
+            ndarray: Masque des identifiants présents dans l'historique
+        """
+        if not self.series:
+            return np.zeros(len(ids), dtype=bool)
+        return self._contient(hacher_ids(ids), hacher_ids(ids, CLE_VERIFICATION))
+
+    def stage(self, ids):
+        """Prépare l'ajout des identifiants traités par l'exécution en cours (écrits par save)."""
+        self.en_attente.append((hacher_ids(ids), hacher_ids(ids, CLE_VERIFICATION)))
+
+    def save(self):
+        """
+        Ajoute les identifiants préparés à l'historique (uniquement après une exécution réussie).
+
+        La série de l'exécution est écrite, fusionnée avec les précédentes
+        de taille comparable, puis le manifeste est remplacé atomiquement ;
+        les séries fusionnées ne sont supprimées qu'ensuite.
+        """
+        if not self.en_attente:
+            return
+        h1 = np.concatenate([h for h, _ in self.en_attente])
+        h2 = np.concatenate([h for _, h in self.en_attente])
+        self.en_attente = []
+        nouveaux = ~self._contient(h1, h2)
+        h1, h2 = _trier_uniques(h1[nouveaux], h2[nouveaux])
+        if len(h1) == 0:
+            return
+
+        os.makedirs(self.repertoire, exist_ok=True)
+        obsoletes = []
+        self.series.append(self._ecrire_serie(h1, h2))
+        while len(self.series) > 1:
+            (nom_a, a1, a2), (nom_b, b1, b2) = self.series[-2], self.series[-1]
+            if len(a1) > 2 * len(b1) or len(a1) + len(b1) > TAILLE_MAX_FUSION:
+                break
+            fusion = _trier_uniques(np.concatenate((a1, b1)), np.concatenate((a2, b2)))
+            # Références aux séries projetées libérées avant leur suppression
+            del self.series[-2:], a1, a2, b1, b2
+            obsoletes += [nom_a, nom_b]
+            self.series.append(self._ecrire_serie(*fusion))
+
+        chemin = os.path.join(self.repertoire, MANIFESTE_HISTORIQUE)
+        with open(f"{chemin}.tmp", 'w', encoding='utf-8') as f:
+            json.dump({'version': VERSION_HISTORIQUE, 'prochain': self.prochain,
+                       'series': [nom for nom, _, _ in self.series]}, f)
+        os.replace(f"{chemin}.tmp", chemin)
+
+        for nom in obsoletes:
+            for fichier in self._chemins(nom):
+                try:
+                    os.remove(fichier)
+                except OSError as e:
+                    # Série encore projetée en mémoire (Windows) : plus référencée par le manifeste
+                    logger.warning(f"Serie obsolete non supprimee : {fichier} ({e})")
+        logger.info(f"Historique d'identifiants sauvegarde : {len(self)} transactions, "
+                    f"{len(self.series)} series ({self.repertoire})")
+
+
+def _trier_uniques(h1, h2):
+    """Couples (h1, h2) distincts triés par h1 puis h2."""
+    ordre = np.lexsort((h2, h1))
+    h1, h2 = h1[ordre], h2[ordre]
+    garde = np.ones(len(h1), dtype=bool)
+    garde[1:] = (h1[1:] != h1[:-1]) | (h2[1:] != h2[:-1])
+    return h1[garde], h2[garde]
@@ -0,0 +1,188 @@
+"""
+CACHE DES FICHIERS D'ENTRÉE ANALYSÉS
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Tables typées (et nettoyées pour les transactions) stockées au
+              format Arrow IPC, mappable en mémoire, sous une clé dérivée du
+              contenu du fichier source et de la version du schéma. Une
+              relance sur des fichiers inchangés (reprise Blue Prism,
+              nouvelle exécution d'un analyste) évite lecture et nettoyage.
+              La taille du cache est bornée : les entrées les moins
+              récemment utilisées sont supprimées en premier.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+
+import pandas as pd
+
+from columnar_output import require_pyarrow
+
+logger = logging.getLogger(__name__)
+
+# À incrémenter si le nettoyage change (les entrées existantes deviennent inaccessibles)
+VERSION_CACHE = 1
+EXTENSION = '.arrow'
+EMPREINTES = 'empreintes_fichiers.json'
+TAILLE_BLOC = 1 << 20
+
+
+def empreinte_fichier(chemin):
+    """Empreinte SHA-256 du contenu d'un fichier (lu par blocs)."""
+    sha = hashlib.sha256()
+    with open(chemin, 'rb') as f:
+        for bloc in iter(lambda: f.read(TAILLE_BLOC), b''):
+            sha.update(bloc)
+    return sha.hexdigest()
+
+
+class InputCache:
+    """
+    Répertoire d'entrées `<clé>.arrow`, une par table.
+
+    La clé combine l'empreinte du fichier source, le type de table et la
+    version du schéma : un fichier modifié ou un schéma changé donne une
+    nouvelle clé. Les métadonnées (statistiques du fichier brut, doublons
+    supprimés) sont rangées dans le schéma Arrow. L'empreinte d'un fichier
+    est mémorisée par (chemin, taille, date) pour ne pas relire un fichier
+    déjà haché. Transactions et clients étant chargés en parallèle, le
+    fichier des empreintes et l'éviction sont protégés par un verrou.
+    """
+
+    def __init__(self, repertoire, taille_max_octets=2 * 1024 ** 3):
+        require_pyarrow()
+        self.repertoire = repertoire
+        self.taille_max_octets = taille_max_octets
+        self._verrou = threading.Lock()
+        os.makedirs(repertoire, exist_ok=True)
+
+    def key(self, chemin, table, schema):
+        """
+        Clé d'une table issue d'un fichier.
+
+        Args:
+            chemin (str): Fichier source
+            table (str): Type de table ('transactions', 'clients')
+            schema (dict): Schéma déclaré utilisé pour la lecture
+
+        Returns:
+            str: Clé hexadécimale
+        """
+        contenu = json.dumps([VERSION_CACHE, table, schema, self._empreinte(chemin)], sort_keys=True)
+        return hashlib.sha256(contenu.encode('utf-8')).hexdigest()[:32]
+
+    def _lire_empreintes(self):
+        try:
+            with open(os.path.join(self.repertoire, EMPREINTES), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _empreinte(self, chemin):
+        stat = os.stat(chemin)
+        signature = [stat.st_size, stat.st_mtime_ns]
+        with self._verrou:
+            connu = self._lire_empreintes().get(os.path.abspath(chemin))
+        if connu is not None and connu[:2] == signature:
+            return connu[2]
+
+        # Hachage hors verrou : l'autre fichier d'entrée peut être haché en même temps
+        empreinte = empreinte_fichier(chemin)
+        with self._verrou:
+            memo = self._lire_empreintes()
+            memo[os.path.abspath(chemin)] = signature + [empreinte]
+            memo_path = os.path.join(self.repertoire, EMPREINTES)
+            temporaire = f"{memo_path}.tmp"
+            with open(temporaire, 'w', encoding='utf-8') as f:
+                json.dump(memo, f)
+            os.replace(temporaire, memo_path)
+        return empreinte
+
+    def _chemin(self, cle):
+        return os.path.join(self.repertoire, f"{cle}{EXTENSION}")
+
+    def get(self, cle):
+        """
+        Table en cache, ou None.
+
+        Returns:
+            tuple: (DataFrame, métadonnées) ou None si la clé est absente
+        """
+        chemin = self._chemin(cle)
+        if not os.path.exists(chemin):
+            return None
+        pa, _ = require_pyarrow()
+        try:
+            with pa.memory_map(chemin, 'r') as source:
+                table = pa.ipc.open_file(source).read_all()
+                # Conversion avant fermeture : la table référence le fichier mappé
+                df = table.to_pandas(split_blocks=True)
+                metadonnees = json.loads((table.schema.metadata or {}).get(b'bnp_cache', b'{}'))
+            del table
+        except (OSError, pa.ArrowInvalid) as e:
+            logger.warning(f"Entrée de cache illisible ({chemin}) : {e}, suppression")
+            os.remove(chemin)
+            return None
+        # Date d'accès pour l'éviction LRU (l'entrée a pu être évincée entre-temps)
+        try:
+            os.utime(chemin)
+        except FileNotFoundError:
+            pass
+        return df, metadonnees
+
+    def put(self, cle, df, metadonnees=None):
+        """Écrit une table (fichier temporaire puis remplacement atomique) puis applique l'éviction."""
+        pa, _ = require_pyarrow()
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            b'bnp_cache': json.dumps(metadonnees or {}, default=_json_defaut).encode('utf-8'),
+        })
+        chemin = self._chemin(cle)
+        temporaire = f"{chemin}.tmp"
+        with pa.OSFile(temporaire, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(temporaire, chemin)
+        self.evict(garder=cle)
+
+    def evict(self, garder=None):
+        """Supprime les entrées les moins récemment utilisées au-delà de la taille maximale."""
+        with self._verrou:
+            self._evict(garder)
+
+    def _evict(self, garder):
+        entrees = []
+        for nom in os.listdir(self.repertoire):
+            if nom.endswith(EXTENSION):
+                stat = os.stat(os.path.join(self.repertoire, nom))
+                entrees.append((stat.st_mtime_ns, stat.st_size, nom))
+        total = sum(taille for _, taille, _ in entrees)
+        for _, taille, nom in sorted(entrees):
+            if total <= self.taille_max_octets:
+                break
+            if garder is not None and nom == f"{garder}{EXTENSION}":
+                continue
+            os.remove(os.path.join(self.repertoire, nom))
+            total -= taille
+            logger.info(f"Cache des entrées : {nom} supprimé (taille maximale atteinte)")
+
+
+def _json_defaut(obj):
+    """Types NumPy et dates des statistiques -> types JSON."""
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    if hasattr(obj, 'item'):
+        return obj.item()
+    return str(obj)
+
+
+def restaurer_stats(stats):
+    """Statistiques relues du cache : les bornes de période redeviennent des Timestamp."""
+    stats = dict(stats)
+    for cle in ('period_min', 'period_max'):
+        if stats.get(cle) is not None:
+            stats[cle] = pd.Timestamp(stats[cle])
+    return stats
@@ -0,0 +1,230 @@
+"""
+FILTRAGE DE NOMS APPROXIMATIF - LISTES DE SANCTIONS
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Rapprochement approximatif de noms (clients, contreparties)
+              avec les listes de sanctions par index inversé de trigrammes :
+              génération de candidats par blocage, puis score de similarité
+              (Dice sur trigrammes) calculé uniquement pour ces candidats.
+"""
+
+import logging
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_NON_ALPHANUM = re.compile(r'[^A-Z0-9]+')
+
+
+def normaliser_nom(nom):
+    """Normalise un nom : sans accents, majuscules, ponctuation remplacée par des espaces."""
+    if not isinstance(nom, str):
+        return ''
+    sans_accents = unicodedata.normalize('NFKD', nom).encode('ascii', 'ignore').decode('ascii')
+    return _NON_ALPHANUM.sub(' ', sans_accents.upper()).strip()
+
+
+def trigrammes(nom_normalise):
+    """Ensemble des trigrammes d'un nom normalisé (bordé d'espaces)."""
+    texte = f" {nom_normalise} "
+    return {texte[i:i + 3] for i in range(len(texte) - 2)}
+
+
+class NameScreener:
+    """
+    Moteur de filtrage approximatif de noms contre une liste de référence.
+
+    La similarité est le coefficient de Dice sur les ensembles de trigrammes.
+    Le blocage est exact (filtrage par préfixe des deux côtés) : les
+    trigrammes sont ordonnés du plus rare au plus fréquent et une paire ne
+    peut atteindre le seuil que si le préfixe du nom contrôlé et celui de
+    l'entrée partagent un trigramme. Seul le préfixe des entrées est indexé ;
+    les candidats sont ensuite vérifiés et scorés exactement.
+    """
+
+    def __init__(self, noms_reference, listes=None, seuil=0.8, paires_par_lot=5_000_000,
+                 cellules_par_lot=64_000_000):
+        """
+        Construit l'index inversé de trigrammes.
+
+        Args:
+            noms_reference (array-like): Noms des listes de sanctions
+            listes (array-like): Nom de la liste d'origine de chaque entrée (optionnel)
+            seuil (float): Score minimal retenu (0 à 1)
+            paires_par_lot (int): Nombre indicatif de paires candidates par lot
+            cellules_par_lot (int): Taille maximale de la matrice de présence d'un lot
+        """
+        self.noms_reference = np.asarray(noms_reference, dtype=object)
+        self.listes = (np.asarray(listes, dtype=object) if listes is not None
+                       else np.full(len(self.noms_reference), '', dtype=object))
+        self.seuil = seuil
+        self.paires_par_lot = paires_par_lot
+        self.cellules_par_lot = cellules_par_lot
+
+        # 1. Vocabulaire et paires (trigramme, entrée)
+        self.vocabulaire = {}
+        ids_trigrammes = []
+        ids_entrees = []
+        for i, nom in enumerate(self.noms_reference):
+            ids = [self.vocabulaire.setdefault(t, len(self.vocabulaire))
+                   for t in trigrammes(normaliser_nom(nom))]
+            ids_trigrammes.extend(ids)
+            ids_entrees.extend([i] * len(ids))
+
+        ids_trigrammes = np.asarray(ids_trigrammes, dtype=np.int64)
+        ids_entrees = np.asarray(ids_entrees, dtype=np.int64)
+        nb_entrees = len(self.noms_reference)
+
+        # 2. Index direct entrée -> trigrammes (CSR), du plus rare au plus fréquent
+        self.frequences = np.bincount(ids_trigrammes, minlength=len(self.vocabulaire))
+        ordre = np.lexsort((ids_trigrammes, self.frequences[ids_trigrammes], ids_entrees))
+        self.trigrammes_entrees = ids_trigrammes[ordre]
+        self.tailles_entrees = np.bincount(ids_entrees, minlength=nb_entrees)
+        self.offsets_entrees = np.concatenate(([0], np.cumsum(self.tailles_entrees)))
+
+        # 3. Index inversé trigramme -> entrées (CSR) restreint au préfixe de chaque entrée
+        entrees_triees = ids_entrees[ordre]
+        rang = np.arange(len(ordre)) - self.offsets_entrees[entrees_triees]
+        dans_prefixe = rang < self._longueur_prefixe(self.tailles_entrees)[entrees_triees]
+        t_prefixe, e_prefixe = self.trigrammes_entrees[dans_prefixe], entrees_triees[dans_prefixe]
+        ordre = np.lexsort((e_prefixe, t_prefixe))
+        self.postings = e_prefixe[ordre]
+        self.offsets = np.concatenate((
+            [0], np.cumsum(np.bincount(t_prefixe, minlength=len(self.vocabulaire)))
+        ))
+
+        logger.info(f"Index trigrammes : {nb_entrees} noms, {len(self.vocabulaire)} trigrammes")
+
+    def _longueur_prefixe(self, tailles):
+        """
+        Longueur du préfixe de blocage pour des ensembles de tailles données.
+
+        Dice >= s implique |A ∩ B| >= c_min = s|A| / (2 - s) : parmi les
+        |A| - c_min + 1 trigrammes les plus rares de A, au moins un est commun.
+        """
+        tailles = np.asarray(tailles, dtype=np.int64)
+        c_min = np.maximum(1, np.ceil(self.seuil * tailles / (2 - self.seuil) - 1e-9).astype(np.int64))
+        return np.maximum(0, tailles - c_min + 1)
+
+    def _preparer_requete(self, nom):
+        """Trigrammes connus d'un nom, taille totale et préfixe de blocage."""
+        ids = [self.vocabulaire.get(t, -1) for t in trigrammes(normaliser_nom(nom))]
+        taille = len(ids)
+        k = int(self._longueur_prefixe(taille))
+
+        # Même ordre global que les entrées ; les trigrammes inconnus sont les plus rares
+        ids.sort(key=lambda i: (self.frequences[i], i) if i >= 0 else (0, -1))
+        prefixe = [i for i in ids[:k] if i >= 0]
+        connus = [i for i in ids if i >= 0]
+        return connus, taille, prefixe
+
+    def screen(self, noms):
+        """
+        Rapproche une série de noms de la liste de référence.
+
+        Args:
+            noms (array-like): Noms à contrôler (doublons traités une seule fois)
+
+        Returns:
+            DataFrame: Correspondances (Indice, Nom, Nom_Liste, Liste, Score)
+                       triées par indice puis score décroissant
+        """
+        codes, uniques = pd.factorize(pd.Series(noms, dtype=object))
+        requetes = [self._preparer_requete(nom) for nom in uniques]
+        tailles_requetes = np.array([taille for _, taille, _ in requetes], dtype=np.int64)
+
+        # Nombre de paires candidates de chaque nom unique (pour découper en lots)
+        longueurs_postings = np.diff(self.offsets)
+        paires_par_nom = np.array(
+            [longueurs_postings[prefixe].sum() if prefixe else 0 for _, _, prefixe in requetes],
+            dtype=np.int64
+        )
+
+        # Lots bornés en paires candidates et en taille de matrice de présence
+        requetes_par_lot = max(1, self.cellules_par_lot // max(1, len(self.vocabulaire)))
+
+        resultats = []
+        debut = 0
+        while debut < len(uniques):
+            cumul = np.cumsum(paires_par_nom[debut:debut + requetes_par_lot])
+            fin = debut + max(1, int(np.searchsorted(cumul, self.paires_par_lot, side='right')))
+            resultats.append(self._screen_lot(requetes, tailles_requetes, debut, fin))
+            debut = fin
+
+        if resultats:
+            q_unique, entrees, scores = (np.concatenate(parts) for parts in zip(*resultats))
+        else:
+            q_unique, entrees, scores = np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0)
+
+        # Retour aux lignes d'origine (un nom répété hérite des correspondances de son unique)
+        correspondances = pd.DataFrame({'code': q_unique, 'entree': entrees, 'Score': scores})
+        lignes = pd.DataFrame({'Indice': np.arange(len(codes)), 'code': codes})
+        resultat = lignes.merge(correspondances, on='code', how='inner')
+
+        resultat['Nom'] = uniques.to_numpy(dtype=object)[resultat['code'].to_numpy()]
+        resultat['Nom_Liste'] = self.noms_reference[resultat['entree'].to_numpy()]
+        resultat['Liste'] = self.listes[resultat['entree'].to_numpy()]
+        resultat['Score'] = resultat['Score'].round(4)
+
+        return (resultat.sort_values(['Indice', 'Score'], ascending=[True, False])
+                [['Indice', 'Nom', 'Nom_Liste', 'Liste', 'Score']]
+                .reset_index(drop=True))
+
+    @staticmethod
+    def _deplier(offsets, valeurs, ids):
+        """Concatène les segments CSR `valeurs[offsets[i]:offsets[i+1]]` des ids donnés."""
+        longueurs = offsets[ids + 1] - offsets[ids]
+        total = int(longueurs.sum())
+        decalage = np.repeat(offsets[ids] - (np.cumsum(longueurs) - longueurs), longueurs)
+        return valeurs[decalage + np.arange(total)], longueurs
+
+    def _screen_lot(self, requetes, tailles_requetes, debut, fin):
+        """Blocage, vérification et score d'un lot de noms uniques [debut, fin)."""
+        vide = np.empty(0, dtype=np.int64)
+        lot = requetes[debut:fin]
+        nb_prefixe = np.array([len(prefixe) for _, _, prefixe in lot], dtype=np.int64)
+        if nb_prefixe.sum() == 0:
+            return vide, vide, np.empty(0)
+
+        # 1. Blocage : entrées partageant un trigramme du préfixe
+        q = np.repeat(np.arange(debut, fin, dtype=np.int64), nb_prefixe)
+        t = np.fromiter((i for _, _, prefixe in lot for i in prefixe), dtype=np.int64, count=int(nb_prefixe.sum()))
+        e_paires, longueurs = self._deplier(self.offsets, self.postings, t)
+        nb_entrees = len(self.noms_reference)
+        cles = np.unique(np.repeat(q, longueurs) * nb_entrees + e_paires)
+        q_cand, e_cand = cles // nb_entrees, cles % nb_entrees
+
+        # 2. Filtre de longueur : s|A|/(2-s) <= |B| <= (2-s)|A|/s
+        tq, te = tailles_requetes[q_cand], self.tailles_entrees[e_cand]
+        garde = (te * (2 - self.seuil) >= self.seuil * tq) & (te * self.seuil <= (2 - self.seuil) * tq)
+        q_cand, e_cand = q_cand[garde], e_cand[garde]
+        if len(q_cand) == 0:
+            return vide, vide, np.empty(0)
+
+        # 3. Vérification exacte : matrice (requête du lot x trigramme) de présence
+        nb_vocab = len(self.vocabulaire)
+        nb_connus = np.array([len(connus) for connus, _, _ in lot], dtype=np.int64)
+        presence = np.zeros((fin - debut) * nb_vocab, dtype=bool)
+        presence[
+            np.repeat(np.arange(fin - debut, dtype=np.int64), nb_connus) * nb_vocab
+            + np.fromiter((i for connus, _, _ in lot for i in connus), dtype=np.int64, count=int(nb_connus.sum()))
+        ] = True
+        t_entrees, longueurs = self._deplier(self.offsets_entrees, self.trigrammes_entrees, e_cand)
+        paire = np.repeat(np.arange(len(q_cand)), longueurs)
+        communs = np.bincount(
+            paire, weights=presence[(q_cand - debut)[paire] * nb_vocab + t_entrees], minlength=len(q_cand)
+        )
+
+        # 4. Score de Dice : 2 * |A ∩ B| / (|A| + |B|)
+        scores = 2.0 * communs / (tailles_requetes[q_cand] + self.tailles_entrees[e_cand])
+        garde = scores >= self.seuil
+        return q_cand[garde], e_cand[garde], scores[garde]
+
+    @classmethod
+    def from_file(cls, chemin, seuil=0.8, sep=';'):
+        """Construit le moteur depuis un fichier de sanctions (colonnes Nom et Liste)."""
+        df = pd.read_csv(chemin, sep=sep, dtype=str)
+        return cls(df['Nom'], df['Liste'] if 'Liste' in df.columns else None, seuil=seuil)
@@ -11,26 +11,71 @@ import logging
 import sys
 import os
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Import des modules personnalisés
-from data_processor import DataProcessor
+from data_processor import DataProcessor, TransactionStatsAccumulator
 from rules_engine import RulesEngine
+from name_screening import NameScreener
+from id_store import SeenIdStore, TransactionIdHistory
+from alert_spool import AlertSpool, PRIORITY_ORDER
+from client_state import ClientStateStore
+from columnar_output import formats_actifs, require_pyarrow, write_parquet, write_manifest, ParquetAppender
+from input_cache import InputCache
+from checkpoint import CheckpointStore
+from fx_rates import FxRateTable
+from instrumentation import StageProfiler
+from schemas import SCHEMA_TRANSACTIONS
 
-# Configuration du logging SANS ÉMOJIS pour Windows
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('pipeline_execution.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
 logger = logging.getLogger(__name__)
 
+# Journal d'exécution, configuré au lancement en ligne de commande (pas à l'import)
+FICHIER_JOURNAL = 'pipeline_execution.log'
+
+# Lignes extraites à la fois lors de l'export d'une sélection (alertes)
+TAILLE_BLOC_EXPORT = 100_000
+
+# Table locale des taux de change (convention BCE : unités de devise pour 1 EUR)
+FICHIER_TAUX_CHANGE = "./config/taux_change.csv"
+
+# Points de reprise de --resume, dans le répertoire de sortie si aucun répertoire n'est donné
+REPERTOIRE_REPRISE = "reprise"
+
+def configurer_journalisation(fichier=FICHIER_JOURNAL):
+    """Configure le logging SANS ÉMOJIS pour Windows : fichier journal et console."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(fichier),
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
+
 class CompliancePipeline:
     """Pipeline principal de traitement des données de compliance."""
     
-    def __init__(self, transactions_path, clients_path, output_dir='../output'):
+    # Colonnes exportées dans le fichier d'alertes
+    ALERTES_COLS = [
+        'Transaction_ID', 'Date', 'Client_ID', 'Montant', 'Devise', 'Montant_EUR',
+        'Beneficiaire', 'Pays_Beneficiaire', 'Niveau_Risque', 'Est_PEP',
+        'Alertes', 'Alertes_Flags', 'Niveau_Alerte', 'Score_Risque', 'Details_Alertes'
+    ]
+    
+    # Lignes rejetées par la validation ligne à ligne, avec leurs codes motifs, et lignes
+    # signalées mais scorées (taux de change absent)
+    FICHIER_QUARANTAINE = 'quarantine'
+    
+    # Colonnes de calcul ajoutées au nettoyage (horodatage int64, numéro de jour, taux appliqué), non exportées
+    COLONNES_INTERNES = [SCHEMA_TRANSACTIONS['horodatage']['colonne'], SCHEMA_TRANSACTIONS['horodatage']['jour'],
+                         SCHEMA_TRANSACTIONS['conversion_eur']['taux']]
+    
+    def __init__(self, transactions_path, clients_path, output_dir='../output', chunk_size=None,
+                 workers=None, state_path=None, output_format='csv', csv_engine='c',
+                 input_cache_dir=None, input_cache_max_mb=2048, in_place=False, id_history_dir=None,
+                 fx_rates_path=FICHIER_TAUX_CHANGE, trace_memory=False, checkpoint_dir=None, resume=False,
+                 fx_max_age_days=None, state_replay=False):
         """
         Initialise le pipeline avec les chemins des fichiers.
         
@@ -38,17 +83,84 @@ class CompliancePipeline:
             transactions_path (str): Chemin vers le fichier transactions
             clients_path (str): Chemin vers le fichier clients
             output_dir (str): Répertoire de sortie
+            chunk_size (int): Taille des morceaux en mode flux (None = tout en mémoire)
+            workers (int): Nombre de processus du mode parallèle (None ou 1 = série)
+            state_path (str): État client persisté du mode journalier incrémental (None = désactivé)
+            output_format (str): Format des fichiers de données : 'csv', 'parquet' ou 'both'
+            csv_engine (str): Moteur de lecture des CSV d'entrée : 'c' ou 'pyarrow' (multithread) ;
+                les classeurs .xlsx sont toujours lus en flux par excel_input
+            input_cache_dir (str): Cache des tables d'entrée analysées (None = désactivé ; ignoré en mode flux)
+            input_cache_max_mb (int): Taille maximale du cache d'entrées (éviction LRU)
+            in_place (bool): Exécution sans copie : l'enrichissement et les règles ajoutent
+                leurs colonnes à la table des transactions chargée
+            id_history_dir (str): Historique persistant des Transaction_ID traités ; les
+                transactions déjà traitées par une exécution précédente sont écartées (None = désactivé)
+            fx_rates_path (str): Taux de change datés (Date;Devise;Taux, unités pour 1 EUR) ; les seuils
+                s'appliquent à Montant_EUR (None ou fichier absent = montants non convertis)
+            trace_memory (bool): Pic de mémoire tracée (tracemalloc) de chaque étape dans la
+                section performance des statistiques (exécution nettement ralentie)
+            checkpoint_dir (str): Points de reprise des étapes longues (None = désactivé ;
+                ignoré en mode flux)
+            resume (bool): Reprend après la dernière étape terminée d'une exécution précédente
+                sur les mêmes entrées (points de reprise dans checkpoint_dir, par défaut
+                dans output_dir/reprise)
+            fx_max_age_days (int): Âge maximal d'un taux de change appliqué ; au-delà, le
+                nettoyage échoue (None = avertissement seul, taux anciens comptés dans les statistiques)
+            state_replay (bool): Fusionne dans l'état client un fichier contenant des jours déjà
+                intégrés (transactions tardives) ; sans cette option, l'exécution échoue pour ne
+                pas compter deux fois l'historique d'un fichier relancé
         """
+        if chunk_size and workers and workers > 1:
+            raise ValueError("Les modes flux (chunk_size) et parallèle (workers) sont exclusifs")
+        self.formats = formats_actifs(output_format)
+        if 'parquet' in self.formats:
+            require_pyarrow()
+        
         self.transactions_path = transactions_path
         self.clients_path = clients_path
         self.output_dir = output_dir
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.state_path = state_path
+        self.in_place = in_place
+        self.client_state = None
+        self.client_state_batch = None
+        self.state_replay = state_replay
+        self.id_history_dir = id_history_dir
+        self.id_history = None
+        self.fx_rates_path = fx_rates_path
+        self.fx_max_age_days = fx_max_age_days
+        self.config_path = None
+        self.index_dir = "./cache"
         
         # Initialisation des modules
-        self.data_processor = DataProcessor()
+        cache = (InputCache(input_cache_dir, input_cache_max_mb * 1024 ** 2)
+                 if input_cache_dir and not chunk_size else None)
+        self.data_processor = DataProcessor(csv_engine=csv_engine, cache=cache, in_place=in_place)
         self.rules_engine = None
         self.enriched_df = None
-        self.alerts_df = None
+        # Alertes : positions dans enriched_df triées par priorité, sans copie des lignes
+        self.alert_positions = None
+        self.name_matches = None
+        self.name_screener = None
+        self.transaction_matches = None
+        self.structuring_state = None
+        self.clean_stats = None
+        self.alert_spool = None
         self.summary_stats = {}
+        # Étapes dont les tâches indépendantes s'exécutent en parallèle (durées et gain)
+        self.overlap = {}
+        # Fichiers générés (nom -> nombre de lignes), repris dans manifest.json
+        self.output_files = {}
+        # Mesures par étape (durée, CPU, mémoire, débit), section performance des statistiques
+        self.profiler = StageProfiler(tracer_memoire=trace_memory)
+        # Points de reprise (mode flux exclu : les sorties sont écrites pendant les passes)
+        if resume and not checkpoint_dir:
+            checkpoint_dir = os.path.join(output_dir, REPERTOIRE_REPRISE)
+        self.resume = resume
+        self.checkpoints = CheckpointStore(checkpoint_dir) if checkpoint_dir and not chunk_size else None
+        if checkpoint_dir and chunk_size:
+            logger.warning("Points de reprise ignores en mode flux")
         
         # Création du répertoire de sortie si inexistant
         os.makedirs(output_dir, exist_ok=True)
@@ -58,7 +170,8 @@ class CompliancePipeline:
         config_path = "./config/rules_config.json"
         try:
             if os.path.exists(config_path):
-                self.rules_engine = RulesEngine(config_path)
+                self.rules_engine = RulesEngine(config_path, index_dir=self.index_dir)
+                self.config_path = config_path
                 logger.info("Configuration des règles chargée")
             else:
                 self.rules_engine = RulesEngine()  # Configuration par défaut
@@ -67,6 +180,134 @@ class CompliancePipeline:
             logger.error(f"Erreur lors du chargement de la configuration : {str(e)}")
             self.rules_engine = RulesEngine()
     
+    def load_client_state(self):
+        """Charge l'historique client persisté (mode journalier incrémental)."""
+        if not self.state_path:
+            return True
+        try:
+            self.client_state = ClientStateStore.load(self.state_path)
+            return True
+        except Exception as e:
+            logger.error(f"Erreur lors du chargement de l'etat client : {str(e)}")
+            return False
+    
+    def update_client_state(self, batch):
+        """
+        Fusionne le résumé des transactions de l'exécution dans l'historique client.
+        
+        Raises:
+            ValueError: Le fichier contient des jours déjà intégrés (fichier relancé) et
+                state_replay n'est pas demandé
+        """
+        if self.client_state is None:
+            return
+        dernier_jour = self.client_state.dernier_jour_traite
+        if dernier_jour is not None and batch.premier_jour is not None and batch.premier_jour <= dernier_jour:
+            if not self.state_replay:
+                raise ValueError("Le fichier contient des jours deja integres a l'etat client "
+                                 f"(dernier jour traite : {pd.Timestamp(dernier_jour, unit='D'):%Y-%m-%d}) : "
+                                 "fichier deja traite ? (--state-rejouer pour fusionner des transactions tardives)")
+            logger.warning("Le fichier contient des jours deja integres a l'etat client : "
+                           "l'historique de ces jours est compte deux fois (--state-rejouer)")
+        self.client_state.merge(batch, self.rules_engine.plan.structuring.periode_jours)
+    
+    def save_client_state(self):
+        """Persiste l'historique client mis à jour (uniquement après une exécution réussie)."""
+        if self.client_state is None:
+            return
+        self.client_state.save(self.state_path)
+        logger.info(f"Etat client sauvegarde : {len(self.client_state)} clients ({self.state_path})")
+    
+    def load_fx_rates(self):
+        """Charge la table des taux de change (conversion des montants en EUR au nettoyage)."""
+        if not self.fx_rates_path or self.data_processor.fx_rates is not None:
+            return True
+        if not os.path.exists(self.fx_rates_path):
+            logger.warning(f"Table de taux absente ({self.fx_rates_path}) : seuils appliques aux montants d'origine")
+            return True
+        try:
+            self.data_processor.fx_rates = FxRateTable.from_csv(self.fx_rates_path,
+                                                                anciennete_erreur_jours=self.fx_max_age_days)
+            return True
+        except Exception as e:
+            logger.error(f"Erreur lors du chargement des taux de change : {str(e)}")
+            return False
+    
+    def load_id_history(self):
+        """Ouvre l'historique persistant des Transaction_ID déjà traités."""
+        if not self.id_history_dir:
+            return True
+        try:
+            self.id_history = TransactionIdHistory(self.id_history_dir)
+            self.data_processor.id_history = self.id_history
+            return True
+        except Exception as e:
+            logger.error(f"Erreur lors du chargement de l'historique des identifiants : {str(e)}")
+            return False
+    
+    def _record_id_history_stats(self):
+        """Statistiques de l'historique des identifiants (reprises dans le JSON de statistiques)."""
+        if self.id_history is None:
+            return
+        self.summary_stats['historique_ids'] = {
+            'transactions_deja_traitees': self.data_processor.replayed_count,
+            'identifiants_historique': len(self.id_history),
+        }
+    
+    def save_id_history(self):
+        """Ajoute les transactions de l'exécution à l'historique (uniquement après une exécution réussie)."""
+        if self.id_history is None:
+            return
+        self.id_history.save()
+    
+    def load_name_screener(self):
+        """Charge la liste de sanctions du filtrage des noms, si configuré (None sinon)."""
+        params = self._screening_params()
+        if params is not None and self.name_screener is None:
+            self.name_screener = NameScreener.from_file(
+                params['fichier_sanctions'], seuil=params.get('seuil_similarite', 0.8)
+            )
+        return self.name_screener
+    
+    def resident_resources(self):
+        """
+        Composants chargés réutilisables par les exécutions suivantes (mode démon).
+        
+        Returns:
+            dict: Moteur de règles compilé, référentiel clients et son index,
+                taux de change et liste de sanctions
+        """
+        return {
+            'rules_engine': self.rules_engine,
+            'config_path': self.config_path,
+            'clients_df': self.data_processor.clients_df,
+            'client_index': self.data_processor.client_index,
+            'fx_rates': self.data_processor.fx_rates,
+            'name_screener': self.name_screener,
+        }
+    
+    def reference_files(self):
+        """Fichiers lus par les composants réutilisables (leur modification impose un rechargement)."""
+        params = self._screening_params()
+        fichiers = [self.clients_path, self.config_path, self.fx_rates_path,
+                    params['fichier_sanctions'] if params else None]
+        return [fichier for fichier in fichiers if fichier]
+    
+    def use_resources(self, ressources):
+        """
+        Reprend les composants d'une exécution précédente (voir resident_resources).
+        
+        Les étapes de chargement correspondantes (configuration, référentiel
+        clients, index, taux, sanctions) sont alors sautées. Ces composants
+        ne sont que lus par le traitement, y compris en mode --in-place.
+        """
+        self.rules_engine = ressources['rules_engine']
+        self.config_path = ressources['config_path']
+        self.data_processor.clients_df = ressources['clients_df']
+        self.data_processor.client_index = ressources['client_index']
+        self.data_processor.fx_rates = ressources['fx_rates']
+        self.name_screener = ressources['name_screener']
+    
     def load_and_validate_data(self):
         """Charge et valide les données sources."""
         logger.info("=" * 40)
@@ -74,9 +315,23 @@ class CompliancePipeline:
         logger.info("=" * 40)
         
         try:
-            # 1. Chargement des données
-            self.data_processor.load_transactions(self.transactions_path)
-            self.data_processor.load_clients(self.clients_path)
+            # 1. Chargement des deux fichiers en parallèle (mode flux : seul le premier morceau est lu ici)
+            def charger_transactions():
+                if self.chunk_size:
+                    self.data_processor.transactions_df = next(
+                        self.data_processor.iter_transactions(self.transactions_path, self.chunk_size)
+                    )
+                    logger.info(f"Mode flux : morceaux de {self.chunk_size} transactions")
+                else:
+                    self.data_processor.load_transactions(self.transactions_path)
+            
+            taches = {'transactions': charger_transactions}
+            # Référentiel déjà chargé par une exécution précédente (mode démon) : pas relu
+            if self.data_processor.clients_df is None:
+                taches['clients'] = lambda: self.data_processor.load_clients(self.clients_path)
+            self._run_overlapped('chargement', taches)
+            self.summary_stats['chargement'] = self.data_processor.load_metrics
+            self.summary_stats['recouvrement'] = self.overlap
             
             # 2. Validation
             validation_results = self.data_processor.validate_data()
@@ -85,8 +340,11 @@ class CompliancePipeline:
                 logger.error("Echec de la validation des données")
                 return False
             
-            # 3. Statistiques initiales
-            self.summary_stats['initial'] = self.data_processor.get_summary_stats()
+            # 3. Statistiques initiales (mode flux : calculées lors de la première passe)
+            if self.chunk_size:
+                self.data_processor.transactions_df = None
+            else:
+                self.summary_stats['initial'] = self.data_processor.get_summary_stats()
             
             return True
             
@@ -94,6 +352,53 @@ class CompliancePipeline:
             logger.error(f"Erreur lors du chargement : {str(e)}")
             return False
     
+    def _run_overlapped(self, etape, taches):
+        """
+        Exécute des tâches indépendantes d'une étape dans un pool de threads.
+        
+        Les lectures de fichiers et la construction de l'index clients passent
+        l'essentiel de leur temps hors du GIL (attente disque ou réseau,
+        analyse CSV, NumPy) : les exécuter ensemble recouvre ces attentes. La
+        durée de chaque tâche est relevée pour mesurer le gain par rapport à
+        une exécution en série (`self.overlap`).
+        
+        Args:
+            etape (str): Nom de l'étape ('chargement', 'nettoyage', ...)
+            taches (dict): Nom de la tâche -> fonction sans argument
+            
+        Returns:
+            dict: Nom de la tâche -> valeur retournée (une exception est propagée)
+        """
+        durees = {}
+        
+        def chronometrer(nom, fonction):
+            debut = time.perf_counter()
+            try:
+                return fonction()
+            finally:
+                durees[nom] = time.perf_counter() - debut
+        
+        debut = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(taches), thread_name_prefix=etape) as pool:
+            futures = {nom: pool.submit(chronometrer, nom, fonction) for nom, fonction in taches.items()}
+            resultats = {nom: future.result() for nom, future in futures.items()}
+        duree = time.perf_counter() - debut
+        
+        self.overlap[etape] = {
+            'duree_s': round(duree, 3),
+            'taches_s': {nom: round(durees[nom], 3) for nom in taches},
+            'gain_s': round(max(sum(durees.values()) - duree, 0.0), 3),
+        }
+        return resultats
+    
+    def _overlap_note(self, etape):
+        """Détail des tâches parallèles d'une étape pour le rapport d'exécution."""
+        if etape not in self.overlap:
+            return ""
+        mesure = self.overlap[etape]
+        taches = ", ".join(f"{nom} {duree:.3f}s" for nom, duree in mesure['taches_s'].items())
+        return f" ({taches} en parallele, gain {mesure['gain_s']:.3f}s)"
+    
     def clean_and_enrich_data(self):
         """Nettoie et enrichit les données."""
         logger.info("=" * 40)
@@ -101,14 +406,21 @@ class CompliancePipeline:
         logger.info("=" * 40)
         
         try:
-            # 1. Nettoyage des transactions
-            self.data_processor.clean_transactions()
+            # 1. Nettoyage des transactions, index clients construit pendant ce temps
+            self._run_overlapped('nettoyage', {
+                'nettoyage': self.data_processor.clean_transactions,
+                'index_clients': self.data_processor.build_client_index,
+            })
+            
+            if self.id_history is not None:
+                self.id_history.stage(self.data_processor.transactions_df['Transaction_ID'])
             
             # 2. Enrichissement avec les données clients
             self.enriched_df = self.data_processor.enrich_data()
             
-            # 3. Statistiques après enrichissement
+            # 3. Statistiques après enrichissement et validation
             self.summary_stats['enriched'] = self.data_processor.get_summary_stats()
+            self.summary_stats['validation'] = self.data_processor.validation_stats()
             
             logger.info("Donnees nettoyees et enrichies avec succes")
             return True
@@ -117,6 +429,276 @@ class CompliancePipeline:
             logger.error(f"Erreur lors du traitement des données : {str(e)}")
             return False
     
+    def scan_transactions(self):
+        """
+        Première passe du mode flux : nettoyage, statistiques et état de structuring.
+        
+        Les morceaux ne sont pas conservés : seuls les identifiants déjà vus
+        (pour les doublons), les statistiques cumulées et les agrégats
+        (client, jour) du structuring sont gardés en mémoire.
+        """
+        logger.info("=" * 40)
+        logger.info("MODE FLUX - PREMIERE PASSE (NETTOYAGE, ETAT)")
+        logger.info("=" * 40)
+        
+        try:
+            if self.rules_engine is None:
+                self.load_config()
+            
+            seen_ids = SeenIdStore()
+            raw_stats = TransactionStatsAccumulator()
+            self.clean_stats = TransactionStatsAccumulator()
+            self.structuring_state = self.rules_engine.create_structuring_state()
+            if self.structuring_state is not None and self.client_state is not None:
+                self.rules_engine.seed_structuring_state(self.structuring_state, self.client_state)
+            batch = ClientStateStore() if self.client_state is not None else None
+            comptes = {'morceaux': 0, 'doublons': 0, 'rejeux': 0, 'quarantaine': 0}
+            
+            def parcourir():
+                for chunk in self.data_processor.iter_transactions(self.transactions_path, self.chunk_size):
+                    raw_stats.update(chunk)
+                    chunk, chunk_comptes, quarantaine = self.data_processor.clean_chunk(chunk, seen_ids)
+                    self.clean_stats.update(chunk)
+                    if self.structuring_state is not None:
+                        self.rules_engine.update_structuring_state(self.structuring_state, chunk)
+                    if batch is not None:
+                        batch.merge(self.rules_engine.client_state_from_transactions(chunk),
+                                    self.rules_engine.plan.structuring.periode_jours)
+                    comptes['morceaux'] += 1
+                    comptes['doublons'] += chunk_comptes['doublons']
+                    comptes['rejeux'] += chunk_comptes['rejeux']
+                    comptes['quarantaine'] += self.data_processor.validator.rejected_count(quarantaine)
+            
+            # L'index clients de la seconde passe est construit pendant la lecture
+            self._run_overlapped('nettoyage', {
+                'premiere_passe': parcourir,
+                'index_clients': self.data_processor.build_client_index,
+            })
+            
+            if self.structuring_state is not None:
+                self.structuring_state.finalize()
+            self.client_state_batch = batch
+            
+            self.summary_stats['initial'] = {
+                'transactions': raw_stats.as_dict(),
+                **self.data_processor.get_summary_stats()
+            }
+            
+            logger.info(f"   - {comptes['morceaux']} morceaux lus, {raw_stats.count} transactions")
+            if comptes['doublons'] > 0:
+                logger.info(f"   - {comptes['doublons']} doublons supprimes")
+            if comptes['rejeux'] > 0:
+                logger.warning(f"   - {comptes['rejeux']} transactions deja traitees (rejeu) ignorees")
+            self.data_processor.replayed_count = comptes['rejeux']
+            if comptes['quarantaine'] > 0:
+                logger.warning(f"   - {comptes['quarantaine']} transactions en quarantaine")
+            logger.info(f"Premiere passe terminee : {self.clean_stats.count} transactions valides")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Erreur lors de la premiere passe : {str(e)}")
+            return False
+    
+    def process_transactions_in_chunks(self):
+        """
+        Seconde passe du mode flux : nettoyage, enrichissement, règles et export par morceau.
+        
+        Chaque morceau est ajouté à transactions_enrichies (CSV et/ou Parquet) puis libéré,
+        ses lignes rejetées par la validation à la quarantaine ; les alertes sont
+        rangées dans un tampon disque trié (AlertSpool).
+        Le structuring utilise l'état finalisé de la première passe, ce qui
+        donne les mêmes résultats que le traitement en mémoire.
+        """
+        logger.info("=" * 40)
+        logger.info("MODE FLUX - SECONDE PASSE (REGLES, EXPORT)")
+        logger.info("=" * 40)
+        
+        try:
+            if self.data_processor.client_index is None:
+                self.data_processor.build_client_index()
+            
+            params = self._screening_params()
+            colonnes_noms = params.get('colonnes', {}).get('transactions', []) if params else []
+            if params:
+                self.load_name_screener()
+            self.transaction_matches = {}
+            
+            seen_ids = SeenIdStore()
+            output_path_all = os.path.join(self.output_dir, 'transactions_enrichies.csv')
+            parquet_all = (ParquetAppender(os.path.join(self.output_dir, 'transactions_enrichies.parquet'))
+                           if 'parquet' in self.formats else None)
+            output_path_quarantaine = os.path.join(self.output_dir, f'{self.FICHIER_QUARANTAINE}.csv')
+            parquet_quarantaine = (ParquetAppender(os.path.join(self.output_dir, f'{self.FICHIER_QUARANTAINE}.parquet'))
+                                   if 'parquet' in self.formats else None)
+            validation = {'controlees': 0, 'rejetees': 0, 'signalees': 0, 'taux_anciens': 0, 'rejets': {}}
+            rapports = []
+            temps = {}
+            linked_count = 0
+            self.alert_spool = AlertSpool(self.ALERTES_COLS, formats=self.formats)
+            
+            for numero, chunk in enumerate(
+                self.data_processor.iter_transactions(self.transactions_path, self.chunk_size)
+            ):
+                nb_lues = len(chunk)
+                chunk, chunk_comptes, quarantaine = self.data_processor.clean_chunk(chunk, seen_ids)
+                validation['controlees'] += nb_lues - chunk_comptes['doublons'] - chunk_comptes['rejeux']
+                nb_rejetees = self.data_processor.validator.rejected_count(quarantaine)
+                validation['rejetees'] += nb_rejetees
+                validation['signalees'] += len(quarantaine) - nb_rejetees
+                validation['taux_anciens'] += chunk_comptes['taux_anciens']
+                for code, count in chunk_comptes['rejets'].items():
+                    validation['rejets'][code] = validation['rejets'].get(code, 0) + count
+                # En-tête écrit avec le premier morceau, même sans rejet
+                if numero == 0 or len(quarantaine) > 0:
+                    colonnes = self._colonnes_exportees(quarantaine)
+                    if 'csv' in self.formats:
+                        quarantaine.to_csv(output_path_quarantaine, sep=';', index=False, encoding='utf-8',
+                                           columns=colonnes, mode='w' if numero == 0 else 'a',
+                                           header=(numero == 0))
+                    if parquet_quarantaine is not None:
+                        parquet_quarantaine.write(quarantaine, colonnes)
+                if self.id_history is not None:
+                    self.id_history.stage(chunk['Transaction_ID'])
+                chunk, nb_lies = self.data_processor.enrich_chunk(chunk)
+                linked_count += nb_lies
+                
+                chunk = self.rules_engine.apply_all_rules(
+                    chunk,
+                    client_index=self.data_processor.client_index,
+                    structuring_state=self.structuring_state,
+                    client_state=self.client_state,
+                    verbose=False,
+                    inplace=self.in_place,
+                    profiler=self.profiler
+                )
+                rapports.append(self.rules_engine.generate_summary_report(chunk))
+                for code, duree in self.rules_engine.rule_timings.items():
+                    temps[code] = temps.get(code, 0.0) + duree
+                
+                if colonnes_noms:
+                    for col, matches in self._screen_columns(
+                        self.name_screener, 'transactions', chunk, 'Transaction_ID', colonnes_noms
+                    ).items():
+                        self.transaction_matches.setdefault(col, []).append(matches)
+                
+                self._add_alertes_labels(chunk)
+                self.alert_spool.add(chunk[chunk['Alertes_Flags'] != 0])
+                colonnes = self._colonnes_exportees(chunk)
+                if 'csv' in self.formats:
+                    with self.profiler.stage('rapports.transactions_enrichies.csv', len(chunk)):
+                        chunk.to_csv(output_path_all, sep=';', index=False, encoding='utf-8', columns=colonnes,
+                                     mode='w' if numero == 0 else 'a', header=(numero == 0))
+                if parquet_all is not None:
+                    with self.profiler.stage('rapports.transactions_enrichies.parquet', len(chunk)):
+                        parquet_all.write(chunk, colonnes)
+            
+            if parquet_all is not None:
+                parquet_all.close()
+            if parquet_quarantaine is not None:
+                parquet_quarantaine.close()
+            for fmt in self.formats:
+                self.output_files[f"transactions_enrichies.{fmt}"] = self.clean_stats.count
+                self.output_files[f"{self.FICHIER_QUARANTAINE}.{fmt}"] = validation['rejetees'] + validation['signalees']
+            self.summary_stats['validation'] = self.data_processor.validation_stats(
+                validation['controlees'], validation['rejetees'], validation['rejets'], validation['signalees'],
+                validation['taux_anciens']
+            )
+            
+            # Statistiques équivalentes au mode en mémoire
+            self.summary_stats['enriched'] = {
+                'transactions': self.clean_stats.as_dict(),
+                **self.data_processor.get_summary_stats(),
+                'enriched': {
+                    'count': self.clean_stats.count,
+                    'transactions_avec_client': linked_count
+                }
+            }
+            
+            rules_summary = self.rules_engine.merge_summary_reports(rapports)
+            self.rules_engine.rule_timings = temps
+            rules_summary['temps_regles_ms'] = self.rules_engine.timing_report()
+            self.summary_stats['rules'] = rules_summary
+            
+            logger.info(f"Fichier complet genere par morceaux : transactions_enrichies ({', '.join(self.formats)})")
+            self._log_rules_summary(rules_summary)
+            if self.client_state_batch is not None:
+                self.update_client_state(self.client_state_batch)
+            logger.info("Seconde passe terminee")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Erreur lors de la seconde passe : {str(e)}")
+            return False
+    
+    def is_sharded(self):
+        """Indique si le pipeline s'exécute en mode parallèle par partitions."""
+        return bool(self.workers) and self.workers > 1
+    
+    def process_in_shards(self):
+        """
+        Nettoie, enrichit et score les transactions en parallèle (mode --workers).
+        
+        Les doublons sont supprimés sur tout le fichier avant partitionnement
+        (un même Transaction_ID peut concerner deux clients). Chaque partition
+        regroupe tous les clients de même empreinte et est traitée dans un
+        processus ; les partitions sont ensuite réassemblées dans l'ordre
+        d'origine, ce qui donne les mêmes sorties que l'exécution en série.
+        """
+        logger.info("=" * 40)
+        logger.info(f"TRAITEMENT PARALLELE ({self.workers} PROCESSUS)")
+        logger.info("=" * 40)
+        
+        # Imports différés : inutiles hors du mode parallèle (démarrage à froid plus court)
+        from concurrent.futures import ProcessPoolExecutor
+        from sharding import shard_ids, init_worker, process_shard
+        
+        try:
+            if self.rules_engine is None:
+                self.load_config()
+            
+            # 1. Nettoyage (dont suppression des doublons et quarantaine) sur tout le fichier
+            transactions = self.data_processor.clean_transactions()
+            self.summary_stats['validation'] = self.data_processor.validation_stats()
+            if self.id_history is not None:
+                self.id_history.stage(transactions['Transaction_ID'])
+            
+            # 2. Partition par empreinte du Client_ID
+            shards = shard_ids(transactions['Client_ID'], self.workers)
+            parts = [transactions[shards == k] for k in range(self.workers)]
+            logger.info(f"   - Partitions : {[len(part) for part in parts]}")
+            
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=init_worker,
+                initargs=(self.config_path, self.index_dir, self.data_processor.clients_df,
+                          self.client_state, self.in_place)
+            ) as pool:
+                resultats = list(pool.map(process_shard, parts))
+            
+            # 3. Réassemblage dans l'ordre d'origine
+            self.enriched_df = pd.concat([scored for scored, _, _ in resultats]).reindex(transactions.index)
+            
+            temps = {}
+            for (scored, _, rule_timings) in resultats:
+                for code, duree in rule_timings.items():
+                    temps[code] = temps.get(code, 0.0) + duree
+                    # Durée mesurée dans le processus de travail (CPU et mémoire non relevés)
+                    self.profiler.add(f"regles.{code}", duree, len(scored))
+            self.rules_engine.rule_timings = temps
+            
+            # 4. Statistiques équivalentes à l'exécution en série
+            self.data_processor.transactions_df = self.enriched_df
+            self.data_processor.enriched_df = self.enriched_df
+            self.data_processor.linked_count = sum(nb_lies for _, nb_lies, _ in resultats)
+            self.summary_stats['enriched'] = self.data_processor.get_summary_stats()
+            
+            logger.info(f"Traitement parallele termine : {len(self.enriched_df)} transactions")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Erreur lors du traitement parallele : {str(e)}")
+            return False
+    
     def apply_compliance_rules(self):
         """Applique les règles métier de compliance."""
         logger.info("=" * 40)
@@ -128,39 +710,30 @@ class CompliancePipeline:
             if self.rules_engine is None:
                 self.load_config()
             
-            # Application des règles
-            self.enriched_df = self.rules_engine.apply_all_rules(
-                self.enriched_df, 
-                self.data_processor.clients_df
-            )
+            # Application des règles (déjà faite par partition en mode parallèle)
+            if not self.is_sharded():
+                self.enriched_df = self.rules_engine.apply_all_rules(
+                    self.enriched_df, 
+                    self.data_processor.clients_df,
+                    client_index=self.data_processor.client_index,
+                    client_state=self.client_state,
+                    inplace=self.in_place,
+                    profiler=self.profiler
+                )
+            
+            # Historique client (mode journalier) : le résumé du jour est fusionné après les règles
+            if self.client_state is not None:
+                self.update_client_state(self.rules_engine.client_state_from_transactions(self.enriched_df))
             
             # Génération du rapport synthétique
             rules_summary = self.rules_engine.generate_summary_report(self.enriched_df)
+            rules_summary['temps_regles_ms'] = self.rules_engine.timing_report()
             self.summary_stats['rules'] = rules_summary
             
-            # Création du DataFrame d'alertes
-            self.alerts_df = self.enriched_df[
-                self.enriched_df['Alertes'] != ''
-            ].copy()
-            
-            # Tri par priorité
-            if len(self.alerts_df) > 0:
-                priority_order = {'Critique': 3, 'Eleve': 2, 'Moyen': 1, 'Faible': 0}
-                self.alerts_df['Priority_Score'] = self.alerts_df['Niveau_Alerte'].map(priority_order)
-                self.alerts_df = self.alerts_df.sort_values(
-                    ['Priority_Score', 'Score_Risque'], 
-                    ascending=[False, False]
-                ).drop(columns=['Priority_Score'])
-            
-            # Log des résultats
-            logger.info("RESUME DES ALERTES DETECTEES :")
-            logger.info(f"   - Transactions totales : {rules_summary['total_transactions']}")
-            logger.info(f"   - Transactions avec alerte : {rules_summary['transactions_alerte']}")
-            logger.info(f"   - Pourcentage d'alertes : {(rules_summary['transactions_alerte']/rules_summary['total_transactions']*100):.1f}%")
-            logger.info(f"   - Montant total a risque : {rules_summary['montant_total_alerte']:,.2f} EUR")
-            
-            for niveau, count in rules_summary['distribution_niveaux'].items():
-                logger.info(f"   - Niveau '{niveau}' : {count}")
+            # Sélection des alertes (positions triées, lignes extraites à l'export)
+            self.alert_positions = self._sort_alerts(self.enriched_df)
+            
+            self._log_rules_summary(rules_summary)
             
             logger.info("Regles de compliance appliquees avec succes")
             return True
@@ -169,6 +742,130 @@ class CompliancePipeline:
             logger.error(f"Erreur lors de l'application des regles : {str(e)}")
             return False
     
+    def _sort_alerts(self, df):
+        """
+        Positions des transactions en alerte, triées par priorité puis par score.
+        
+        Seules les deux clés de tri des alertes sont extraites ; les lignes
+        elles-mêmes ne sont copiées qu'à l'export, bloc par bloc (voir `_export_selection`).
+        
+        Returns:
+            ndarray: Positions des alertes dans `df`
+        """
+        positions = np.flatnonzero(df['Alertes_Flags'].to_numpy())
+        if len(positions) > 0:
+            cles = pd.DataFrame({
+                'Priority_Score': df['Niveau_Alerte'].take(positions).map(PRIORITY_ORDER).to_numpy(),
+                'Score_Risque': df['Score_Risque'].to_numpy()[positions],
+            })
+            ordre = cles.sort_values(
+                ['Priority_Score', 'Score_Risque'], 
+                ascending=[False, False]
+            ).index.to_numpy()
+            positions = positions[ordre]
+        return positions
+    
+    def alerts_view(self, colonnes=None):
+        """
+        Table des alertes triées extraite de enriched_df.
+        
+        Args:
+            colonnes (list): Colonnes à extraire (None = toutes)
+            
+        Returns:
+            DataFrame: Alertes (une seule extraction des lignes et colonnes demandées)
+        """
+        if colonnes is None:
+            return self.enriched_df.take(self.alert_positions)
+        return self.enriched_df.iloc[self.alert_positions, self.enriched_df.columns.get_indexer(colonnes)]
+    
+    def _log_rules_summary(self, rules_summary):
+        """Journalise le résumé des alertes et le temps par règle."""
+        # Log des résultats
+        logger.info("RESUME DES ALERTES DETECTEES :")
+        logger.info(f"   - Transactions totales : {rules_summary['total_transactions']}")
+        logger.info(f"   - Transactions avec alerte : {rules_summary['transactions_alerte']}")
+        logger.info(f"   - Pourcentage d'alertes : {(rules_summary['transactions_alerte']/max(rules_summary['total_transactions'], 1)*100):.1f}%")
+        logger.info(f"   - Montant total a risque : {rules_summary['montant_total_alerte']:,.2f} EUR")
+        
+        for niveau, count in rules_summary['distribution_niveaux'].items():
+            logger.info(f"   - Niveau '{niveau}' : {count}")
+        
+        logger.info("TEMPS PAR REGLE :")
+        for code, duree_ms in rules_summary['temps_regles_ms'].items():
+            logger.info(f"   - {code} : {duree_ms:.3f} ms")
+    
+    def _screening_params(self):
+        """Paramètres du filtrage des noms (None si non configuré)."""
+        params = self.rules_engine.config.get('screening_noms') if self.rules_engine else None
+        if not params or not os.path.exists(params.get('fichier_sanctions', '')):
+            return None
+        return params
+    
+    def _screen_columns(self, screener, source, df, id_col, colonnes):
+        """Correspondances de chaque colonne d'une source (dict colonne -> DataFrame)."""
+        resultats = {}
+        for col in colonnes:
+            if df is None or col not in df.columns:
+                continue
+            matches = screener.screen(df[col])
+            matches.insert(0, 'Identifiant', df[id_col].to_numpy()[matches['Indice'].to_numpy()])
+            matches.insert(0, 'Colonne', col)
+            matches.insert(0, 'Source', source)
+            resultats[col] = matches.drop(columns=['Indice'])
+        return resultats
+    
+    def screen_names(self, transaction_matches=None):
+        """
+        Rapproche les noms (clients, contreparties) des listes de sanctions, si configuré.
+        
+        Args:
+            transaction_matches (dict): Correspondances des transactions déjà calculées
+                                        morceau par morceau (mode flux), par colonne
+        """
+        params = self._screening_params()
+        if params is None:
+            logger.info("Filtrage des noms non configure, etape ignoree")
+            return True
+        
+        logger.info("=" * 40)
+        logger.info("FILTRAGE DES NOMS (LISTES DE SANCTIONS)")
+        logger.info("=" * 40)
+        
+        try:
+            screener = self.load_name_screener()
+            sources = {
+                'clients': (self.data_processor.clients_df, 'Client_ID'),
+                'transactions': (self.enriched_df, 'Transaction_ID')
+            }
+            
+            resultats = []
+            for source, colonnes in params.get('colonnes', {}).items():
+                if source == 'transactions' and transaction_matches is not None:
+                    par_colonne = {col: pd.concat(parts, ignore_index=True)
+                                   for col, parts in transaction_matches.items()}
+                else:
+                    df, id_col = sources.get(source, (None, None))
+                    par_colonne = self._screen_columns(screener, source, df, id_col, colonnes)
+                
+                for col in colonnes:
+                    if col not in par_colonne:
+                        logger.warning(f"Colonne {source}.{col} absente, filtrage ignore")
+                        continue
+                    resultats.append(par_colonne[col])
+                    logger.info(f"   - {source}.{col} : {len(par_colonne[col])} correspondances")
+            
+            self.name_matches = pd.concat(resultats, ignore_index=True) if resultats else None
+            self.summary_stats['screening_noms'] = {
+                'seuil_similarite': screener.seuil,
+                'correspondances': 0 if self.name_matches is None else len(self.name_matches)
+            }
+            return True
+            
+        except Exception as e:
+            logger.error(f"Erreur lors du filtrage des noms : {str(e)}")
+            return False
+    
     def generate_reports(self):
         """Génère les rapports et fichiers de sortie."""
         logger.info("=" * 40)
@@ -176,36 +873,53 @@ class CompliancePipeline:
         logger.info("=" * 40)
         
         try:
-            # 1. Fichier complet avec toutes les transactions enrichies
-            output_path_all = os.path.join(self.output_dir, 'transactions_enrichies.csv')
-            self.enriched_df.to_csv(output_path_all, sep=';', index=False, encoding='utf-8')
-            logger.info(f"Fichier complet genere : {output_path_all}")
+            # 0. Libellés lisibles des alertes, construits uniquement à l'export
+            if self.enriched_df is not None:
+                self._add_alertes_labels(self.enriched_df)
+            
+            # 1. Fichier complet avec toutes les transactions enrichies (déjà écrit en mode flux)
+            if self.enriched_df is not None:
+                chemins = self._export(self.enriched_df, 'transactions_enrichies')
+                logger.info(f"Fichier complet genere : {', '.join(chemins)}")
             
             # 2. Fichier d'alertes seulement (pour les analystes compliance)
-            if self.alerts_df is not None and len(self.alerts_df) > 0:
-                output_path_alerts = os.path.join(self.output_dir, 'alertes_compliance.csv')
-                
-                # Sélection des colonnes importantes
-                alertes_cols = [
-                    'Transaction_ID', 'Date', 'Client_ID', 'Montant', 'Devise',
-                    'Beneficiaire', 'Pays_Beneficiaire', 'Niveau_Risque', 'Est_PEP',
-                    'Alertes', 'Niveau_Alerte', 'Score_Risque', 'Details_Alertes'
-                ]
-                
+            if self.alert_positions is not None and len(self.alert_positions) > 0:
                 # S'assurer que toutes les colonnes existent
-                available_cols = [col for col in alertes_cols if col in self.alerts_df.columns]
-                self.alerts_df[available_cols].to_csv(
-                    output_path_alerts, sep=';', index=False, encoding='utf-8'
-                )
+                available_cols = [col for col in self.ALERTES_COLS if col in self.enriched_df.columns]
+                chemins = self._export_selection(self.alert_positions, available_cols, 'alertes_compliance')
                 
-                logger.info(f"Fichier d'alertes genere : {output_path_alerts}")
-                logger.info(f"   - {len(self.alerts_df)} alertes exportees")
+                logger.info(f"Fichier d'alertes genere : {', '.join(chemins)}")
+                logger.info(f"   - {len(self.alert_positions)} alertes exportees")
+            
+            # 2 bis. Mode flux : fichier d'alertes issu du tampon trié
+            if self.alert_spool is not None and len(self.alert_spool) > 0:
+                for fmt in self.formats:
+                    output_path_alerts = os.path.join(self.output_dir, f'alertes_compliance.{fmt}')
+                    with self.profiler.stage(f'rapports.alertes_compliance.{fmt}', len(self.alert_spool)):
+                        if fmt == 'csv':
+                            self.alert_spool.write(output_path_alerts)
+                        else:
+                            self.alert_spool.write_parquet(output_path_alerts)
+                    self.output_files[f'alertes_compliance.{fmt}'] = len(self.alert_spool)
+                    logger.info(f"Fichier d'alertes genere : {output_path_alerts}")
+                logger.info(f"   - {len(self.alert_spool)} alertes exportees")
+            if self.alert_spool is not None:
+                self.alert_spool.close()
             
-            # 3. Rapport synthétique détaillé
-            self._generate_detailed_report()
+            # 2 ter. Lignes rejetées par la validation (déjà écrites par morceaux en mode flux)
+            if self.data_processor.quarantine_df is not None:
+                chemins = self._export(self.data_processor.quarantine_df, self.FICHIER_QUARANTAINE)
+                logger.info(f"Quarantaine generee : {', '.join(chemins)} "
+                            f"({len(self.data_processor.quarantine_df)} lignes)")
             
-            # 4. Fichier JSON avec toutes les statistiques (pour dashboard) - CORRIGÉ
-            self._generate_stats_json()
+            # 3. Correspondances du filtrage des noms
+            if self.name_matches is not None:
+                chemins = self._export(self.name_matches, 'correspondances_noms')
+                logger.info(f"Correspondances de noms generees : {', '.join(chemins)}")
+            
+            # 4. Rapport synthétique détaillé
+            with self.profiler.stage('rapports.rapport_detaille.csv'):
+                self._generate_detailed_report()
             
             logger.info("Generation des rapports terminee")
             return True
@@ -214,6 +928,81 @@ class CompliancePipeline:
             logger.error(f"Erreur lors de la generation des rapports : {str(e)}")
             return False
     
+    def _export(self, df, nom):
+        """
+        Écrit un DataFrame dans chaque format de sortie demandé.
+        
+        Args:
+            df (DataFrame): Données à exporter
+            nom (str): Nom du fichier sans extension
+            
+        Returns:
+            list: Chemins des fichiers écrits
+        """
+        chemins = []
+        colonnes = self._colonnes_exportees(df)
+        for fmt in self.formats:
+            chemin = os.path.join(self.output_dir, f"{nom}.{fmt}")
+            with self.profiler.stage(f"rapports.{nom}.{fmt}", len(df)):
+                if fmt == 'csv':
+                    df.to_csv(chemin, sep=';', index=False, encoding='utf-8', columns=colonnes)
+                else:
+                    write_parquet(df, chemin, colonnes)
+            self.output_files[f"{nom}.{fmt}"] = len(df)
+            chemins.append(chemin)
+        return chemins
+    
+    def _colonnes_exportees(self, df):
+        """Colonnes de `df` à écrire dans les fichiers de sortie (sans les colonnes internes)."""
+        return [col for col in df.columns if col not in self.COLONNES_INTERNES]
+    
+    def _export_selection(self, positions, colonnes, nom, taille_bloc=TAILLE_BLOC_EXPORT):
+        """
+        Écrit les lignes `positions` de enriched_df par blocs, dans l'ordre donné.
+        
+        Seul un bloc de la sélection est extrait à la fois : la table
+        sélectionnée (ex. les alertes) n'est jamais copiée en entier.
+        
+        Args:
+            positions (ndarray): Positions des lignes à écrire
+            colonnes (list): Colonnes à écrire
+            nom (str): Nom du fichier sans extension
+            taille_bloc (int): Nombre de lignes extraites par bloc
+            
+        Returns:
+            list: Chemins des fichiers écrits
+        """
+        chemins = [os.path.join(self.output_dir, f"{nom}.{fmt}") for fmt in self.formats]
+        parquet = (ParquetAppender(os.path.join(self.output_dir, f"{nom}.parquet"))
+                   if 'parquet' in self.formats else None)
+        indices_colonnes = self.enriched_df.columns.get_indexer(colonnes)
+        # Formats écrits bloc par bloc ensemble : une seule mesure pour la sélection
+        with self.profiler.stage(f"rapports.{nom}", len(positions)):
+            try:
+                for numero, debut in enumerate(range(0, len(positions), taille_bloc)):
+                    bloc = self.enriched_df.iloc[positions[debut:debut + taille_bloc], indices_colonnes]
+                    if 'csv' in self.formats:
+                        bloc.to_csv(os.path.join(self.output_dir, f"{nom}.csv"), sep=';', index=False,
+                                    encoding='utf-8', mode='w' if numero == 0 else 'a', header=(numero == 0))
+                    if parquet is not None:
+                        parquet.write(bloc)
+            finally:
+                if parquet is not None:
+                    parquet.close()
+        for fmt in self.formats:
+            self.output_files[f"{nom}.{fmt}"] = len(positions)
+        return chemins
+    
+    def _add_alertes_labels(self, df):
+        """Insère la colonne lisible 'Alertes' juste avant 'Alertes_Flags'."""
+        if 'Alertes' in df.columns or 'Alertes_Flags' not in df.columns:
+            return
+        df.insert(
+            df.columns.get_loc('Alertes_Flags'),
+            'Alertes',
+            self.rules_engine.decode_alertes(df['Alertes_Flags']).to_numpy()
+        )
+    
     def _generate_detailed_report(self):
         """Génère un rapport synthétique détaillé."""
         report_data = []
@@ -245,6 +1034,7 @@ class CompliancePipeline:
             report_df = pd.DataFrame(report_data, columns=['Categorie', 'Metrique', 'Valeur'])
             report_path = os.path.join(self.output_dir, 'rapport_detaille.csv')
             report_df.to_csv(report_path, sep=';', index=False, encoding='utf-8')
+            self.output_files['rapport_detaille.csv'] = len(report_df)
             logger.info(f"Rapport detaille genere : {report_path}")
     
     def _generate_stats_json(self):
@@ -273,92 +1063,244 @@ class CompliancePipeline:
             'timestamp': datetime.now().isoformat(),
             'pipeline_version': '1.0',
             'statistiques': convert_to_serializable(self.summary_stats),
-            'fichiers_generes': [
-                'transactions_enrichies.csv',
-                'alertes_compliance.csv',
-                'rapport_detaille.csv'
-            ]
+            'codes_alertes': self.rules_engine.alert_bits if self.rules_engine is not None else {},
+            'performance': self.profiler.report(),
+            'fichiers_generes': list(self.output_files)
         }
         
         # Ajout des métadonnées de traitement
-        if self.alerts_df is not None and not self.alerts_df.empty:
+        if self.alert_positions is not None and len(self.alert_positions) > 0:
+            niveaux = self.enriched_df['Niveau_Alerte'].take(self.alert_positions)
+            json_data['alertes'] = {
+                'total': int(len(self.alert_positions)),
+                'par_niveau': convert_to_serializable(niveaux.value_counts().to_dict()),
+            }
+        elif self.alert_spool is not None and len(self.alert_spool) > 0:
             json_data['alertes'] = {
-                'total': int(len(self.alerts_df)),
-                'par_niveau': convert_to_serializable(self.alerts_df['Niveau_Alerte'].value_counts().to_dict()),
+                'total': len(self.alert_spool),
+                'par_niveau': self.alert_spool.level_counts(),
             }
         
         # Export JSON
         try:
             with open(json_path, 'w', encoding='utf-8') as f:
                 json.dump(json_data, f, ensure_ascii=False, indent=2, default=str)
+            self.output_files['statistiques_pipeline.json'] = None
             logger.info(f"Statistiques JSON generees : {json_path}")
         except Exception as e:
             logger.error(f"Erreur lors de la generation du JSON : {str(e)}")
             # On ne bloque pas le pipeline pour cette erreur
     
+    def _nb_transactions(self):
+        """Transactions retenues après nettoyage (None avant le nettoyage)."""
+        if self.enriched_df is not None:
+            return len(self.enriched_df)
+        if self.clean_stats is not None:
+            return self.clean_stats.count
+        return None
+    
+    def publish_statistics(self):
+        """Écrit le JSON de statistiques (section performance comprise) puis le manifeste."""
+        # 5. Fichier JSON avec toutes les statistiques (pour dashboard) - CORRIGÉ
+        self._generate_stats_json()
+        
+        # 6. Manifeste des fichiers générés (formats, tailles, types des colonnes)
+        manifest_path = write_manifest(self.output_dir, self.output_files)
+        logger.info(f"Manifeste genere : {manifest_path}")
+
+    def open_checkpoints(self):
+        """
+        Ouvre les points de reprise de l'exécution (après le chargement de la configuration).
+
+        Returns:
+            str: Dernière étape terminée à reprendre ('enrichi', 'score'), None sinon
+        """
+        if self.checkpoints is None:
+            return None
+        # L'état client et l'historique des identifiants ne sont sauvegardés qu'en fin d'exécution réussie
+        entrees = {'transactions': self.transactions_path, 'clients': self.clients_path,
+                   'configuration': self.config_path, 'taux_change': self.fx_rates_path,
+                   'etat_client': self.state_path}
+        return self.checkpoints.open(entrees, resume=self.resume)
+
+    def save_checkpoint(self, etape):
+        """Sauvegarde le résultat d'une étape ; un échec d'écriture n'interrompt pas l'exécution."""
+        if self.checkpoints is None:
+            return
+        tables = {'transactions': self.enriched_df, 'quarantaine': self.data_processor.quarantine_df}
+        metadonnees = {
+            'summary_stats': self.summary_stats,
+            'temps_regles': self.rules_engine.rule_timings,
+            'transactions_avec_client': self.data_processor.linked_count,
+        }
+        try:
+            with self.profiler.stage(f'point_reprise.{etape}', len(self.enriched_df)):
+                self.checkpoints.save(etape, tables, metadonnees)
+        except Exception as e:
+            logger.warning(f"Point de reprise '{etape}' non sauvegarde : {str(e)}")
+
+    def restore_checkpoint(self, etape):
+        """
+        Reprend l'état du pipeline à la fin d'une étape sauvegardée.
+
+        Le référentiel clients et son index (lus par les règles et le filtrage
+        des noms) sont rechargés s'ils ne sont pas déjà en mémoire.
+
+        Args:
+            etape (str): 'enrichi' (transactions nettoyées et enrichies) ou 'score' (règles appliquées)
+        """
+        logger.info("=" * 40)
+        logger.info(f"REPRISE APRES L'ETAPE '{etape.upper()}' ({self.checkpoints.run_id})")
+        logger.info("=" * 40)
+
+        try:
+            tables, metadonnees = self.checkpoints.load(etape)
+            self.enriched_df = tables['transactions']
+            self.data_processor.quarantine_df = tables.get('quarantaine')
+            self.data_processor.transactions_df = self.enriched_df
+            self.data_processor.enriched_df = self.enriched_df
+            self.data_processor.linked_count = metadonnees['transactions_avec_client']
+            self.summary_stats = metadonnees['summary_stats']
+            self.overlap = self.summary_stats.get('recouvrement', self.overlap)
+            self.rules_engine.rule_timings = metadonnees['temps_regles']
+
+            if self.data_processor.clients_df is None:
+                self.data_processor.load_clients(self.clients_path)
+            self.data_processor.build_client_index()
+            if self.id_history is not None:
+                self.id_history.stage(self.enriched_df['Transaction_ID'])
+
+            # Règles déjà appliquées : historique client et sélection des alertes recalculés
+            if etape == 'score':
+                if self.client_state is not None:
+                    self.update_client_state(self.rules_engine.client_state_from_transactions(self.enriched_df))
+                self.alert_positions = self._sort_alerts(self.enriched_df)
+
+            logger.info(f"Reprise : {len(self.enriched_df)} transactions relues")
+            return True
+
+        except Exception as e:
+            logger.error(f"Erreur lors de la reprise : {str(e)}")
+            return False
+
+    def clear_checkpoints(self):
+        """Supprime les points de reprise après une exécution réussie."""
+        if self.checkpoints is not None:
+            self.checkpoints.clear()
+            if not os.listdir(self.checkpoints.repertoire):
+                os.rmdir(self.checkpoints.repertoire)
+
     def run_pipeline(self):
         """Exécute l'ensemble du pipeline de traitement."""
         logger.info("=" * 60)
         logger.info("DEMARRAGE DU PIPELINE DE COMPLIANCE BNP")
         logger.info("=" * 60)
         
-        start_time = datetime.now()
-        execution_steps = {}
+        profiler = self.profiler
+        profiler.start()
         
         try:
             # Étape 1: Chargement configuration
-            step_start = datetime.now()
-            self.load_config()
-            execution_steps['config'] = (datetime.now() - step_start).total_seconds()
+            with profiler.stage('configuration'):
+                if self.rules_engine is None:
+                    self.load_config()
+                if not self.load_client_state() or not self.load_id_history() or not self.load_fx_rates():
+                    return False
+                reprise = self.open_checkpoints()
             
-            # Étape 2: Chargement et validation
-            step_start = datetime.now()
-            if not self.load_and_validate_data():
-                return False
-            execution_steps['load'] = (datetime.now() - step_start).total_seconds()
+            if reprise is None:
+                # Étape 2: Chargement et validation
+                with profiler.stage('chargement') as mesure:
+                    if not self.load_and_validate_data():
+                        return False
+                    if self.data_processor.transactions_df is not None:
+                        mesure['lignes'] = len(self.data_processor.transactions_df)
+                
+                # Étape 3: Nettoyage et enrichissement (mode flux : première passe)
+                with profiler.stage('nettoyage') as mesure:
+                    if self.chunk_size:
+                        if not self.scan_transactions():
+                            return False
+                    elif self.is_sharded():
+                        if not self.process_in_shards():
+                            return False
+                    elif not self.clean_and_enrich_data():
+                        return False
+                    self._record_id_history_stats()
+                    mesure['lignes'] = self._nb_transactions()
+                self.save_checkpoint('enrichi')
+            else:
+                # Étapes 2 et 3 (et 4) terminées par l'exécution précédente : résultat relu
+                with profiler.stage('reprise') as mesure:
+                    if not self.restore_checkpoint(reprise):
+                        return False
+                    mesure['lignes'] = self._nb_transactions()
             
-            # Étape 3: Nettoyage et enrichissement
-            step_start = datetime.now()
-            if not self.clean_and_enrich_data():
-                return False
-            execution_steps['clean'] = (datetime.now() - step_start).total_seconds()
+            # Étape 4: Application des règles (mode flux : seconde passe avec export)
+            if reprise != 'score':
+                with profiler.stage('regles') as mesure:
+                    if self.chunk_size:
+                        if not self.process_transactions_in_chunks():
+                            return False
+                    elif not self.apply_compliance_rules():
+                        return False
+                    mesure['lignes'] = self._nb_transactions()
+                self.save_checkpoint('score')
             
-            # Étape 4: Application des règles
-            step_start = datetime.now()
-            if not self.apply_compliance_rules():
-                return False
-            execution_steps['rules'] = (datetime.now() - step_start).total_seconds()
+            # Étape 4 bis: Filtrage approximatif des noms
+            with profiler.stage('filtrage_noms'):
+                if not self.screen_names(self.transaction_matches):
+                    return False
             
             # Étape 5: Génération des rapports
-            step_start = datetime.now()
-            if not self.generate_reports():
-                # On continue même si les rapports ont des problèmes mineurs
-                logger.warning("Problemes mineurs dans la generation des rapports, mais traitement principal reussi")
-            execution_steps['reports'] = (datetime.now() - step_start).total_seconds()
+            with profiler.stage('rapports', self._nb_transactions()):
+                if not self.generate_reports():
+                    # On continue même si les rapports ont des problèmes mineurs
+                    logger.warning("Problemes mineurs dans la generation des rapports, mais traitement principal reussi")
+            
+            # Étape 6: Sauvegarde de l'historique client (mode journalier incrémental)
+            # et des identifiants traités
+            with profiler.stage('sauvegarde_etat'):
+                self.save_client_state()
+                self.save_id_history()
+                self.clear_checkpoints()
             
-            # Calcul du temps total
-            total_time = (datetime.now() - start_time).total_seconds()
+            # Fin des mesures : les statistiques publiées contiennent toute l'exécution
+            nb_transactions = self.summary_stats['rules']['total_transactions']
+            profiler.stop(nb_transactions)
+            self.publish_statistics()
+            total = profiler.report()['total']
             
             # Rapport d'exécution final
             logger.info("=" * 60)
             logger.info("PIPELINE TERMINE AVEC SUCCES")
             logger.info("=" * 60)
             logger.info(f"TEMPS D'EXECUTION DETAILLE :")
-            logger.info(f"   - Configuration : {execution_steps['config']:.3f}s")
-            logger.info(f"   - Chargement : {execution_steps['load']:.3f}s")
-            logger.info(f"   - Nettoyage : {execution_steps['clean']:.3f}s")
-            logger.info(f"   - Regles : {execution_steps['rules']:.3f}s")
-            logger.info(f"   - Rapports : {execution_steps['reports']:.3f}s")
-            logger.info(f"   - TOTAL : {total_time:.3f}s")
+            logger.info(f"   - Configuration : {profiler.duration('configuration'):.3f}s")
+            if reprise is not None:
+                logger.info(f"   - Reprise apres '{reprise}' : {profiler.duration('reprise'):.3f}s")
+            logger.info(f"   - Chargement : {profiler.duration('chargement'):.3f}s{self._overlap_note('chargement')}")
+            logger.info(f"   - Nettoyage : {profiler.duration('nettoyage'):.3f}s{self._overlap_note('nettoyage')}")
+            logger.info(f"   - Regles : {profiler.duration('regles'):.3f}s")
+            logger.info(f"   - Filtrage noms : {profiler.duration('filtrage_noms'):.3f}s")
+            logger.info(f"   - Rapports : {profiler.duration('rapports'):.3f}s")
+            logger.info(f"   - TOTAL : {total['duree_s']:.3f}s (CPU {total['cpu_s']:.3f}s)")
+            if total['pic_rss_mo'] is not None:
+                logger.info(f"   - Pic memoire (RSS) : {total['pic_rss_mo']:.1f} Mo")
+            if total['pic_memoire_mo'] is not None:
+                logger.info(f"   - Pic memoire tracee : {total['pic_memoire_mo']:.1f} Mo")
             logger.info("")
             logger.info(f"RESULTATS FINAUX :")
-            logger.info(f"   - Transactions traitees : {len(self.enriched_df)}")
-            logger.info(f"   - Alertes generees : {len(self.alerts_df) if self.alerts_df is not None else 0}")
+            logger.info(f"   - Transactions traitees : {nb_transactions}")
+            nb_alertes = (len(self.alert_positions) if self.alert_positions is not None
+                          else len(self.alert_spool) if self.alert_spool is not None else 0)
+            logger.info(f"   - Alertes generees : {nb_alertes}")
             
             if 'rules' in self.summary_stats:
                 rules_stats = self.summary_stats['rules']
-                if 'transactions_alerte' in rules_stats:
-                    percentage = (rules_stats['transactions_alerte'] / len(self.enriched_df)) * 100
+                # Fichier entièrement rejoué ou rejeté : aucun taux à calculer
+                if 'transactions_alerte' in rules_stats and nb_transactions > 0:
+                    percentage = (rules_stats['transactions_alerte'] / nb_transactions) * 100
                     logger.info(f"   - Taux d'alerte : {percentage:.1f}%")
             
             logger.info("=" * 60)
@@ -370,19 +1312,99 @@ class CompliancePipeline:
             import traceback
             logger.error(traceback.format_exc())
             return False
+        finally:
+            # Échec : tracemalloc arrêté s'il a été démarré pour cette exécution
+            profiler.stop()
 
 # Point d'entrée principal
 if __name__ == "__main__":
+    import argparse
+    
     # Chemins vers les fichiers de données
     # MODIFIE CES CHEMINS SELON TON ENVIRONNEMENT
     transactions_path = "../src/data/transactions.csv"
     clients_path = "../src/data/clients.csv"
     
- 
+    parser = argparse.ArgumentParser(description="Pipeline de compliance BNP")
+    parser.add_argument('--chunk-size', type=int, default=None,
+                        help="Traitement en flux par morceaux de N transactions (mémoire constante)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Traitement parallèle par partitions de clients sur N processus")
+    parser.add_argument('--transactions', default=transactions_path,
+                        help="Fichier de transactions, CSV ou .xlsx (ex. transactions_jour.csv)")
+    parser.add_argument('--clients', default=clients_path, help="Référentiel clients (CSV ou .xlsx)")
+    parser.add_argument('--state', default=None,
+                        help="État client persisté entre exécutions (mode journalier incrémental)")
+    parser.add_argument('--state-rejouer', action='store_true',
+                        help="Fusionne dans l'état client un fichier contenant des jours déjà intégrés "
+                             "(transactions tardives ; par défaut : échec pour éviter le double comptage)")
+    parser.add_argument('--csv-engine', choices=['c', 'pyarrow'], default='c',
+                        help="Moteur de lecture des CSV d'entrée (pyarrow : multithread, hors mode flux)")
+    parser.add_argument('--input-cache', default=None, metavar='REPERTOIRE',
+                        help="Cache des entrées analysées et nettoyées (relances sur des fichiers inchangés)")
+    parser.add_argument('--input-cache-max-mb', type=int, default=2048,
+                        help="Taille maximale du cache d'entrées en Mo (éviction LRU)")
+    parser.add_argument('--output-format', choices=['csv', 'parquet', 'both'], default='csv',
+                        help="Format des fichiers de données (Parquet : typé et compressé, nécessite pyarrow)")
+    parser.add_argument('--in-place', action='store_true',
+                        help="Exécution sans copie : colonnes ajoutées à la table chargée (pic mémoire réduit)")
+    parser.add_argument('--taux-change', default=FICHIER_TAUX_CHANGE, metavar='FICHIER',
+                        help="Taux de change datés (Date;Devise;Taux) : seuils appliqués aux montants en EUR")
+    parser.add_argument('--taux-age-max-jours', type=int, default=None, metavar='JOURS',
+                        help="Échec de l'exécution si un taux de change appliqué a plus de JOURS jours "
+                             "(par défaut : avertissement au-delà de 31 jours)")
+    parser.add_argument('--seen-ids', default=None, metavar='REPERTOIRE',
+                        help="Historique persistant des Transaction_ID déjà traités (rejeux ignorés)")
+    parser.add_argument('--watch', default=None, metavar='REPERTOIRE',
+                        help="Mode démon : traite chaque fichier de transactions déposé dans REPERTOIRE "
+                             "(règles, clients, taux et sanctions gardés en mémoire)")
+    parser.add_argument('--watch-interval', type=float, default=1.0,
+                        help="Délai en secondes entre deux inspections du répertoire surveillé")
+    parser.add_argument('--watch-max-files', type=int, default=None,
+                        help="Arrêt du démon après N fichiers traités (par défaut : fichier ARRET ou signal)")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="Pic de mémoire tracée (tracemalloc) par étape dans les statistiques (exécution ralentie)")
+    parser.add_argument('--resume', action='store_true',
+                        help="Reprend après la dernière étape terminée (enrichissement, règles) d'une exécution "
+                             "échouée sur les mêmes entrées ; sauvegarde ces étapes sinon")
+    parser.add_argument('--checkpoint-dir', default=None, metavar='REPERTOIRE',
+                        help="Points de reprise des étapes (défaut avec --resume : <sortie>/reprise)")
+    parser.add_argument('--self-test-startup', action='store_true',
+                        help="Mesure le démarrage à froid (import, 1re transaction lue) et le compare au budget")
+    parser.add_argument('--startup-budget-ms', type=float, default=None,
+                        help="Budget de l'import de pipeline.py en ms pour --self-test-startup (défaut : 1000)")
+    args = parser.parse_args()
+    
+    # Contrôle du démarrage à froid : code retour 1 si le budget d'import est dépassé
+    if args.self_test_startup:
+        from startup_check import BUDGET_IMPORT_MS, self_test_startup
+        budget = args.startup_budget_ms if args.startup_budget_ms is not None else BUDGET_IMPORT_MS
+        sys.exit(0 if self_test_startup(args.transactions, budget) else 1)
+    
+    configurer_journalisation()
+    if args.chunk_size and args.workers and args.workers > 1:
+        parser.error("--chunk-size et --workers ne peuvent pas être combinés")
+    
+    options = dict(chunk_size=args.chunk_size, workers=args.workers, state_path=args.state,
+                   output_format=args.output_format, csv_engine=args.csv_engine,
+                   input_cache_dir=args.input_cache, input_cache_max_mb=args.input_cache_max_mb,
+                   in_place=args.in_place, id_history_dir=args.seen_ids, fx_rates_path=args.taux_change,
+                   trace_memory=args.trace_memory, checkpoint_dir=args.checkpoint_dir, resume=args.resume,
+                   fx_max_age_days=args.taux_age_max_jours, state_replay=args.state_rejouer)
+    
+    # Mode démon : un pipeline par fichier déposé, composants chargés une fois
+    if args.watch:
+        from watch_daemon import WatchFolderDaemon
+        daemon = WatchFolderDaemon(
+            args.watch,
+            lambda chemin, sortie: CompliancePipeline(chemin, args.clients, output_dir=sortie, **options),
+            intervalle=args.watch_interval
+        )
+        sys.exit(0 if daemon.run(max_fichiers=args.watch_max_files) else 1)
     
     # Création et exécution du pipeline
-    pipeline = CompliancePipeline(transactions_path, clients_path)
+    pipeline = CompliancePipeline(args.transactions, args.clients, **options)
     success = pipeline.run_pipeline()
     
     # Code de sortie
-    sys.exit(0 if success else 1)
\ No newline at end of file
+    sys.exit(0 if success else 1)
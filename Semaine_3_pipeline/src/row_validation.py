@@ -0,0 +1,152 @@
+"""
+VALIDATION LIGNE À LIGNE - QUARANTAINE
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Contrôle vectorisé de chaque transaction contre les règles
+              déclarées dans le schéma (identifiant, montant et date
+              présents, montant positif, devise et pays connus). Chaque
+              contrôle positionne un bit ; les lignes en échec sont retirées
+              du traitement et mises en quarantaine avec leurs codes motifs.
+              Un contrôle non bloquant (taux de change absent) signale la
+              ligne dans le rapport de quarantaine sans la retirer : elle
+              reste soumise aux règles qui n'en dépendent pas.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Colonne des codes motifs ajoutée aux lignes en quarantaine
+COLONNE_MOTIFS = 'Motifs_Rejet'
+# Statut de la ligne du rapport : retirée du traitement, ou signalée mais scorée
+COLONNE_STATUT = 'Statut_Quarantaine'
+REJETEE, SIGNALEE = 'REJETEE', 'SIGNALEE'
+
+
+def _manquantes(serie, regle):
+    """Valeur manquante (NaN, NaT, None)."""
+    return serie.isna().to_numpy()
+
+
+def _sous_minimum(serie, regle):
+    """Valeur numérique strictement inférieure au minimum (valeurs manquantes ignorées)."""
+    with np.errstate(invalid='ignore'):
+        return serie.to_numpy(dtype=np.float64) < regle['valeur']
+
+
+def _hors_valeurs(serie, regle):
+    """
+    Valeur absente de la liste autorisée (valeurs manquantes comprises).
+
+    Sur une colonne catégorielle, le contrôle porte sur les modalités puis
+    est redistribué par les codes : son coût ne dépend que du nombre de
+    modalités et d'une indexation par ligne.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        autorisees = serie.cat.categories.isin(regle['valeurs'])
+        # Code -1 (valeur manquante) : dernière case, non autorisée
+        return ~np.append(autorisees, False)[serie.cat.codes.to_numpy()]
+    return ~serie.isin(regle['valeurs']).to_numpy()
+
+
+CONTROLES = {
+    'requis': _manquantes,
+    'minimum': _sous_minimum,
+    'valeurs': _hors_valeurs,
+}
+
+
+class RowValidator:
+    """
+    Règles de validation compilées (un bit par règle, évaluées en une passe).
+
+    Une règle dont la colonne est absente du fichier est ignorée : la
+    présence des colonnes est contrôlée par DataProcessor.validate_data.
+    Une règle `'bloquant': False` ne retire pas la ligne du traitement.
+    """
+
+    def __init__(self, regles):
+        """
+        Args:
+            regles (list): Règles {'code', 'colonne', 'controle', ...} (voir SCHEMA_TRANSACTIONS)
+        """
+        inconnus = [regle['controle'] for regle in regles if regle['controle'] not in CONTROLES]
+        if inconnus:
+            raise ValueError(f"Contrôles de validation inconnus : {inconnus} (attendu : {', '.join(CONTROLES)})")
+        self.regles = list(regles)
+        self.bits = {regle['code']: 1 << i for i, regle in enumerate(self.regles)}
+        self.dtype = np.min_scalar_type(max(self.bits.values(), default=1))
+        # Codes des règles non bloquantes (signalement seul)
+        self.signalements = {regle['code'] for regle in self.regles if not regle.get('bloquant', True)}
+        self.masque_bloquant = self.dtype.type(sum(bit for code, bit in self.bits.items()
+                                                   if code not in self.signalements))
+
+    @classmethod
+    def from_schema(cls, schema):
+        """Validateur des règles `validation` d'un schéma (aucune règle si absentes)."""
+        return cls(schema.get('validation', []))
+
+    def evaluate(self, df):
+        """
+        Évalue toutes les règles sur un DataFrame typé.
+
+        Args:
+            df (DataFrame): Transactions après conversion des types
+
+        Returns:
+            tuple: (bits des règles en échec par ligne, nombre de rejets par règle)
+        """
+        bits = np.zeros(len(df), dtype=self.dtype)
+        comptes = {}
+        for regle in self.regles:
+            if regle['colonne'] not in df.columns:
+                continue
+            echec = CONTROLES[regle['controle']](df[regle['colonne']], regle)
+            np.bitwise_or(bits, self.dtype.type(self.bits[regle['code']]), out=bits, where=echec)
+            comptes[regle['code']] = int(np.count_nonzero(echec))
+        return bits, comptes
+
+    def motifs(self, bits):
+        """Codes motifs lisibles (séparés par ';') depuis les bits, une chaîne par combinaison."""
+        bits = pd.Series(bits)
+        libelles = {
+            valeur: ''.join(f"{code};" for code, bit in self.bits.items() if valeur & bit)
+            for valeur in pd.unique(bits)
+        }
+        return bits.map(libelles).to_numpy()
+
+    def split(self, df):
+        """
+        Sépare les lignes traitées des lignes à mettre en quarantaine.
+
+        Le rapport de quarantaine contient les lignes rejetées (statut
+        REJETEE) et les lignes signalées par un contrôle non bloquant
+        (statut SIGNALEE), qui restent aussi dans les lignes traitées.
+        Sans rejet, `df` est retourné tel quel (aucune copie).
+
+        Args:
+            df (DataFrame): Transactions après conversion des types
+
+        Returns:
+            tuple: (lignes traitées, rapport de quarantaine avec COLONNE_MOTIFS et
+                COLONNE_STATUT, échecs par règle)
+        """
+        bits, comptes = self.evaluate(df)
+        signalees = np.flatnonzero(bits)
+        if len(signalees) == 0:
+            quarantaine = df.iloc[:0].assign(**{COLONNE_MOTIFS: pd.Series(dtype=object),
+                                                COLONNE_STATUT: pd.Series(dtype=object)})
+            return df, quarantaine, comptes
+
+        rejetees = (bits & self.masque_bloquant) != 0
+        quarantaine = df.take(signalees)
+        quarantaine[COLONNE_MOTIFS] = self.motifs(bits[signalees])
+        quarantaine[COLONNE_STATUT] = np.where(rejetees[signalees], REJETEE, SIGNALEE)
+        if rejetees.any():
+            df = df.take(np.flatnonzero(~rejetees))
+        return df, quarantaine, comptes
+
+    @staticmethod
+    def rejected_count(quarantaine):
+        """Lignes du rapport de quarantaine retirées du traitement (les autres sont signalées)."""
+        if COLONNE_STATUT not in quarantaine.columns:
+            return len(quarantaine)
+        return int(np.count_nonzero(quarantaine[COLONNE_STATUT].to_numpy() == REJETEE))
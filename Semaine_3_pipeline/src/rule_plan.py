@@ -0,0 +1,329 @@
+"""
+PLAN D'ÉVALUATION COMPILÉ DES RÈGLES MÉTIER
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Compile rules_config.json une seule fois en un plan d'évaluation
+              en une passe : tableaux intermédiaires partagés entre règles,
+              score calculé par somme pondérée et niveaux issus de la config.
+"""
+
+import time
+import logging
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+
+from blacklist_index import BlacklistIndex
+from structuring import StructuringDetector
+from schemas import SCHEMA_TRANSACTIONS
+
+logger = logging.getLogger(__name__)
+
+NIVEAUX_ALERTE_DEFAUT = {"Critique": 100, "Élevé": 70, "Moyen": 30, "Faible": 0}
+COLONNE_JOUR = SCHEMA_TRANSACTIONS['horodatage']['jour']
+COLONNE_MONTANT_EUR = SCHEMA_TRANSACTIONS['conversion_eur']['colonne']
+
+
+class EvaluationContext:
+    """
+    Cache des tableaux intermédiaires partagés entre les règles d'un plan.
+
+    Chaque colonne n'est convertie qu'une fois en tableau NumPy, chaque
+    comparaison de montant n'est calculée qu'une fois par seuil et la
+    recherche des attributs clients est faite une seule fois pour toutes
+    les règles qui en dépendent.
+    """
+
+    def __init__(self, df, client_index=None, structuring_state=None, client_state=None):
+        self.df = df
+        self.client_index = client_index
+        self.structuring_state = structuring_state
+        self.client_state = client_state
+        self._cache = {}
+
+    def _get(self, key, compute):
+        """Retourne la valeur en cache pour `key`, calculée au premier appel."""
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def montant(self):
+        """Montants float64 en EUR (montant d'origine si la table n'a pas été convertie)."""
+        colonne = COLONNE_MONTANT_EUR if COLONNE_MONTANT_EUR in self.df.columns else 'Montant'
+        return self._get('montant', lambda: self.df[colonne].to_numpy(dtype=np.float64))
+
+    def montant_superieur(self, seuil):
+        """Masque Montant > seuil (partagé par toutes les règles utilisant ce seuil)."""
+        return self._get(('montant_sup', seuil), lambda: self.montant() > seuil)
+
+    def colonne_isin(self, colonne, valeurs):
+        """Masque d'appartenance d'une colonne à un ensemble de valeurs."""
+        return self._get(
+            ('isin', colonne, tuple(valeurs)),
+            lambda: self.df[colonne].isin(valeurs).to_numpy()
+        )
+
+    def listes_noires(self, index, colonne='Bénéficiaire'):
+        """Bits des listes noires contenant la contrepartie de chaque transaction."""
+        return self._get(('listes_noires', colonne), lambda: index.lookup(self.df[colonne]))
+
+    def positions_clients(self):
+        """Code de chaque transaction dans l'index clients (-1 si client absent)."""
+        return self._get('positions_clients', lambda: self.client_index.codes(self.df['Client_ID']))
+
+    def attribut_client_egal(self, colonne, valeur):
+        """Masque `attribut client == valeur` aligné sur les transactions (False si client inconnu)."""
+        return self._get(
+            ('client', colonne, valeur),
+            lambda: self.client_index.mask(colonne, self.positions_clients(), valeur)
+        )
+
+    def codes_clients(self):
+        """Codes entiers des Client_ID des transactions (-1 si manquant)."""
+        return self._get('codes_clients', lambda: pd.factorize(self.df['Client_ID'])[0])
+
+    def historique_client(self):
+        """(nombre, montant moyen) des transactions passées du client, d'après l'état persisté."""
+        return self._get('historique', lambda: self.client_state.history(self.df['Client_ID']))
+
+    def structuring(self, detector):
+        """Masque de structuring : état multi-morceaux s'il est fourni, sinon détection directe."""
+        if self.structuring_state is not None:
+            return self.structuring_state.mask(self.df['Client_ID'], self.jours(), self.montant())
+        return detector.detect(self.codes_clients(), self.jours(), self.montant())
+
+    def jours(self):
+        """Numéro de jour int64 de chaque transaction (NaT = valeur minimale int64)."""
+        return self._get('jours', self._calculer_jours)
+
+    def _calculer_jours(self):
+        # Colonne entière calculée au nettoyage ; conversion de Date pour une table non nettoyée
+        if COLONNE_JOUR in self.df.columns:
+            return self.df[COLONNE_JOUR].to_numpy(dtype=np.int64)
+        return pd.to_datetime(self.df['Date']).to_numpy(dtype='datetime64[D]').astype(np.int64)
+
+
+class CompiledRule:
+    """Règle compilée : code, bit, coefficient et fonction de masque."""
+
+    def __init__(self, code, bit, coefficient, evaluer, libelle, requiert_clients=False, colonnes=(),
+                 requiert_historique=False):
+        self.code = code
+        self.bit = bit
+        self.coefficient = coefficient
+        self.evaluer = evaluer
+        self.libelle = libelle
+        self.requiert_clients = requiert_clients
+        self.requiert_historique = requiert_historique
+        self.colonnes = tuple(colonnes)
+
+    def applicable(self, ctx):
+        """Indique si la règle peut être évaluée sur ce contexte."""
+        if self.requiert_clients and ctx.client_index is None:
+            return False
+        if self.requiert_historique and ctx.client_state is None:
+            return False
+        return all(col in ctx.df.columns for col in self.colonnes)
+
+
+class PlanResult:
+    """Résultat de l'évaluation d'un plan sur un lot de transactions."""
+
+    def __init__(self, flags, scores, niveaux, distribution, comptes, temps):
+        self.flags = flags
+        self.scores = scores
+        self.niveaux = niveaux
+        self.distribution = distribution
+        self.comptes = comptes
+        self.temps = temps
+
+
+class RulePlan:
+    """Plan d'évaluation compilé à partir de la configuration des règles."""
+
+    def __init__(self, regles, alert_bits, flags_dtype, niveaux_alerte, structuring=None):
+        self.regles = regles
+        self.alert_bits = alert_bits
+        self.flags_dtype = flags_dtype
+        self.structuring = structuring
+
+        # Niveaux triés par seuil croissant : Score >= seuil -> niveau
+        niveaux_tries = sorted(niveaux_alerte.items(), key=lambda item: item[1])
+        self.noms_niveaux = np.array([nom for nom, _ in niveaux_tries], dtype=object)
+        self.seuils_niveaux = np.array([seuil for _, seuil in niveaux_tries], dtype=np.float64)
+
+        # Somme pondérée précalculée pour chaque combinaison de bits
+        coefficients = np.zeros(len(alert_bits), dtype=np.int64)
+        for regle in regles:
+            coefficients[regle.bit.bit_length() - 1] = regle.coefficient
+        self.coefficients = coefficients
+        if len(alert_bits) <= 16:
+            combinaisons = np.arange(1 << len(alert_bits))
+            bits = (combinaisons[:, None] >> np.arange(len(alert_bits))) & 1
+            self.table_scores = bits @ coefficients
+            self.table_niveaux = self._indices_niveaux(self.table_scores)
+        else:
+            self.table_scores = None
+            self.table_niveaux = None
+
+    def evaluate(self, df, client_index=None, structuring_state=None, client_state=None, profiler=None):
+        """
+        Évalue toutes les règles du plan en une passe.
+
+        Args:
+            df (DataFrame): Transactions (enrichies ou non)
+            client_index (ClientIndex): Index du référentiel clients (optionnel)
+            structuring_state (StructuringState): État finalisé du traitement par morceaux (optionnel)
+            client_state (ClientStateStore): Historique client persisté (optionnel)
+            profiler (StageProfiler): Relevé durée, CPU et mémoire de chaque règle (optionnel)
+
+        Returns:
+            PlanResult: Bits d'alertes, scores, niveaux, comptes et temps par règle
+        """
+        ctx = EvaluationContext(df, client_index, structuring_state, client_state)
+        flags = np.zeros(len(df), dtype=self.flags_dtype)
+        comptes = {}
+        temps = {}
+
+        def mesurer(code):
+            return profiler.stage(f"regles.{code}", len(df)) if profiler is not None else nullcontext()
+
+        for regle in self.regles:
+            if not regle.applicable(ctx):
+                continue
+            with mesurer(regle.code):
+                debut = time.perf_counter()
+                mask = np.asarray(regle.evaluer(ctx), dtype=bool)
+                np.bitwise_or(flags, self.flags_dtype.type(regle.bit), out=flags, where=mask)
+                temps[regle.code] = time.perf_counter() - debut
+            comptes[regle.code] = int(np.count_nonzero(mask))
+
+        with mesurer('SCORE_ET_NIVEAUX'):
+            debut = time.perf_counter()
+            scores = self.scores_depuis_flags(flags)
+            if self.table_niveaux is not None:
+                indices = self.table_niveaux[flags]
+            else:
+                indices = self._indices_niveaux(scores)
+            niveaux = self.noms_niveaux[indices]
+            distribution = dict(zip(
+                self.noms_niveaux,
+                np.bincount(indices, minlength=len(self.noms_niveaux)).tolist()
+            ))
+            temps['SCORE_ET_NIVEAUX'] = time.perf_counter() - debut
+
+        return PlanResult(flags, scores, niveaux, distribution, comptes, temps)
+
+    def scores_depuis_flags(self, flags):
+        """Score de risque = somme pondérée des coefficients des bits positionnés."""
+        if self.table_scores is not None:
+            return self.table_scores[flags]
+        bits = (flags[:, None] >> np.arange(len(self.coefficients), dtype=flags.dtype)) & 1
+        return bits @ self.coefficients
+
+    def niveaux_depuis_scores(self, scores):
+        """Niveau d'alerte d'après les seuils `niveaux_alerte` de la configuration."""
+        return self.noms_niveaux[self._indices_niveaux(scores)]
+
+    def _indices_niveaux(self, scores):
+        indices = np.searchsorted(self.seuils_niveaux, scores, side='right') - 1
+        return np.clip(indices, 0, None)
+
+
+def _regle_liste_noire(index, nom):
+    """Fonction de masque pour une liste noire de l'index."""
+    bit = index.bit_liste(nom)
+    return lambda ctx: (ctx.listes_noires(index) & bit) != 0
+
+
+def _regle_augmentation_soudaine(params):
+    """Montant supérieur de plus de `augmentation_soudaine` % à la moyenne passée du client."""
+    facteur = 1 + params.get('augmentation_soudaine', 500) / 100
+    nb_min = params.get('nb_historique_min', 5)
+
+    def evaluer(ctx):
+        nb, moyenne = ctx.historique_client()
+        with np.errstate(invalid='ignore'):
+            return (nb >= nb_min) & (ctx.montant() > facteur * moyenne)
+    return evaluer
+
+
+def compile_rules(config, index_dir=None):
+    """
+    Compile la configuration des règles en plan d'évaluation.
+
+    Seules les règles dont le code possède un coefficient dans
+    `coefficients_risque` sont retenues (un bit par code, dans l'ordre
+    d'application des règles : ordre des codes dans la colonne Alertes).
+    Chaque liste
+    de `listes_noires` donne la règle LISTE_NOIRE_<NOM>. Les règles
+    d'historique (AUGMENTATION_SOUDAINE) ne s'appliquent qu'avec un état
+    client persisté.
+
+    Args:
+        config (dict): Configuration chargée depuis rules_config.json
+        index_dir (str): Répertoire de persistance de l'index des listes noires
+
+    Returns:
+        RulePlan: Plan prêt à être évalué
+    """
+    coefficients = config['coefficients_risque']
+    seuils = config['seuils']
+    pays_sanctions = list(config.get('pays_sanctions', []))
+    detector = StructuringDetector.from_config(config)
+
+    candidats = [
+        ('SEUIL_REGLEMENTAIRE',
+         lambda ctx: ctx.montant_superieur(seuils['reglementaire']),
+         f"transactions > {seuils['reglementaire']}€", False, ('Montant',)),
+        ('CLIENT_RISQUE_ELEVE',
+         lambda ctx: ctx.attribut_client_egal('Niveau_Risque', 'Élevé'),
+         "clients risque élevé", True, ('Client_ID',)),
+        ('CLIENT_PEP',
+         lambda ctx: ctx.attribut_client_egal('Est_PEP', 'Oui'),
+         "clients PEP", True, ('Client_ID',)),
+        ('PAYS_SANCTIONNE',
+         lambda ctx: ctx.colonne_isin('Pays_Bénéficiaire', pays_sanctions),
+         "vers pays sanctionnés", False, ('Pays_Bénéficiaire',)),
+    ]
+
+    listes_noires = config.get('listes_noires', {})
+    if any(f"LISTE_NOIRE_{nom.upper()}" in coefficients for nom in listes_noires):
+        index = BlacklistIndex.load_or_build(listes_noires, index_dir)
+        candidats += [
+            (f"LISTE_NOIRE_{nom.upper()}", _regle_liste_noire(index, nom),
+             f"contreparties en liste noire {nom}", False, ('Bénéficiaire',))
+            for nom in listes_noires
+        ]
+
+    surveillance = config.get('parametres_detection', {}).get('surveillance_client', {})
+    candidats += [
+        ('MONTANT_EXCEPTIONNEL',
+         lambda ctx: ctx.montant_superieur(seuils['exceptionnel']),
+         f"> {seuils['exceptionnel']}€", False, ('Montant',)),
+        ('SUSPICION_STRUCTURING',
+         lambda ctx: ctx.structuring(detector),
+         "suspicions structuring", False, ('Date', 'Client_ID', 'Montant')),
+        ('AUGMENTATION_SOUDAINE',
+         _regle_augmentation_soudaine(surveillance),
+         "augmentations soudaines vs historique client", False, ('Client_ID', 'Montant')),
+    ]
+    historiques = {'AUGMENTATION_SOUDAINE'}
+
+    # Bits dans l'ordre d'application, puis les codes configurés sans règle
+    codes = [code for code, *_ in candidats if code in coefficients]
+    codes += [code for code in coefficients if code not in codes]
+    alert_bits = {code: 1 << i for i, code in enumerate(codes)}
+    flags_dtype = np.min_scalar_type(max(alert_bits.values(), default=1))
+
+    regles = [
+        CompiledRule(code, alert_bits[code], coefficients[code], evaluer, libelle,
+                     requiert_clients=requiert_clients, colonnes=colonnes,
+                     requiert_historique=code in historiques)
+        for code, evaluer, libelle, requiert_clients, colonnes in candidats
+        if code in coefficients
+    ]
+
+    logger.info(f"Plan de règles compilé : {len(regles)} règles, {len(alert_bits)} codes d'alerte")
+    return RulePlan(regles, alert_bits, flags_dtype, config.get('niveaux_alerte', NIVEAUX_ALERTE_DEFAUT),
+                    structuring=detector)
@@ -9,19 +9,35 @@ from datetime import datetime
 import json
 import logging
 
+from client_index import ClientIndex
+from rule_plan import compile_rules, EvaluationContext, COLONNE_MONTANT_EUR
+from structuring import StructuringState, NAT_JOUR
+from client_state import ClientStateStore
+
 logger = logging.getLogger(__name__)
 
 class RulesEngine:
     """Moteur d'application des règles métier de compliance bancaire."""
     
-    def __init__(self, config_path=None):
-        """Initialise le moteur de règles."""
+    def __init__(self, config_path=None, index_dir=None):
+        """
+        Initialise le moteur de règles.
+        
+        Args:
+            config_path (str): Chemin vers rules_config.json (configuration par défaut sinon)
+            index_dir (str): Répertoire de persistance de l'index des listes noires
+        """
         if config_path:
             with open(config_path, 'r', encoding='utf-8') as f:
                 self.config = json.load(f)
         else:
             self.config = self._get_default_config()
         
+        # Compilation unique de la configuration en plan d'évaluation
+        self.plan = compile_rules(self.config, index_dir=index_dir)
+        self.alert_bits = self.plan.alert_bits
+        self.rule_timings = {}
+        
         logger.info(f"🔧 Moteur de règles initialisé (seuil: {self.config['seuils']['reglementaire']}€)")
     
     def _get_default_config(self):
@@ -40,158 +56,180 @@ class RulesEngine:
                 "CLIENT_PEP": 50,
                 "MONTANT_EXCEPTIONNEL": 40,
                 "SUSPICION_STRUCTURING": 35
+            },
+            "niveaux_alerte": {
+                "Critique": 100,
+                "Élevé": 70,
+                "Moyen": 30,
+                "Faible": 0
+            },
+            "parametres_detection": {
+                "structuring": {
+                    "nb_transactions_min": 2,
+                    "periode_jours": 1,
+                    "seuil_total_min": 15000
+                }
             }
         }
     
-    def apply_all_rules(self, df_transactions, df_clients=None):
-        """Applique l'ensemble des règles métier."""
-        logger.info("Application des règles de compliance...")
-        
-        df = df_transactions.copy()
-        df['Alertes'] = ''
-        df['Niveau_Alerte'] = 'Faible'
-        df['Score_Risque'] = 0
+    def apply_all_rules(self, df_transactions, df_clients=None, client_index=None,
+                        structuring_state=None, client_state=None, verbose=True, inplace=False, profiler=None):
+        """
+        Applique l'ensemble des règles métier (plan compilé, une passe).
+        
+        Args:
+            df_transactions (DataFrame): Transactions à contrôler
+            df_clients (DataFrame): Référentiel clients, indexé ici si `client_index` est absent
+            client_index (ClientIndex): Index clients déjà construit (ex. par le DataProcessor)
+            structuring_state (StructuringState): État de structuring (traitement par morceaux)
+            client_state (ClientStateStore): Historique client des exécutions précédentes
+            verbose (bool): Journalise les comptes par règle et par niveau
+            inplace (bool): Ajoute les colonnes de résultat à `df_transactions` sans le copier
+            profiler (StageProfiler): Mesure chaque règle comme une étape 'regles.<code>' (optionnel)
+        
+        Returns:
+            DataFrame: Transactions avec bits d'alertes, score et niveau
+        """
+        if verbose:
+            logger.info("Application des règles de compliance...")
+        
+        if client_index is None and df_clients is not None:
+            client_index = ClientIndex(df_clients)
+        
+        # Fenêtres de structuring prolongées par l'historique des jours précédents
+        if client_state is not None and structuring_state is None:
+            structuring_state = self.create_structuring_state()
+            if structuring_state is not None:
+                self.seed_structuring_state(structuring_state, client_state)
+                self.update_structuring_state(structuring_state, df_transactions)
+                structuring_state.finalize()
+        
+        df = df_transactions if inplace else df_transactions.copy()
+        resultat = self.plan.evaluate(df, client_index, structuring_state, client_state, profiler)
+        
+        df['Alertes_Flags'] = resultat.flags
+        df['Niveau_Alerte'] = resultat.niveaux
+        df['Score_Risque'] = resultat.scores
         df['Details_Alertes'] = ''
+        self.rule_timings = resultat.temps
         
-        # Application des règles
-        df = self._apply_seuil_reglementaire(df)
+        if not verbose:
+            return df
         
-        if df_clients is not None:
-            df = self._apply_risque_client(df, df_clients)
+        for regle in self.plan.regles:
+            count = resultat.comptes.get(regle.code, 0)
+            if count > 0:
+                logger.info(f"   • {count} {regle.libelle}")
         
-        df = self._apply_pays_sanctionnes(df)
-        df = self._apply_montant_exceptionnel(df)
-        df = self._detect_structuring(df)
-        df = self._calculer_niveau_alerte(df)
+        # Log distribution
+        for niveau in self.plan.noms_niveaux[::-1]:
+            count = resultat.distribution[niveau]
+            if count > 0:
+                logger.info(f"   • Niveau '{niveau}': {count}")
         
         logger.info("✅ Règles appliquées")
         return df
     
-    def _apply_seuil_reglementaire(self, df):
-        """Règle 1: Seuil réglementaire."""
-        seuil = self.config['seuils']['reglementaire']
-        mask = df['Montant'] > seuil
-        
-        if mask.any():
-            df.loc[mask, 'Alertes'] += 'SEUIL_REGLEMENTAIRE;'
-            df.loc[mask, 'Score_Risque'] += self.config['coefficients_risque']['SEUIL_REGLEMENTAIRE']
-            logger.info(f"   • {mask.sum()} transactions > {seuil}€")
-        
-        return df
+    def create_structuring_state(self):
+        """État de structuring à alimenter morceau par morceau (None si la règle est inactive)."""
+        if not any(regle.code == 'SUSPICION_STRUCTURING' for regle in self.plan.regles):
+            return None
+        return StructuringState(self.plan.structuring)
     
-    def _apply_risque_client(self, df, df_clients):
-        """Règle 2: Risque client."""
-        # Fusion temporaire pour les vérifications
-        temp_df = pd.merge(
-            df[['Transaction_ID', 'Client_ID']],
-            df_clients[['Client_ID', 'Niveau_Risque', 'Est_PEP']],
-            on='Client_ID',
-            how='left'
-        )
-        
-        # Clients à risque élevé
-        mask_risque = temp_df['Niveau_Risque'] == 'Élevé'
-        if mask_risque.any():
-            df.loc[mask_risque, 'Alertes'] += 'CLIENT_RISQUE_ELEVE;'
-            df.loc[mask_risque, 'Score_Risque'] += self.config['coefficients_risque']['CLIENT_RISQUE_ELEVE']
-            logger.info(f"   • {mask_risque.sum()} clients risque élevé")
-        
-        # Clients PEP
-        mask_pep = temp_df['Est_PEP'] == 'Oui'
-        if mask_pep.any():
-            df.loc[mask_pep, 'Alertes'] += 'CLIENT_PEP;'
-            df.loc[mask_pep, 'Score_Risque'] += self.config['coefficients_risque']['CLIENT_PEP']
-            logger.info(f"   • {mask_pep.sum()} clients PEP")
-        
-        return df
+    def update_structuring_state(self, state, df_transactions):
+        """Agrège un morceau de transactions nettoyées dans l'état de structuring."""
+        if not all(col in df_transactions.columns for col in ('Date', 'Client_ID', 'Montant')):
+            return
+        ctx = EvaluationContext(df_transactions)
+        state.update(df_transactions['Client_ID'], ctx.jours(), ctx.montant())
     
-    def _apply_pays_sanctionnes(self, df):
-        """Règle 3: Pays sous sanctions."""
-        mask = df['Pays_Bénéficiaire'].isin(self.config['pays_sanctions'])
-        
-        if mask.any():
-            df.loc[mask, 'Alertes'] += 'PAYS_SANCTIONNE;'
-            df.loc[mask, 'Score_Risque'] += self.config['coefficients_risque']['PAYS_SANCTIONNE']
-            logger.info(f"   • {mask.sum()} vers pays sanctionnés")
-        
-        return df
+    def seed_structuring_state(self, state, client_state):
+        """Amorce l'état de structuring avec les agrégats persistés des jours précédents."""
+        state.seed(*client_state.structuring_aggregates())
     
-    def _apply_montant_exceptionnel(self, df):
-        """Règle 4: Montant exceptionnel."""
-        seuil = self.config['seuils']['exceptionnel']
-        mask = df['Montant'] > seuil
-        
-        if mask.any():
-            df.loc[mask, 'Alertes'] += 'MONTANT_EXCEPTIONNEL;'
-            df.loc[mask, 'Score_Risque'] += self.config['coefficients_risque']['MONTANT_EXCEPTIONNEL']
-            logger.info(f"   • {mask.sum()} > {seuil}€")
-        
-        return df
+    def client_state_from_transactions(self, df_transactions):
+        """Résumé par client d'un lot de transactions nettoyées, à fusionner dans l'état persisté."""
+        ctx = EvaluationContext(df_transactions)
+        if 'Date' in df_transactions.columns:
+            jours = ctx.jours()
+        else:
+            jours = np.full(len(df_transactions), NAT_JOUR, dtype=np.int64)
+        return ClientStateStore.from_transactions(
+            df_transactions['Client_ID'], jours, ctx.montant(), self.plan.structuring
+        )
     
-    def _detect_structuring(self, df):
-        """Règle 5: Détection de structuring."""
-        if 'Date' not in df.columns:
-            return df
-        
-        structuring_ids = []
-        df['Date_only'] = pd.to_datetime(df['Date']).dt.date
-        seuil = self.config['seuils']['structuring']
-        
-        for (client_id, date), group in df.groupby(['Client_ID', 'Date_only']):
-            if len(group) >= 2:
-                below = group[group['Montant'] < seuil]
-                if len(below) >= 2 and below['Montant'].sum() > 10000:
-                    structuring_ids.extend(below.index.tolist())
-        
-        if structuring_ids:
-            df.loc[structuring_ids, 'Alertes'] += 'SUSPICION_STRUCTURING;'
-            df.loc[structuring_ids, 'Score_Risque'] += self.config['coefficients_risque']['SUSPICION_STRUCTURING']
-            logger.info(f"   • {len(set(structuring_ids))} suspicions structuring")
-        
-        df = df.drop(columns=['Date_only'], errors='ignore')
-        return df
+    def timing_report(self):
+        """Retourne le temps d'évaluation de chaque règle (ms) du dernier passage."""
+        return {code: round(duree * 1000, 3) for code, duree in self.rule_timings.items()}
     
-    def _calculer_niveau_alerte(self, df):
-        """Calcule le niveau d'alerte final."""
-        conditions = [
-            df['Score_Risque'] >= 100,
-            (df['Score_Risque'] >= 70) & (df['Score_Risque'] < 100),
-            (df['Score_Risque'] >= 30) & (df['Score_Risque'] < 70),
-            df['Score_Risque'] < 30
-        ]
-        choices = ['Critique', 'Élevé', 'Moyen', 'Faible']
-        
-        df['Niveau_Alerte'] = np.select(conditions, choices, 'Faible')
-        
-        # Log distribution
-        for niveau in ['Critique', 'Élevé', 'Moyen', 'Faible']:
-            count = (df['Niveau_Alerte'] == niveau).sum()
-            if count > 0:
-                logger.info(f"   • Niveau '{niveau}': {count}")
-        
-        return df
+    def decode_alertes(self, flags):
+        """Construit la colonne lisible 'Alertes' (codes séparés par ';') depuis les bits."""
+        flags = pd.Series(flags)
+        libelles = {
+            valeur: ''.join(f"{code};" for code, bit in self.alert_bits.items() if valeur & bit)
+            for valeur in pd.unique(flags)
+        }
+        return flags.map(libelles)
     
     def generate_summary_report(self, df):
         """Génère un rapport synthétique."""
+        flags = df['Alertes_Flags'].to_numpy()
+        en_alerte = flags != 0
+        # Montant à risque en EUR (montant d'origine si la table n'a pas été convertie ;
+        # transactions sans taux de change ignorées)
+        colonne_montant = COLONNE_MONTANT_EUR if COLONNE_MONTANT_EUR in df.columns else 'Montant'
+        
         summary = {
             "total_transactions": len(df),
-            "transactions_alerte": len(df[df['Alertes'] != '']),
+            "transactions_alerte": int(en_alerte.sum()),
             "distribution_niveaux": df['Niveau_Alerte'].value_counts().to_dict(),
-            "montant_total_alerte": df.loc[df['Alertes'] != '', 'Montant'].sum() if 'Montant' in df.columns else 0,
-            "types_alertes": {}  # ← AJOUTE CETTE LIGNE !
+            "montant_total_alerte": (np.nansum(df[colonne_montant].to_numpy(dtype=np.float64)[en_alerte])
+                                     if colonne_montant in df.columns else 0),
+            "types_alertes": {}
         }
         
-        # Calculer les types d'alertes
-        if 'Alertes' in df.columns and not df[df['Alertes'] != ''].empty:
-            all_alerts = []
-            for alerts in df.loc[df['Alertes'] != '', 'Alertes']:
-                if isinstance(alerts, str):
-                    all_alerts.extend([a.strip() for a in alerts.split(';') if a.strip()])
-            
-            from collections import Counter
-            if all_alerts:
-                summary['types_alertes'] = dict(Counter(all_alerts))
+        # Comptage des types d'alertes par opérations bit à bit
+        for code, bit in self.alert_bits.items():
+            count = int(np.count_nonzero(flags & bit))
+            if count > 0:
+                summary['types_alertes'][code] = count
+        
+        return summary
+    
+    def merge_summary_reports(self, reports):
+        """
+        Fusionne les rapports synthétiques de plusieurs lots de transactions.
+        
+        Args:
+            reports (list): Rapports issus de generate_summary_report
+        
+        Returns:
+            dict: Rapport équivalent à celui du fichier complet
+        """
+        summary = {
+            "total_transactions": 0,
+            "transactions_alerte": 0,
+            "distribution_niveaux": {},
+            "montant_total_alerte": 0,
+            "types_alertes": {}
+        }
         
+        for report in reports:
+            summary['total_transactions'] += report['total_transactions']
+            summary['transactions_alerte'] += report['transactions_alerte']
+            summary['montant_total_alerte'] += report['montant_total_alerte']
+            for cle in ('distribution_niveaux', 'types_alertes'):
+                for code, count in report[cle].items():
+                    summary[cle][code] = summary[cle].get(code, 0) + count
+        
+        # Même ordre que value_counts (effectif décroissant) et que les bits d'alerte
+        summary['distribution_niveaux'] = dict(
+            sorted(summary['distribution_niveaux'].items(), key=lambda item: -item[1])
+        )
+        summary['types_alertes'] = {
+            code: summary['types_alertes'][code]
+            for code in self.alert_bits if code in summary['types_alertes']
+        }
         return summary
 if __name__ == "__main__":
     print("✅ Moteur de règles prêt")
\ No newline at end of file
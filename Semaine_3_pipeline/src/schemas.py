@@ -0,0 +1,252 @@
+"""
+SCHÉMAS DES FICHIERS D'ENTRÉE
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Types déclarés des colonnes des fichiers transactions et
+              clients, et lecture CSV typée. Les colonnes à peu de modalités
+              (pays, devises, canaux, niveaux) sont lues en catégories, les
+              montants en float64 et les dates avec un format explicite.
+              Les colonnes absentes du schéma gardent l'inférence de pandas.
+              Date et Heure donnent un horodatage int64 et un numéro de jour
+              entier, calculés une fois au nettoyage pour toutes les règles.
+              Les contrôles ligne à ligne (quarantaine) et les colonnes de la
+              conversion des montants en EUR y sont déclarés.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MOTEURS_CSV = ('c', 'pyarrow')
+
+# Valeurs lues comme manquantes par pandas (reprises pour le moteur pyarrow)
+VALEURS_MANQUANTES = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+]
+
+# Codes pays ISO 3166-1 alpha-2 attribués
+CODES_PAYS_ISO = (
+    "AD AE AF AG AI AL AM AO AQ AR AS AT AU AW AX AZ BA BB BD BE BF BG BH BI BJ BL BM BN BO BQ BR BS "
+    "BT BV BW BY BZ CA CC CD CF CG CH CI CK CL CM CN CO CR CU CV CW CX CY CZ DE DJ DK DM DO DZ EC EE "
+    "EG EH ER ES ET FI FJ FK FM FO FR GA GB GD GE GF GG GH GI GL GM GN GP GQ GR GS GT GU GW GY HK HM "
+    "HN HR HT HU ID IE IL IM IN IO IQ IR IS IT JE JM JO JP KE KG KH KI KM KN KP KR KW KY KZ LA LB LC "
+    "LI LK LR LS LT LU LV LY MA MC MD ME MF MG MH MK ML MM MN MO MP MQ MR MS MT MU MV MW MX MY MZ NA "
+    "NC NE NF NG NI NL NO NP NR NU NZ OM PA PE PF PG PH PK PL PM PN PR PS PT PW PY QA RE RO RS RU RW "
+    "SA SB SC SD SE SG SH SI SJ SK SL SM SN SO SR SS ST SV SX SY SZ TC TD TF TG TH TJ TK TL TM TN TO "
+    "TR TT TV TW TZ UA UG UM US UY UZ VA VC VE VG VI VN VU WF WS YE YT ZA ZM ZW"
+).split()
+
+# Devises ISO 4217 acceptées pour les opérations
+DEVISES_ACCEPTEES = (
+    "EUR USD GBP CHF JPY CAD AUD NZD SEK NOK DKK PLN CZK HUF RON BGN ISK TRY RUB CNY HKD SGD "
+    "INR BRL MXN ZAR AED SAR QAR KWD ILS MAD TND DZD XOF XAF"
+).split()
+
+SCHEMA_TRANSACTIONS = {
+    'colonnes': {
+        'Transaction_ID': 'object',
+        'Heure': 'category',
+        'Client_ID': 'category',
+        'Type_Operation': 'category',
+        'Montant': 'float64',
+        'Devise': 'category',
+        'Bénéficiaire': 'object',
+        'Pays_Bénéficiaire': 'category',
+        'Canal': 'category',
+        'Statut_Compliance': 'category',
+        'Priorité': 'category',
+        'Pattern': 'category',
+        'Commentaire': 'category',
+    },
+    'dates': {'Date': '%Y-%m-%d'},
+    # Horodatage int64 (ns depuis 1970) de Date + Heure, et numéro de jour (jours depuis 1970)
+    'horodatage': {'colonne': 'Horodatage', 'jour': 'Jour', 'date': 'Date',
+                   'heure': 'Heure', 'format_heure': '%H:%M'},
+    # Montant converti en EUR au taux du jour (fx_rates) et taux appliqué, calculés au nettoyage
+    'conversion_eur': {'colonne': 'Montant_EUR', 'taux': 'Taux_Change', 'montant': 'Montant',
+                       'devise': 'Devise', 'jour': 'Jour'},
+    # Contrôles ligne à ligne après conversion des types : une ligne en échec part en quarantaine
+    'validation': [
+        {'code': 'TRANSACTION_ID_MANQUANT', 'colonne': 'Transaction_ID', 'controle': 'requis'},
+        {'code': 'MONTANT_INVALIDE', 'colonne': 'Montant', 'controle': 'requis'},
+        {'code': 'MONTANT_NEGATIF', 'colonne': 'Montant', 'controle': 'minimum', 'valeur': 0},
+        {'code': 'DATE_INVALIDE', 'colonne': 'Date', 'controle': 'requis'},
+        {'code': 'DEVISE_INCONNUE', 'colonne': 'Devise', 'controle': 'valeurs', 'valeurs': DEVISES_ACCEPTEES},
+        {'code': 'PAYS_INVALIDE', 'colonne': 'Pays_Bénéficiaire', 'controle': 'valeurs', 'valeurs': CODES_PAYS_ISO},
+        # Contrôlé uniquement si une table de taux est chargée (colonne absente sinon). Non bloquant :
+        # la ligne reste soumise aux règles pays, listes et profil client ; Montant_EUR manquant,
+        # seules les règles de montant l'ignorent
+        {'code': 'TAUX_CHANGE_ABSENT', 'colonne': 'Taux_Change', 'controle': 'requis', 'bloquant': False},
+    ],
+}
+
+SCHEMA_CLIENTS = {
+    'colonnes': {
+        'Client_ID': 'object',
+        'Nom': 'object',
+        'Pays': 'category',
+        'Niveau_Risque': 'category',
+        'Segment': 'category',
+        'Encours_Annuel': 'float64',
+        'Industrie': 'category',
+        'Est_PEP': 'category',
+    },
+    'dates': {'Date_Inscription': '%Y-%m-%d'},
+}
+
+
+def _dtypes(schema, colonnes_fichier, numeriques=True):
+    """Types à passer à read_csv pour les colonnes présentes dans le fichier."""
+    dtypes = {}
+    for col in colonnes_fichier:
+        if col in schema['dates']:
+            # Lue en catégories : chaque date distincte n'est analysée qu'une fois
+            dtypes[col] = 'category'
+        elif col in schema['colonnes'] and (numeriques or schema['colonnes'][col] in ('object', 'category')):
+            dtypes[col] = schema['colonnes'][col]
+    return dtypes
+
+
+def parse_dates(df, schema):
+    """
+    Convertit les colonnes de dates du schéma (format explicite, invalides -> NaT).
+
+    Les dates sont analysées sur les modalités de la colonne catégorielle
+    puis redistribuées par leurs codes.
+    """
+    for col, format_date in schema['dates'].items():
+        if col not in df.columns or pd.api.types.is_datetime64_any_dtype(df[col]):
+            continue
+        valeurs = df[col].astype('category')
+        modalites = pd.to_datetime(valeurs.cat.categories, format=format_date, errors='coerce')
+        codes = valeurs.cat.codes.to_numpy()
+        dates = np.full(len(codes), np.datetime64('NaT'), dtype='datetime64[ns]')
+        dates[codes >= 0] = modalites.to_numpy(dtype='datetime64[ns]')[codes[codes >= 0]]
+        invalides = int(modalites.isna().sum())
+        if invalides:
+            logger.warning(f"   • {col} : {invalides} valeurs distinctes hors format {format_date} (NaT)")
+        df[col] = dates
+    return df
+
+
+def add_timestamp_columns(df, schema):
+    """
+    Ajoute l'horodatage int64 et le numéro de jour entier décrits par le schéma.
+
+    L'heure est analysée avec son format explicite sur les modalités de la
+    colonne catégorielle puis redistribuée par les codes. Une heure manquante
+    ou hors format place la transaction à minuit ; une date manquante donne
+    NAT_JOUR (plus petit int64, représentation de NaT) dans les deux colonnes.
+    Sans effet si la colonne de jour existe déjà ou si la date est absente.
+
+    Args:
+        df (DataFrame): Transactions dont la date est déjà convertie (parse_dates)
+        schema (dict): SCHEMA_TRANSACTIONS
+
+    Returns:
+        DataFrame: `df`, complété en place
+    """
+    spec = schema.get('horodatage')
+    if spec is None or spec['jour'] in df.columns or spec['date'] not in df.columns:
+        return df
+
+    dates = df[spec['date']].to_numpy(dtype='datetime64[ns]')
+    horodatage = dates.view(np.int64).copy()
+    manquantes = np.isnat(dates)
+
+    if spec['heure'] in df.columns:
+        valeurs = df[spec['heure']].astype('category')
+        heures = pd.to_datetime(valeurs.cat.categories.astype(str), format=spec['format_heure'], errors='coerce')
+        decalages = (heures - heures.normalize()).to_numpy(dtype='timedelta64[ns]').view(np.int64)
+        invalides = np.isnat(heures.to_numpy())
+        if invalides.any():
+            logger.warning(f"   • {spec['heure']} : {int(invalides.sum())} valeurs distinctes hors format "
+                           f"{spec['format_heure']} (minuit)")
+        decalages = np.append(np.where(invalides, 0, decalages), 0)
+        # Code -1 (heure manquante) : dernière case, décalage nul
+        horodatage += decalages[valeurs.cat.codes.to_numpy()]
+    horodatage[manquantes] = np.iinfo(np.int64).min
+
+    df[spec['colonne']] = horodatage
+    df[spec['jour']] = dates.astype('datetime64[D]').view(np.int64)
+    return df
+
+
+def read_typed_csv(filepath, schema, sep=';', engine='c', chunksize=None):
+    """
+    Lit un CSV avec les types déclarés du schéma.
+
+    Le moteur 'pyarrow' analyse le fichier sur plusieurs threads ; il ne
+    lit pas par morceaux (le mode flux utilise toujours le moteur C). Si
+    une colonne numérique contient des valeurs non numériques, la lecture
+    est refaite sans type numérique imposé : la conversion tolérante de
+    DataProcessor._convert_types s'applique alors (valeurs invalides -> NaN).
+
+    Args:
+        filepath (str): Chemin du fichier CSV
+        schema (dict): SCHEMA_TRANSACTIONS ou SCHEMA_CLIENTS
+        sep (str): Séparateur
+        engine (str): 'c' ou 'pyarrow'
+        chunksize (int): Lecture par morceaux (None = fichier complet)
+
+    Returns:
+        DataFrame, ou itérateur de DataFrame si chunksize est donné
+    """
+    if engine not in MOTEURS_CSV:
+        raise ValueError(f"Moteur CSV inconnu : {engine} (attendu : {', '.join(MOTEURS_CSV)})")
+    colonnes_fichier = pd.read_csv(filepath, sep=sep, nrows=0).columns
+
+    if chunksize:
+        # Un morceau ne peut pas être relu : les colonnes numériques gardent l'inférence
+        return _iter_typed_chunks(filepath, schema, sep, chunksize,
+                                  _dtypes(schema, colonnes_fichier, numeriques=False))
+
+    lire = _read_pyarrow if engine == 'pyarrow' else _read_c
+    try:
+        df = lire(filepath, sep, _dtypes(schema, colonnes_fichier))
+    except ValueError as e:
+        logger.warning(f"Valeurs non numériques dans {filepath} ({e}) : lecture sans type numérique imposé")
+        df = lire(filepath, sep, _dtypes(schema, colonnes_fichier, numeriques=False))
+    return parse_dates(df, schema)
+
+
+def _read_c(filepath, sep, dtypes):
+    return pd.read_csv(filepath, sep=sep, dtype=dtypes)
+
+
+def _read_pyarrow(filepath, sep, dtypes):
+    """
+    Lecture multithread par pyarrow.csv.
+
+    Les types sont imposés à pyarrow lui-même : via `pd.read_csv(engine=
+    'pyarrow')`, une colonne texte comme Heure serait d'abord convertie en
+    heure par l'inférence de pyarrow.
+    """
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    types_arrow = {
+        'object': pa.string(),
+        'category': pa.dictionary(pa.int32(), pa.string()),
+        'float64': pa.float64(),
+    }
+    table = pa_csv.read_csv(
+        filepath,
+        parse_options=pa_csv.ParseOptions(delimiter=sep),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={col: types_arrow[dtype] for col, dtype in dtypes.items()},
+            null_values=VALEURS_MANQUANTES,
+            strings_can_be_null=True,
+        ),
+    )
+    # Colonnes libérées au fil de la conversion : pic mémoire proche du DataFrame final
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def _iter_typed_chunks(filepath, schema, sep, chunksize, dtypes):
+    with pd.read_csv(filepath, sep=sep, chunksize=chunksize, dtype=dtypes) as reader:
+        for chunk in reader:
+            yield parse_dates(chunk, schema)
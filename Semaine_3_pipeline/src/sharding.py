@@ -0,0 +1,81 @@
+"""
+EXÉCUTION PARALLÈLE PAR PARTITIONS CLIENTS
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Partition des transactions par empreinte du Client_ID et
+              traitement de chaque partition (nettoyage, enrichissement,
+              règles) dans un processus de travail. Toutes les transactions
+              d'un client sont dans la même partition : les règles par client
+              (risque, PEP, structuring) donnent le même résultat qu'en série.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+from data_processor import DataProcessor
+from rules_engine import RulesEngine
+
+logger = logging.getLogger(__name__)
+
+# Clé fixe : une même transaction va toujours dans la même partition
+CLE_PARTITION = "bnp-partition-cl"
+
+# État propre à chaque processus de travail (initialisé une fois par processus)
+_WORKER = {}
+
+
+def shard_ids(client_ids, nb_shards):
+    """
+    Numéro de partition de chaque transaction (empreinte du Client_ID modulo N).
+
+    Args:
+        client_ids (Series): Client_ID des transactions
+        nb_shards (int): Nombre de partitions
+
+    Returns:
+        ndarray: Numéro de partition (0 à nb_shards - 1)
+    """
+    empreintes = pd.util.hash_pandas_object(
+        pd.Series(client_ids), index=False, hash_key=CLE_PARTITION
+    ).to_numpy()
+    return (empreintes % np.uint64(nb_shards)).astype(np.int64)
+
+
+def init_worker(config_path, index_dir, clients_df, client_state=None, in_place=False):
+    """
+    Initialise un processus de travail : moteur de règles et index clients.
+
+    L'index des listes noires est déjà persisté par le processus principal,
+    chaque processus le charge en mémoire mappée. Avec `in_place`, chaque
+    partition reçue est enrichie et scorée sans copie.
+    """
+    logging.getLogger().setLevel(logging.WARNING)
+    processor = DataProcessor(in_place=in_place)
+    processor.clients_df = clients_df
+    processor.build_client_index()
+    _WORKER['processor'] = processor
+    _WORKER['engine'] = RulesEngine(config_path, index_dir=index_dir)
+    _WORKER['client_state'] = client_state
+    _WORKER['in_place'] = in_place
+
+
+def process_shard(shard):
+    """
+    Nettoie, enrichit et score une partition de transactions dédoublonnées.
+
+    Args:
+        shard (DataFrame): Transactions de la partition (index d'origine conservé)
+
+    Returns:
+        tuple: (partition scorée, transactions liées à un client, temps par règle)
+    """
+    processor = _WORKER['processor']
+    engine = _WORKER['engine']
+
+    DataProcessor._convert_types(shard)
+    shard, nb_lies = processor.enrich_chunk(shard)
+    shard = engine.apply_all_rules(shard, client_index=processor.client_index,
+                                   client_state=_WORKER['client_state'], verbose=False,
+                                   inplace=_WORKER['in_place'])
+    return shard, nb_lies, engine.rule_timings
@@ -0,0 +1,125 @@
+"""
+CONTRÔLE DU DÉMARRAGE À FROID
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Mesure dans des interpréteurs neufs le coût de démarrage du
+              pipeline : lancement de Python, import de pipeline.py détaillé
+              par bibliothèque (relevé `python -X importtime`) et délai
+              jusqu'à la première transaction lue. L'import est comparé au
+              budget fixé pour l'hôte Blue Prism (--self-test-startup).
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Budget de l'import de pipeline.py (médiane, en millisecondes)
+BUDGET_IMPORT_MS = 1000
+NB_MESURES = 3
+# Bibliothèques détaillées dans le relevé (imports directs ou indirects)
+BIBLIOTHEQUES = ('pandas', 'numpy', 'pyarrow', 'openpyxl')
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _modules_projet():
+    return {os.path.splitext(nom)[0] for nom in os.listdir(SRC_DIR) if nom.endswith('.py')}
+
+
+def _lancer(code, *options):
+    """Exécute `code` dans un interpréteur neuf (répertoire src) ; retourne (durée s, stdout, stderr)."""
+    debut = time.perf_counter()
+    resultat = subprocess.run([sys.executable, *options, '-c', code], cwd=SRC_DIR,
+                              capture_output=True, text=True, check=True)
+    return time.perf_counter() - debut, resultat.stdout, resultat.stderr
+
+
+def analyser_importtime(sortie, racine='pipeline'):
+    """
+    Répartit le temps d'import de `racine` à partir du relevé de `-X importtime`.
+
+    Returns:
+        dict: Durées en ms : 'total', 'pipeline' (code du module), une entrée
+            par import direct groupé (bibliothèque, 'modules du projet',
+            'bibliothèque standard') et 'dont <bibliothèque>' pour les
+            bibliothèques importées indirectement
+    """
+    projet = _modules_projet()
+    repartition = {}
+    for ligne in sortie.splitlines():
+        if not ligne.startswith('import time:') or 'self [us]' in ligne:
+            continue
+        _, propre, cumule, nom = (champ for champ in ligne.replace('import time:', '|', 1).split('|'))
+        niveau = (len(nom) - len(nom.lstrip(' '))) // 2
+        nom = nom.strip()
+        module = nom.split('.')[0]
+        cumule_ms, propre_ms = int(cumule) / 1000, int(propre) / 1000
+
+        if nom == racine and niveau == 0:
+            repartition['total'] = cumule_ms
+            repartition['pipeline'] = propre_ms
+        elif niveau == 1:
+            groupe = (module if module in BIBLIOTHEQUES else
+                      'modules du projet' if module in projet else 'bibliothèque standard')
+            repartition[groupe] = repartition.get(groupe, 0.0) + cumule_ms
+        elif niveau >= 2 and nom in BIBLIOTHEQUES:
+            # Bibliothèque importée par une autre (numpy par pandas...) : déjà comptée dans son groupe
+            repartition[f"dont {nom}"] = cumule_ms
+    return repartition
+
+
+def premiere_ligne(transactions_path):
+    """(import de pipeline, lecture de la première transaction) en secondes, dans un interpréteur neuf."""
+    code = (
+        "import json, time\n"
+        "debut = time.perf_counter()\n"
+        "import pipeline\n"
+        "importe = time.perf_counter()\n"
+        "from data_processor import DataProcessor\n"
+        f"next(DataProcessor().iter_transactions({os.path.abspath(transactions_path)!r}, 1))\n"
+        "print(json.dumps([importe - debut, time.perf_counter() - importe]))\n"
+    )
+    _, sortie, _ = _lancer(code)
+    return json.loads(sortie.strip().splitlines()[-1])
+
+
+def self_test_startup(transactions_path, budget_ms=BUDGET_IMPORT_MS, nb_mesures=NB_MESURES):
+    """
+    Affiche la décomposition du démarrage à froid et la compare au budget d'import.
+
+    Chaque mesure est la médiane de `nb_mesures` interpréteurs neufs.
+
+    Args:
+        transactions_path (str): Fichier de transactions dont la première ligne est lue
+        budget_ms (float): Budget de l'import de pipeline.py en millisecondes
+        nb_mesures (int): Nombre d'interpréteurs lancés par mesure
+
+    Returns:
+        bool: True si l'import tient dans le budget
+    """
+    lancement = statistics.median(_lancer('pass')[0] for _ in range(nb_mesures)) * 1000
+    releves = [analyser_importtime(_lancer('import pipeline', '-X', 'importtime')[2]) for _ in range(nb_mesures)]
+    repartition = {cle: statistics.median(releve.get(cle, 0.0) for releve in releves)
+                   for cle in sorted({cle for releve in releves for cle in releve},
+                                     key=lambda cle: -releves[0].get(cle, 0.0))}
+    mesures = [premiere_ligne(transactions_path) for _ in range(nb_mesures)]
+    import_s = statistics.median(importe for importe, _ in mesures)
+    lecture_s = statistics.median(lecture for _, lecture in mesures)
+
+    print("DEMARRAGE A FROID DU PIPELINE (mediane de "
+          f"{nb_mesures} interpreteurs, {sys.executable})")
+    print(f"   - Lancement de Python           : {lancement:8.1f} ms")
+    print(f"   - Import de pipeline.py         : {repartition.get('total', 0.0):8.1f} ms "
+          f"(budget {budget_ms:.0f} ms, relevé -X importtime)")
+    for cle, duree in repartition.items():
+        if cle != 'total':
+            print(f"       {cle:<28}: {duree:8.1f} ms")
+    print(f"   - Import mesuré sans relevé     : {import_s * 1000:8.1f} ms")
+    print(f"   - Lecture 1re transaction       : {lecture_s * 1000:8.1f} ms ({transactions_path})")
+    print(f"   - Délai jusqu'à la 1re ligne    : {lancement + (import_s + lecture_s) * 1000:8.1f} ms")
+
+    dans_budget = import_s * 1000 <= budget_ms
+    print(f"Budget d'import {'respecte' if dans_budget else 'DEPASSE'}")
+    return dans_budget
@@ -0,0 +1,260 @@
+"""
+DÉTECTION DE STRUCTURING - FENÊTRES GLISSANTES VECTORISÉES
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Détection des montants fractionnés sur N jours par client,
+              en une seule passe triée (aucune boucle Python par groupe),
+              sur un fichier complet ou morceau par morceau.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Valeur entière d'un NaT une fois converti en int64
+NAT_JOUR = np.iinfo(np.int64).min
+
+
+class StructuringDetector:
+    """
+    Détecteur de structuring sur fenêtres glissantes de N jours par client.
+
+    Une transaction est suspecte si son montant est sous le seuil de
+    structuring et si elle appartient à au moins une fenêtre
+    [J - periode_jours + 1, J] du même client contenant au moins
+    `nb_transactions_min` transactions sous le seuil pour un total
+    d'au moins `seuil_total_min`.
+    """
+
+    def __init__(self, seuil, nb_transactions_min=2, periode_jours=1, seuil_total_min=10000):
+        """
+        Initialise le détecteur.
+
+        Args:
+            seuil (float): Montant sous lequel une transaction est candidate
+            nb_transactions_min (int): Nombre minimal de transactions dans la fenêtre
+            periode_jours (int): Taille de la fenêtre glissante en jours
+            seuil_total_min (float): Total minimal des montants dans la fenêtre
+        """
+        if periode_jours < 1:
+            raise ValueError("periode_jours doit être supérieur ou égal à 1")
+
+        self.seuil = seuil
+        self.nb_transactions_min = nb_transactions_min
+        self.periode_jours = periode_jours
+        self.seuil_total_min = seuil_total_min
+
+    @classmethod
+    def from_config(cls, config):
+        """Construit le détecteur depuis la configuration des règles."""
+        params = config.get('parametres_detection', {}).get('structuring', {})
+        return cls(
+            seuil=config['seuils']['structuring'],
+            nb_transactions_min=params.get('nb_transactions_min', 2),
+            periode_jours=params.get('periode_jours', 1),
+            seuil_total_min=params.get('seuil_total_min', 10000)
+        )
+
+    def detect(self, client_codes, jours, montants):
+        """
+        Retourne le masque des transactions suspectes de structuring.
+
+        Les lignes avec un code client négatif (client absent) ou un jour
+        NaT sont ignorées.
+
+        Args:
+            client_codes (ndarray): Codes entiers des clients (ex. pd.factorize)
+            jours (ndarray): Numéro de jour int64 (jours depuis 1970, NaT = NAT_JOUR)
+            montants (ndarray): Montants float64
+
+        Returns:
+            ndarray: Masque booléen aligné sur les lignes en entrée
+        """
+        client_codes = np.asarray(client_codes)
+        jours = np.asarray(jours, dtype=np.int64)
+        montants = np.asarray(montants, dtype=np.float64)
+
+        mask = np.zeros(len(montants), dtype=bool)
+
+        candidats = np.flatnonzero(
+            (montants < self.seuil) & (jours != NAT_JOUR) & (client_codes >= 0)
+        )
+        if len(candidats) < self.nb_transactions_min:
+            return mask
+
+        # 1. Tri par (client, jour) puis agrégation par client-jour
+        ordre = candidats[np.lexsort((jours[candidats], client_codes[candidats]))]
+        c = client_codes[ordre]
+        d = jours[ordre]
+
+        debut_groupe = np.empty(len(ordre), dtype=bool)
+        debut_groupe[0] = True
+        debut_groupe[1:] = (c[1:] != c[:-1]) | (d[1:] != d[:-1])
+        debuts = np.flatnonzero(debut_groupe)
+
+        g_client = c[debuts]
+        g_jour = d[debuts]
+        g_nb = np.diff(np.append(debuts, len(ordre)))
+        g_total = np.add.reduceat(montants[ordre], debuts)
+
+        # 2. Fenêtres glissantes sur les client-jours
+        g_suspect = self._fenetres_suspectes(g_client, g_jour, g_nb, g_total)
+
+        # 3. Retour aux lignes
+        ligne_groupe = np.cumsum(debut_groupe) - 1
+        mask[ordre[g_suspect[ligne_groupe]]] = True
+        return mask
+
+    def _fenetres_suspectes(self, g_client, g_jour, g_nb, g_total):
+        """
+        Marque les client-jours couverts par au moins une fenêtre suspecte.
+
+        Les groupes sont triés par (client, jour). Chaque groupe sert de fin
+        de fenêtre ; le début est retrouvé par recherche dichotomique sur une
+        clé composite (rang client, jour) et les totaux par sommes cumulées.
+        """
+        nb_groupes = len(g_jour)
+
+        rang_client = np.cumsum(np.append(True, g_client[1:] != g_client[:-1])) - 1
+        etendue = int(g_jour.max() - g_jour.min()) + self.periode_jours
+        cle = rang_client * etendue + (g_jour - g_jour.min())
+
+        fin = np.arange(nb_groupes)
+        debut = np.searchsorted(cle, cle - (self.periode_jours - 1), side='left')
+
+        nb_cumul = np.concatenate(([0], np.cumsum(g_nb)))
+        total_cumul = np.concatenate(([0.0], np.cumsum(g_total)))
+        nb_fenetre = nb_cumul[fin + 1] - nb_cumul[debut]
+        total_fenetre = total_cumul[fin + 1] - total_cumul[debut]
+
+        suspecte = (nb_fenetre >= self.nb_transactions_min) & (total_fenetre >= self.seuil_total_min)
+
+        # Union des intervalles [debut, fin] des fenêtres suspectes
+        delta = (np.bincount(debut[suspecte], minlength=nb_groupes + 1)
+                 - np.bincount(fin[suspecte] + 1, minlength=nb_groupes + 1))
+        return np.cumsum(delta)[:nb_groupes] > 0
+
+
+class StructuringState:
+    """
+    État du détecteur de structuring partagé entre les morceaux d'un fichier.
+
+    Première passe : `update` agrège chaque morceau par (client, jour) en
+    ne gardant que le nombre et le total des transactions sous le seuil.
+    `finalize` applique ensuite les fenêtres glissantes aux agrégats de
+    tout le fichier. Seconde passe : `mask` donne pour chaque morceau le
+    même masque que `StructuringDetector.detect` sur le fichier complet.
+    La mémoire est proportionnelle au nombre de couples (client, jour),
+    pas au nombre de transactions. `seed` ajoute les agrégats persistés
+    des jours précédents (traitement journalier incrémental).
+    """
+
+    def __init__(self, detector):
+        self.detector = detector
+        self.clients = pd.Index([], dtype=object)
+        self._morceaux = []
+        self._taille_compactee = 0
+        self._suspects = None
+
+    def _codes(self, client_ids, ajouter=False):
+        """Code stable de chaque client (-1 si manquant ou inconnu)."""
+        client_ids = pd.Series(client_ids)
+        codes = self.clients.get_indexer(client_ids)
+        if ajouter:
+            nouveaux = client_ids[(codes == -1) & client_ids.notna().to_numpy()].unique()
+            if len(nouveaux):
+                nouveaux = pd.Index(nouveaux, dtype=object)
+                # Pas de concaténation avec l'index vide (dtype du résultat déprécié dans pandas)
+                self.clients = self.clients.append(nouveaux) if len(self.clients) else nouveaux
+                codes = self.clients.get_indexer(client_ids)
+        return codes
+
+    def _candidats(self, codes, jours, montants):
+        return (montants < self.detector.seuil) & (jours != NAT_JOUR) & (codes >= 0)
+
+    def update(self, client_ids, jours, montants):
+        """Agrège un morceau de transactions (première passe)."""
+        if self._suspects is not None:
+            raise RuntimeError("L'état de structuring est déjà finalisé")
+
+        codes = self._codes(client_ids, ajouter=True)
+        jours = np.asarray(jours, dtype=np.int64)
+        montants = np.asarray(montants, dtype=np.float64)
+
+        candidats = self._candidats(codes, jours, montants)
+        self._morceaux.append(self._agreger(
+            codes[candidats], jours[candidats], np.ones(int(candidats.sum()), dtype=np.int64), montants[candidats]
+        ))
+
+        # Compactage dès que les agrégats partiels doublent de volume
+        en_attente = sum(len(morceau[0]) for morceau in self._morceaux)
+        if en_attente > 2 * self._taille_compactee + 1_000_000:
+            self._compacter()
+
+    def seed(self, client_ids, jours, nb, totaux):
+        """Ajoute des agrégats (client, jour) déjà calculés, ex. l'historique des jours précédents."""
+        if self._suspects is not None:
+            raise RuntimeError("L'état de structuring est déjà finalisé")
+        codes = self._codes(client_ids, ajouter=True)
+        self._morceaux.append(self._agreger(
+            codes, np.asarray(jours, dtype=np.int64),
+            np.asarray(nb, dtype=np.int64), np.asarray(totaux, dtype=np.float64)
+        ))
+
+    @staticmethod
+    def _agreger(codes, jours, nb, totaux):
+        """Somme `nb` et `totaux` par (code, jour), résultat trié par (code, jour)."""
+        if len(codes) == 0:
+            return codes, jours, nb, totaux
+        ordre = np.lexsort((jours, codes))
+        codes, jours = codes[ordre], jours[ordre]
+        debut = np.empty(len(ordre), dtype=bool)
+        debut[0] = True
+        debut[1:] = (codes[1:] != codes[:-1]) | (jours[1:] != jours[:-1])
+        debuts = np.flatnonzero(debut)
+        return (codes[debuts], jours[debuts],
+                np.add.reduceat(nb[ordre], debuts), np.add.reduceat(totaux[ordre], debuts))
+
+    def _compacter(self):
+        parties = list(zip(*self._morceaux))
+        agregat = self._agreger(*(np.concatenate(partie) for partie in parties))
+        self._morceaux = [agregat]
+        self._taille_compactee = len(agregat[0])
+
+    def finalize(self):
+        """Applique les fenêtres glissantes aux agrégats (fin de la première passe)."""
+        if self._morceaux:
+            self._compacter()
+            g_client, g_jour, g_nb, g_total = self._morceaux[0]
+        else:
+            g_client = g_jour = g_nb = np.empty(0, dtype=np.int64)
+            g_total = np.empty(0)
+
+        if len(g_client):
+            suspect = self.detector._fenetres_suspectes(g_client, g_jour, g_nb, g_total)
+            self._jour_min = int(g_jour.min())
+            self._etendue = int(g_jour.max()) - self._jour_min + 1
+            self._suspects = g_client[suspect] * self._etendue + (g_jour[suspect] - self._jour_min)
+        else:
+            self._suspects = np.empty(0, dtype=np.int64)
+        self._morceaux = []
+
+    def mask(self, client_ids, jours, montants):
+        """Masque des transactions suspectes d'un morceau (seconde passe)."""
+        if self._suspects is None:
+            raise RuntimeError("L'état de structuring doit être finalisé avant le contrôle")
+
+        codes = self._codes(client_ids)
+        jours = np.asarray(jours, dtype=np.int64)
+        montants = np.asarray(montants, dtype=np.float64)
+
+        mask = np.zeros(len(montants), dtype=bool)
+        if len(self._suspects) == 0:
+            return mask
+
+        candidats = np.flatnonzero(
+            self._candidats(codes, jours, montants)
+            & (jours >= self._jour_min) & (jours < self._jour_min + self._etendue)
+        )
+        cles = codes[candidats] * self._etendue + (jours[candidats] - self._jour_min)
+        positions = np.minimum(np.searchsorted(self._suspects, cles), len(self._suspects) - 1)
+        mask[candidats[self._suspects[positions] == cles]] = True
+        return mask
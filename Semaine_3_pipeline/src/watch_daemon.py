@@ -0,0 +1,278 @@
+"""
+MODE DÉMON - SURVEILLANCE DU RÉPERTOIRE D'ENTRÉE
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Processus résident qui garde chargés l'interpréteur, pandas et
+              NumPy, les règles compilées, le référentiel clients indexé, les
+              taux de change et la liste de sanctions, puis traite chaque
+              fichier de transactions déposé dans le répertoire surveillé.
+              La latence par fichier se réduit au traitement lui-même.
+
+Protocole avec le robot :
+    - le fichier est déposé dans le répertoire surveillé (de préférence
+      écrit sous un autre nom puis renommé) ; il est traité dès que sa
+      taille et sa date de modification sont stables entre deux passages ;
+    - les sorties sont écrites dans <sortie>/<nom du fichier>/, puis
+      statut.json (code_retour 0 = succès, 1 = échec) en dernier ;
+    - le fichier d'entrée est déplacé dans traites/ ou erreurs/ ; si le
+      déplacement échoue, statut.json l'indique (fichier_archive null,
+      erreur_archivage) et le fichier n'est plus traité tant qu'il n'est
+      pas modifié ;
+    - daemon_status.json (<sortie>/) donne l'état du démon : en_attente,
+      en_cours, arrete ou erreur ;
+    - un fichier ARRET déposé dans le répertoire surveillé (ou SIGTERM,
+      Ctrl+C) arrête le démon après le fichier en cours.
+"""
+
+import json
+import logging
+import os
+import signal
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONS_ENTREE = ('.csv', '.xlsx')
+FICHIER_ETAT = 'daemon_status.json'
+FICHIER_STATUT = 'statut.json'
+FICHIER_ARRET = 'ARRET'
+REPERTOIRE_TRAITES = 'traites'
+REPERTOIRE_ERREURS = 'erreurs'
+# Derniers fichiers repris dans l'état du démon
+NB_DERNIERS_FICHIERS = 20
+
+
+def ecrire_json(chemin, contenu):
+    """Écrit un JSON de façon atomique : le robot ne lit jamais un fichier partiel."""
+    temporaire = f"{chemin}.tmp"
+    with open(temporaire, 'w', encoding='utf-8') as f:
+        json.dump(contenu, f, ensure_ascii=False, indent=2)
+    os.replace(temporaire, chemin)
+
+
+def signature(chemin):
+    """(taille, date de modification en ns) d'un fichier, None s'il est absent."""
+    try:
+        stat = os.stat(chemin)
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+class WatchFolderDaemon:
+    """
+    Traite les fichiers déposés dans un répertoire avec des composants gardés en mémoire.
+
+    Les fichiers sont traités un par un, dans l'ordre de dépôt. Les
+    composants résidents sont rechargés si l'un de leurs fichiers
+    (référentiel clients, règles, taux, sanctions) est modifié.
+    """
+
+    def __init__(self, repertoire_entree, creer_pipeline, output_dir='../output', intervalle=1.0):
+        """
+        Args:
+            repertoire_entree (str): Répertoire surveillé
+            creer_pipeline (callable): (chemin des transactions ou None, répertoire de sortie)
+                -> CompliancePipeline configuré
+            output_dir (str): Répertoire des sorties (un sous-répertoire par fichier) et de l'état
+            intervalle (float): Délai en secondes entre deux passages sans fichier prêt
+        """
+        self.repertoire_entree = repertoire_entree
+        self.creer_pipeline = creer_pipeline
+        self.output_dir = output_dir
+        self.intervalle = intervalle
+        self.ressources = None
+        self.signatures_reference = {}
+        # Fichiers vus au passage précédent : nom -> signature (traités si inchangée)
+        self.candidats = {}
+        # Fichiers traités mais non archivés : nom -> signature (ignorés tant qu'inchangée)
+        self.non_archives = {}
+        self.arret_demande = False
+        self.etat = {
+            'etat': 'demarrage',
+            'pid': os.getpid(),
+            'demarre_le': datetime.now().isoformat(),
+            'repertoire_surveille': os.path.abspath(repertoire_entree),
+            'fichier_en_cours': None,
+            'fichiers_traites': 0,
+            'fichiers_en_echec': 0,
+            'derniers_fichiers': [],
+        }
+        for nom in (REPERTOIRE_TRAITES, REPERTOIRE_ERREURS):
+            os.makedirs(os.path.join(repertoire_entree, nom), exist_ok=True)
+        os.makedirs(output_dir, exist_ok=True)
+
+    def _ecrire_etat(self, etat, **champs):
+        self.etat.update(champs, etat=etat, mis_a_jour_le=datetime.now().isoformat())
+        ecrire_json(os.path.join(self.output_dir, FICHIER_ETAT), self.etat)
+
+    def warm(self):
+        """Charge les composants résidents (règles, clients et index, taux, sanctions)."""
+        debut = time.perf_counter()
+        pipeline = self.creer_pipeline(None, self.output_dir)
+        pipeline.load_config()
+        if not pipeline.load_fx_rates():
+            raise RuntimeError("Table des taux de change illisible")
+        pipeline.data_processor.load_clients(pipeline.clients_path)
+        pipeline.data_processor.build_client_index()
+        pipeline.load_name_screener()
+
+        self.ressources = pipeline.resident_resources()
+        self.signatures_reference = {chemin: signature(chemin) for chemin in pipeline.reference_files()}
+        self.etat['ressources_chargees_le'] = datetime.now().isoformat()
+        logger.info(f"Composants residents charges en {time.perf_counter() - debut:.3f}s")
+
+    def _reference_modifiee(self):
+        return any(signature(chemin) != sig for chemin, sig in self.signatures_reference.items())
+
+    def poll(self):
+        """
+        Fichiers prêts à traiter, par date de modification croissante.
+
+        Un fichier est prêt lorsque sa signature n'a pas changé depuis le
+        passage précédent (copie terminée). Les fichiers de référence placés
+        dans le répertoire surveillé sont ignorés.
+        """
+        reference = {os.path.abspath(chemin) for chemin in self.signatures_reference}
+        vus = {}
+        with os.scandir(self.repertoire_entree) as entrees:
+            for entree in entrees:
+                if (not entree.is_file() or entree.name.startswith(('.', '~$'))
+                        or not entree.name.lower().endswith(EXTENSIONS_ENTREE)
+                        or os.path.abspath(entree.path) in reference):
+                    continue
+                stat = entree.stat()
+                vus[entree.name] = (stat.st_size, stat.st_mtime_ns)
+        self.non_archives = {nom: sig for nom, sig in self.non_archives.items() if nom in vus and vus[nom] == sig}
+        for nom in self.non_archives:
+            del vus[nom]
+        prets = [nom for nom, sig in vus.items() if self.candidats.get(nom) == sig]
+        self.candidats = {nom: sig for nom, sig in vus.items() if nom not in prets}
+        return sorted(prets, key=lambda nom: vus[nom][1])
+
+    def process(self, nom):
+        """
+        Traite un fichier déposé avec les composants résidents et écrit son statut.
+
+        Returns:
+            bool: True si le pipeline a réussi
+        """
+        chemin = os.path.join(self.repertoire_entree, nom)
+        sortie = os.path.join(self.output_dir, os.path.splitext(nom)[0])
+        os.makedirs(sortie, exist_ok=True)
+        chemin_statut = os.path.join(sortie, FICHIER_STATUT)
+        # Statut d'un dépôt précédent du même nom : supprimé avant le traitement
+        if os.path.exists(chemin_statut):
+            os.remove(chemin_statut)
+
+        logger.info(f"Fichier depose : {nom}")
+        self._ecrire_etat('en_cours', fichier_en_cours=nom)
+        debut, debut_iso = time.perf_counter(), datetime.now().isoformat()
+        pipeline = None
+        try:
+            pipeline = self.creer_pipeline(chemin, sortie)
+            pipeline.use_resources(self.ressources)
+            succes = pipeline.run_pipeline()
+        except Exception as e:
+            logger.error(f"Erreur lors du traitement de {nom} : {str(e)}")
+            succes = False
+        duree = time.perf_counter() - debut
+
+        archive = os.path.join(self.repertoire_entree, REPERTOIRE_TRAITES if succes else REPERTOIRE_ERREURS,
+                               f"{datetime.now():%Y%m%d_%H%M%S}_{nom}")
+        erreur_archivage = None
+        try:
+            os.replace(chemin, archive)
+        except OSError as e:
+            # Fichier laissé en place : ignoré par poll() tant qu'il n'est pas modifié
+            logger.error(f"Echec de l'archivage de {nom} : {str(e)}")
+            erreur_archivage = str(e)
+            archive = None
+            self.non_archives[nom] = signature(chemin)
+
+        statut = {
+            'fichier': nom,
+            'statut': 'succes' if succes else 'echec',
+            'code_retour': 0 if succes else 1,
+            'debut': debut_iso,
+            'fin': datetime.now().isoformat(),
+            'duree_s': round(duree, 3),
+            'repertoire_sortie': os.path.abspath(sortie),
+            'fichier_archive': os.path.abspath(archive) if archive is not None else None,
+            'erreur_archivage': erreur_archivage,
+            'fichiers_generes': dict(getattr(pipeline, 'output_files', {})),
+        }
+        ecrire_json(chemin_statut, statut)
+
+        self.etat['fichiers_traites' if succes else 'fichiers_en_echec'] += 1
+        self.etat['derniers_fichiers'] = ([{cle: statut[cle] for cle in ('fichier', 'statut', 'fin', 'duree_s')}]
+                                          + self.etat['derniers_fichiers'])[:NB_DERNIERS_FICHIERS]
+        logger.info(f"Fichier {nom} traite en {duree:.3f}s ({statut['statut']})")
+        return succes
+
+    def _demander_arret(self, signum, frame):
+        logger.info(f"Signal {signum} recu : arret apres le fichier en cours")
+        self.arret_demande = True
+
+    def run(self, max_fichiers=None):
+        """
+        Boucle principale : surveille le répertoire jusqu'à la demande d'arrêt.
+
+        Args:
+            max_fichiers (int): Arrêt après ce nombre de fichiers traités (None = sans limite)
+
+        Returns:
+            bool: False si les composants résidents n'ont pas pu être chargés au démarrage
+        """
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, self._demander_arret)
+
+        try:
+            self.warm()
+        except Exception as e:
+            logger.error(f"Echec du chargement des composants residents : {str(e)}")
+            self._ecrire_etat('erreur', erreur=str(e))
+            return False
+
+        logger.info(f"Demon en attente de fichiers dans {self.etat['repertoire_surveille']}")
+        self._ecrire_etat('en_attente')
+        nb_fichiers = 0
+        chemin_arret = os.path.join(self.repertoire_entree, FICHIER_ARRET)
+        while not self.arret_demande:
+            if os.path.exists(chemin_arret):
+                os.remove(chemin_arret)
+                logger.info("Fichier ARRET recu")
+                break
+
+            if self._reference_modifiee():
+                logger.info("Fichiers de reference modifies : rechargement des composants residents")
+                try:
+                    self.warm()
+                except Exception as e:
+                    # Composants précédents conservés ; nouvelle tentative à la prochaine modification
+                    logger.error(f"Echec du rechargement, composants precedents conserves : {str(e)}")
+                    self.signatures_reference = {chemin: signature(chemin) for chemin in self.signatures_reference}
+
+            prets = self.poll()
+            for nom in prets:
+                try:
+                    self.process(nom)
+                except Exception as e:
+                    # Un fichier en erreur (statut, sorties...) n'arrête pas le démon
+                    logger.error(f"Erreur inattendue sur le fichier {nom} : {str(e)}")
+                    self.etat['fichiers_en_echec'] += 1
+                    self.non_archives.setdefault(nom, signature(os.path.join(self.repertoire_entree, nom)))
+                nb_fichiers += 1
+                self._ecrire_etat('en_attente', fichier_en_cours=None)
+                if self.arret_demande or (max_fichiers and nb_fichiers >= max_fichiers):
+                    self.arret_demande = True
+                    break
+            if not prets and not self.arret_demande:
+                time.sleep(self.intervalle)
+
+        self._ecrire_etat('arrete', fichier_en_cours=None)
+        logger.info(f"Demon arrete : {self.etat['fichiers_traites']} fichiers traites, "
+                    f"{self.etat['fichiers_en_echec']} en echec")
+        return True
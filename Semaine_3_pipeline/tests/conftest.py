@@ -0,0 +1,25 @@
+"""
+TESTS - OUTILS COMMUNS
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Accès aux modules du pipeline et répertoire de travail
+              temporaire garni de la configuration et des données d'exemple.
+"""
+
+import os
+import shutil
+import sys
+
+import pytest
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+
+@pytest.fixture
+def donnees_exemple(tmp_path, monkeypatch):
+    """Configuration, clients et transactions d'exemple copiés dans un répertoire de travail temporaire."""
+    shutil.copytree(os.path.join(SRC, 'config'), tmp_path / 'config')
+    shutil.copytree(os.path.join(SRC, 'data'), tmp_path / 'data')
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,86 @@
+"""
+TESTS - POINTS DE REPRISE
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Une exécution interrompue après une étape sauvegardée puis
+              relancée avec resume produit les mêmes fichiers qu'une
+              exécution complète, et l'état client n'intègre le fichier
+              qu'une fois. Des entrées modifiées depuis font ignorer les
+              points de reprise.
+"""
+
+import filecmp
+import logging
+import os
+
+import numpy as np
+import pytest
+
+from client_state import ClientStateStore
+from pipeline import CompliancePipeline
+
+FICHIERS_COMPARES = ['transactions_enrichies.csv', 'alertes_compliance.csv', 'rapport_detaille.csv',
+                     'correspondances_noms.csv', 'quarantine.csv']
+# Étape qui échoue -> dernière étape sauvegardée
+ECHECS = {'screen_names': 'score', 'apply_compliance_rules': 'enrichi'}
+
+
+def _pipeline(sortie, etat, resume=False, reprise=True):
+    return CompliancePipeline('data/transactions.csv', 'data/clients.csv', output_dir=sortie,
+                              state_path=etat, checkpoint_dir='reprise' if reprise else None, resume=resume)
+
+
+def _interrompre(monkeypatch, etape, sortie, etat):
+    """Exécution qui échoue à `etape`, après la sauvegarde des étapes précédentes."""
+    with monkeypatch.context() as m:
+        m.setattr(CompliancePipeline, etape, lambda self, *args: False)
+        assert not _pipeline(sortie, etat).run_pipeline()
+    assert not os.path.exists(etat)
+
+
+@pytest.mark.parametrize('etape', list(ECHECS))
+def test_reprise_identique_a_une_execution_complete(donnees_exemple, monkeypatch, caplog, etape):
+    caplog.set_level(logging.INFO)
+    assert _pipeline('complet', 'etat/complet.npz', reprise=False).run_pipeline()
+
+    _interrompre(monkeypatch, etape, 'reprise_sortie', 'etat/reprise.npz')
+    assert os.path.exists(os.path.join('reprise', f"{ECHECS[etape]}.transactions.arrow"))
+
+    with monkeypatch.context() as m:
+        if ECHECS[etape] == 'score':
+            # Règles non réappliquées à la reprise
+            m.setattr(CompliancePipeline, 'apply_compliance_rules',
+                      lambda self: pytest.fail("règles réappliquées"))
+        assert _pipeline('reprise_sortie', 'etat/reprise.npz', resume=True).run_pipeline()
+    assert f"apres l'etape '{ECHECS[etape]}'" in caplog.text
+
+    _, differents, erreurs = filecmp.cmpfiles('complet', 'reprise_sortie', FICHIERS_COMPARES, shallow=False)
+    assert differents == [] and erreurs == []
+    # Points de reprise supprimés après l'exécution réussie
+    assert not os.path.exists('reprise')
+
+    # État client : fichier intégré une seule fois
+    complet, repris = ClientStateStore.load('etat/complet.npz'), ClientStateStore.load('etat/reprise.npz')
+    assert list(repris.index) == list(complet.index)
+    np.testing.assert_array_equal(repris.nb, complet.nb)
+    np.testing.assert_allclose(repris.moyenne, complet.moyenne)
+    assert repris.dernier_jour_traite == complet.dernier_jour_traite
+
+
+def test_entrees_modifiees_points_de_reprise_ignores(donnees_exemple, monkeypatch, caplog):
+    _interrompre(monkeypatch, 'screen_names', 'sortie', 'etat/clients.npz')
+
+    # Dernière transaction retirée du fichier d'entrée
+    lignes = (donnees_exemple / 'data' / 'transactions.csv').read_text(encoding='utf-8').splitlines()
+    retiree = lignes[-1].split(';')[0]
+    (donnees_exemple / 'data' / 'transactions.csv').write_text('\n'.join(lignes[:-1]) + '\n', encoding='utf-8')
+
+    with monkeypatch.context() as m:
+        m.setattr(CompliancePipeline, 'restore_checkpoint', lambda self, etape: pytest.fail("reprise utilisée"))
+        assert _pipeline('sortie', 'etat/clients.npz', resume=True).run_pipeline()
+    assert "entrees modifiees depuis" in caplog.text
+
+    assert _pipeline('complet', 'etat/complet.npz', reprise=False).run_pipeline()
+    _, differents, erreurs = filecmp.cmpfiles('complet', 'sortie', FICHIERS_COMPARES, shallow=False)
+    assert differents == [] and erreurs == []
+    with open('sortie/transactions_enrichies.csv', encoding='utf-8') as f:
+        assert retiree not in f.read()
@@ -0,0 +1,41 @@
+"""
+TESTS - ÉTAT CLIENT PERSISTÉ
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Un fichier relancé (jours déjà intégrés à l'état client) fait
+              échouer l'exécution sans modifier l'état persisté ; la
+              fusion n'est faite qu'avec state_replay (transactions tardives).
+"""
+
+import numpy as np
+import pytest
+
+from client_state import ClientStateStore
+from pipeline import CompliancePipeline
+
+
+def _executer(chunk_size=None, state_replay=False):
+    pipeline = CompliancePipeline('data/transactions.csv', 'data/clients.csv', output_dir='output',
+                                  chunk_size=chunk_size, state_path='etat/clients.npz',
+                                  state_replay=state_replay)
+    return pipeline.run_pipeline()
+
+
+@pytest.mark.parametrize('chunk_size', [None, 20])
+def test_fichier_relance_refuse(donnees_exemple, chunk_size, caplog):
+    assert _executer(chunk_size)
+    apres_premiere = ClientStateStore.load('etat/clients.npz')
+
+    assert not _executer(chunk_size)
+    assert "jours deja integres a l'etat client" in caplog.text
+    etat = ClientStateStore.load('etat/clients.npz')
+    assert list(etat.index) == list(apres_premiere.index)
+    np.testing.assert_array_equal(etat.nb, apres_premiere.nb)
+    np.testing.assert_array_equal(etat.moyenne, apres_premiere.moyenne)
+
+
+def test_fichier_relance_fusionne_avec_state_replay(donnees_exemple):
+    assert _executer()
+    nb_premiere = ClientStateStore.load('etat/clients.npz').nb.sum()
+
+    assert _executer(state_replay=True)
+    assert ClientStateStore.load('etat/clients.npz').nb.sum() == 2 * nb_premiere
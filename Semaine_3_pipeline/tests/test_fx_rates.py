@@ -0,0 +1,96 @@
+"""
+TESTS - TAUX DE CHANGE ABSENTS
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Une transaction dans une devise acceptée mais absente de la
+              table de taux reste soumise aux règles qui ne dépendent pas du
+              montant (pays sous sanctions...) : Montant_EUR manquant, ligne
+              signalée dans le rapport de quarantaine et les statistiques.
+              Les taux anciens sont comptés dans les statistiques, et
+              l'exécution échoue au-delà de l'âge maximal demandé.
+"""
+
+import json
+import os
+import shutil
+import sys
+
+import pandas as pd
+import pytest
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC)
+
+from pipeline import CompliancePipeline  # noqa: E402
+
+ENTETE = ("Transaction_ID;Date;Heure;Client_ID;Type_Operation;Montant;Devise;Bénéficiaire;"
+          "Pays_Bénéficiaire;Canal;Statut_Compliance;Priorité;Pattern;Commentaire")
+TRANSACTIONS = [
+    # JPY : devise acceptée, absente de config/taux_change.csv ; bénéficiaire sous sanctions
+    "TXN-1;2024-01-16;11:18;CLT-003;Virement;50000000;JPY;IR5566778899;IR;Internet;À traiter;Normale;NORMAL;x",
+    "TXN-2;2024-01-16;11:20;CLT-003;Virement;20000;USD;FR1234567890;FR;Internet;À traiter;Normale;NORMAL;x",
+    # Devise refusée : rejetée du traitement
+    "TXN-3;2024-01-16;11:22;CLT-003;Virement;20000;XXX;FR1234567890;FR;Internet;À traiter;Normale;NORMAL;x",
+]
+
+
+def _ecrire_transactions(repertoire, lignes):
+    (repertoire / 'data' / 'transactions.csv').write_text('\n'.join([ENTETE] + lignes) + '\n', encoding='utf-8')
+
+
+@pytest.fixture
+def repertoire(tmp_path, monkeypatch):
+    """Configuration et données d'exemple copiées dans un répertoire de travail temporaire."""
+    shutil.copytree(os.path.join(SRC, 'config'), tmp_path / 'config')
+    os.makedirs(tmp_path / 'data')
+    shutil.copy(os.path.join(SRC, 'data', 'clients.csv'), tmp_path / 'data' / 'clients.csv')
+    _ecrire_transactions(tmp_path, TRANSACTIONS)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.mark.parametrize('chunk_size', [None, 2])
+def test_taux_absent_garde_la_ligne_dans_le_filtrage(repertoire, chunk_size):
+    pipeline = CompliancePipeline('data/transactions.csv', 'data/clients.csv', output_dir='output',
+                                  chunk_size=chunk_size)
+    assert pipeline.run_pipeline()
+
+    alertes = pd.read_csv('output/alertes_compliance.csv', sep=';').set_index('Transaction_ID')
+    assert 'PAYS_SANCTIONNE' in alertes.loc['TXN-1', 'Alertes']
+    # Montant non converti : règles de montant non appliquées
+    assert pd.isna(alertes.loc['TXN-1', 'Montant_EUR'])
+    assert 'SEUIL_REGLEMENTAIRE' not in alertes.loc['TXN-1', 'Alertes']
+    assert 'SEUIL_REGLEMENTAIRE' in alertes.loc['TXN-2', 'Alertes']
+
+    quarantaine = pd.read_csv('output/quarantine.csv', sep=';').set_index('Transaction_ID')
+    assert quarantaine.loc['TXN-1', 'Statut_Quarantaine'] == 'SIGNALEE'
+    assert quarantaine.loc['TXN-1', 'Motifs_Rejet'] == 'TAUX_CHANGE_ABSENT;'
+    assert quarantaine.loc['TXN-3', 'Statut_Quarantaine'] == 'REJETEE'
+
+    enrichies = pd.read_csv('output/transactions_enrichies.csv', sep=';')
+    assert sorted(enrichies['Transaction_ID']) == ['TXN-1', 'TXN-2']
+
+    with open('output/statistiques_pipeline.json', encoding='utf-8') as f:
+        validation = json.load(f)['statistiques']['validation']
+    assert validation['lignes_controlees'] == 3
+    assert validation['lignes_en_quarantaine'] == 1
+    assert validation['lignes_signalees'] == 1
+    # Échecs par règle : la ligne rejetée (devise XXX) n'a pas de taux non plus
+    assert validation['signalements_par_regle'] == {'TAUX_CHANGE_ABSENT': 2}
+    assert validation['rejets_par_regle']['DEVISE_INCONNUE'] == 1
+
+
+@pytest.mark.parametrize('chunk_size', [None, 2])
+def test_taux_ancien_compte_puis_bloquant(repertoire, chunk_size):
+    # Dernier taux USD publié le 2024-12-02 : 90 jours d'ancienneté au 2025-03-02
+    _ecrire_transactions(repertoire, [ligne.replace('2024-01-16', '2025-03-02') for ligne in TRANSACTIONS])
+
+    pipeline = CompliancePipeline('data/transactions.csv', 'data/clients.csv', output_dir='output',
+                                  chunk_size=chunk_size)
+    assert pipeline.run_pipeline()
+    with open('output/statistiques_pipeline.json', encoding='utf-8') as f:
+        validation = json.load(f)['statistiques']['validation']
+    assert validation['taux_change_anciens'] == 1
+
+    pipeline = CompliancePipeline('data/transactions.csv', 'data/clients.csv', output_dir='output',
+                                  chunk_size=chunk_size, fx_max_age_days=60)
+    assert not pipeline.run_pipeline()
@@ -0,0 +1,122 @@
+"""
+TESTS - HISTORIQUE DES TRANSACTION_ID
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Les identifiants d'une exécution sauvegardée sont reconnus par
+              les suivantes, y compris après fusion des séries ; une
+              exécution interrompue avant le remplacement du manifeste
+              n'enregistre aucun identifiant.
+"""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+import id_store
+from id_store import MANIFESTE_HISTORIQUE, TransactionIdHistory
+
+
+def _ids(debut, fin):
+    return [f"TXN-{i:06d}" for i in range(debut, fin)]
+
+
+def _executer(repertoire, ids):
+    """Exécution réussie : ouverture de l'historique, préparation puis sauvegarde."""
+    historique = TransactionIdHistory(repertoire)
+    historique.stage(ids)
+    historique.save()
+    return historique
+
+
+def _fichiers_series(repertoire):
+    return sorted(nom for nom in os.listdir(repertoire) if nom.endswith(('_h1.npy', '_h2.npy')))
+
+
+def test_rejeu_rejete_et_nouveaux_acceptes(tmp_path):
+    repertoire = str(tmp_path / 'historique')
+    _executer(repertoire, _ids(0, 100))
+
+    historique = TransactionIdHistory(repertoire)
+    assert len(historique) == 100
+    masque = historique.contains(_ids(50, 150))
+    np.testing.assert_array_equal(masque, np.arange(50, 150) < 100)
+
+
+def test_identifiants_conserves_apres_fusion(tmp_path):
+    repertoire = str(tmp_path / 'historique')
+    # Séries de même taille : fusionnées à chaque exécution
+    for numero in range(5):
+        historique = _executer(repertoire, _ids(numero * 100, (numero + 1) * 100))
+    assert len(historique.series) < 5
+
+    historique = TransactionIdHistory(repertoire)
+    assert len(historique) == 500
+    assert historique.contains(_ids(0, 500)).all()
+    assert not historique.contains(_ids(500, 600)).any()
+
+    # Séries fusionnées supprimées : le répertoire ne contient que celles du manifeste
+    with open(os.path.join(repertoire, MANIFESTE_HISTORIQUE), encoding='utf-8') as f:
+        series = json.load(f)['series']
+    assert _fichiers_series(repertoire) == sorted(f"{nom}_{h}.npy" for nom in series for h in ('h1', 'h2'))
+
+
+def test_fusion_bornee(tmp_path, monkeypatch):
+    monkeypatch.setattr(id_store, 'TAILLE_MAX_FUSION', 250)
+    repertoire = str(tmp_path / 'historique')
+    for numero in range(6):
+        _executer(repertoire, _ids(numero * 100, (numero + 1) * 100))
+
+    historique = TransactionIdHistory(repertoire)
+    assert max(len(h1) for _, h1, _ in historique.series) <= 250
+    assert historique.contains(_ids(0, 600)).all()
+
+
+def test_rejeu_dans_la_meme_execution_enregistre_une_fois(tmp_path):
+    repertoire = str(tmp_path / 'historique')
+    _executer(repertoire, _ids(0, 100))
+    # Identifiants déjà connus et doublons du lot : seuls les nouveaux sont ajoutés
+    _executer(repertoire, _ids(50, 150) + _ids(100, 150))
+    assert len(TransactionIdHistory(repertoire)) == 150
+
+
+@pytest.mark.parametrize('sans_sauvegarde', [True, False])
+def test_interruption_avant_manifeste(tmp_path, monkeypatch, sans_sauvegarde):
+    repertoire = str(tmp_path / 'historique')
+    _executer(repertoire, _ids(0, 100))
+
+    historique = TransactionIdHistory(repertoire)
+    historique.stage(_ids(100, 200))
+    if not sans_sauvegarde:
+        # Séries écrites, échec au remplacement du manifeste
+        remplacer = os.replace
+
+        def remplacer_sauf_manifeste(source, cible):
+            if os.path.basename(cible) == MANIFESTE_HISTORIQUE:
+                raise OSError("interruption simulée")
+            remplacer(source, cible)
+
+        monkeypatch.setattr(id_store.os, 'replace', remplacer_sauf_manifeste)
+        with pytest.raises(OSError):
+            historique.save()
+        monkeypatch.setattr(id_store.os, 'replace', remplacer)
+
+    relu = TransactionIdHistory(repertoire)
+    assert len(relu) == 100
+    assert relu.contains(_ids(0, 100)).all()
+    assert not relu.contains(_ids(100, 200)).any()
+
+    # L'exécution relancée enregistre les identifiants normalement
+    _executer(repertoire, _ids(100, 200))
+    assert TransactionIdHistory(repertoire).contains(_ids(0, 200)).all()
+
+
+def test_collision_h1_departagee_par_h2(tmp_path):
+    historique = TransactionIdHistory(str(tmp_path / 'historique'))
+    h1 = np.array([5, 5, 5, 9], dtype=np.uint64)
+    h2 = np.array([1, 3, 7, 2], dtype=np.uint64)
+    historique.series = [('serie', h1, h2)]
+
+    masque = historique._contient(np.array([5, 5, 5, 9], dtype=np.uint64),
+                                  np.array([7, 4, 1, 3], dtype=np.uint64))
+    np.testing.assert_array_equal(masque, [True, False, True, False])
@@ -0,0 +1,166 @@
+"""
+TESTS - DÉTECTION DE STRUCTURING ET PLAN DE RÈGLES
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Le détecteur vectorisé (fichier complet, par morceaux, ou via
+              le plan de règles compilé) donne le même résultat que
+              l'ancienne boucle par (client, jour) : limite du total minimal,
+              dates manquantes, clients absents. Les codes de la colonne
+              Alertes suivent l'ordre d'application des règles.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import SRC
+from rule_plan import compile_rules
+from rules_engine import RulesEngine
+from structuring import StructuringDetector, StructuringState
+
+SEUIL, NB_MIN, TOTAL_MIN = 9500, 2, 15000
+
+# (Client_ID, Date, Montant, suspect attendu)
+CAS = [
+    # Total égal au minimum : suspect
+    ('CLT-001', '2024-01-15', 9000.0, True),
+    ('CLT-001', '2024-01-15', 6000.0, True),
+    # Total juste sous le minimum
+    ('CLT-002', '2024-01-15', 9000.0, False),
+    ('CLT-002', '2024-01-15', 5999.99, False),
+    # Jours différents (fenêtre d'un jour)
+    ('CLT-003', '2024-01-15', 9000.0, False),
+    ('CLT-003', '2024-01-16', 9000.0, False),
+    # Date manquante : ignorée, le reste du jour reste suspect
+    ('CLT-004', '2024-01-15', 9000.0, True),
+    ('CLT-004', None, 9000.0, False),
+    ('CLT-004', '2024-01-15', 9000.0, True),
+    # Client_ID manquant : ignoré
+    (None, '2024-01-15', 9000.0, False),
+    (None, '2024-01-15', 9000.0, False),
+    # Client absent du référentiel : détecté
+    ('CLT-INCONNU', '2024-01-15', 8000.0, True),
+    ('CLT-INCONNU', '2024-01-15', 8000.0, True),
+    # Montant au-dessus du seuil : hors fenêtre, le reste suffit
+    ('CLT-005', '2024-01-15', 9600.0, False),
+    ('CLT-005', '2024-01-15', 9000.0, True),
+    ('CLT-005', '2024-01-15', 7000.0, True),
+    # Un seul montant sous le seuil
+    ('CLT-006', '2024-01-15', 9400.0, False),
+    ('CLT-006', '2024-01-15', 9600.0, False),
+]
+
+
+@pytest.fixture
+def transactions():
+    df = pd.DataFrame(CAS, columns=['Client_ID', 'Date', 'Montant', 'Attendu'])
+    # Ordre des lignes sans rapport avec (client, jour)
+    return df.sample(frac=1, random_state=7).reset_index(drop=True)
+
+
+def structuring_reference(df, seuil=SEUIL, nb_min=NB_MIN, total_min=TOTAL_MIN):
+    """Ancienne règle : boucle sur les groupes (client, jour) du fichier."""
+    df = df.assign(Date_only=pd.to_datetime(df['Date']).dt.date)
+    suspects = np.zeros(len(df), dtype=bool)
+    for _, group in df.groupby(['Client_ID', 'Date_only']):
+        below = group[group['Montant'] < seuil]
+        if len(below) >= nb_min and below['Montant'].sum() >= total_min:
+            suspects[below.index] = True
+    return suspects
+
+
+def fenetres_reference(df, periode_jours, seuil=SEUIL, nb_min=NB_MIN, total_min=TOTAL_MIN):
+    """Fenêtres de N jours par force brute : chaque jour de fin possible de chaque client."""
+    jours = pd.to_datetime(df['Date'])
+    candidats = (df['Montant'] < seuil) & jours.notna() & df['Client_ID'].notna()
+    suspects = np.zeros(len(df), dtype=bool)
+    for client in df.loc[candidats, 'Client_ID'].unique():
+        lignes = candidats & (df['Client_ID'] == client)
+        for fin in jours[lignes].unique():
+            fenetre = lignes & (jours > fin - pd.Timedelta(days=periode_jours)) & (jours <= fin)
+            if fenetre.sum() >= nb_min and df.loc[fenetre, 'Montant'].sum() >= total_min:
+                suspects |= fenetre.to_numpy()
+    return suspects
+
+
+def _jours(df):
+    return pd.to_datetime(df['Date']).to_numpy(dtype='datetime64[D]').astype(np.int64)
+
+
+def test_reference_conforme_aux_cas(transactions):
+    np.testing.assert_array_equal(structuring_reference(transactions), transactions['Attendu'])
+
+
+def test_detecteur_identique_a_la_boucle(transactions):
+    detector = StructuringDetector(SEUIL, NB_MIN, periode_jours=1, seuil_total_min=TOTAL_MIN)
+    masque = detector.detect(pd.factorize(transactions['Client_ID'])[0], _jours(transactions),
+                             transactions['Montant'].to_numpy())
+    np.testing.assert_array_equal(masque, structuring_reference(transactions))
+
+
+@pytest.mark.parametrize('taille_morceau', [1, 4, 7])
+def test_etat_par_morceaux_identique_a_la_boucle(transactions, taille_morceau):
+    state = StructuringState(StructuringDetector(SEUIL, NB_MIN, periode_jours=1, seuil_total_min=TOTAL_MIN))
+    morceaux = [transactions.iloc[i:i + taille_morceau] for i in range(0, len(transactions), taille_morceau)]
+    for morceau in morceaux:
+        state.update(morceau['Client_ID'], _jours(morceau), morceau['Montant'].to_numpy())
+    state.finalize()
+    masque = np.concatenate([state.mask(morceau['Client_ID'], _jours(morceau), morceau['Montant'].to_numpy())
+                             for morceau in morceaux])
+    np.testing.assert_array_equal(masque, structuring_reference(transactions))
+
+
+@pytest.mark.parametrize('periode_jours', [2, 3])
+def test_fenetres_glissantes(transactions, periode_jours):
+    detector = StructuringDetector(SEUIL, NB_MIN, periode_jours=periode_jours, seuil_total_min=TOTAL_MIN)
+    masque = detector.detect(pd.factorize(transactions['Client_ID'])[0], _jours(transactions),
+                             transactions['Montant'].to_numpy())
+    np.testing.assert_array_equal(masque, fenetres_reference(transactions, periode_jours))
+    # Les deux jours de CLT-003 forment une fenêtre suspecte
+    assert masque[(transactions['Client_ID'] == 'CLT-003').to_numpy()].all()
+
+
+def test_plan_de_regles_identique_a_la_boucle(transactions):
+    engine = RulesEngine()
+    resultat = engine.apply_all_rules(transactions.drop(columns='Attendu'), verbose=False)
+    bit = engine.alert_bits['SUSPICION_STRUCTURING']
+    np.testing.assert_array_equal((resultat['Alertes_Flags'].to_numpy() & bit) != 0,
+                                  structuring_reference(transactions))
+
+
+@pytest.mark.parametrize('config', ['defaut', 'rules_config.json'])
+def test_alertes_dans_l_ordre_d_application(tmp_path, config):
+    if config == 'defaut':
+        engine = RulesEngine()
+    else:
+        engine = RulesEngine(os.path.join(SRC, 'config', config), index_dir=str(tmp_path))
+    ordre = [regle.code for regle in engine.plan.regles]
+    assert list(engine.alert_bits)[:len(ordre)] == ordre
+
+    clients = pd.DataFrame({'Client_ID': ['CLT-002'], 'Niveau_Risque': ['Élevé'], 'Est_PEP': ['Oui']})
+    transactions = pd.DataFrame({
+        'Client_ID': ['CLT-002'] * 3,
+        'Date': ['2024-01-15'] * 3,
+        'Montant': [200000.0, 9000.0, 9000.0],
+        'Pays_Bénéficiaire': ['IR'] * 3,
+        'Bénéficiaire': ['IR5566778899'] * 3,
+    })
+    resultat = engine.apply_all_rules(transactions, clients, verbose=False)
+    alertes = engine.decode_alertes(resultat['Alertes_Flags'])
+
+    liste_noire = 'LISTE_NOIRE_OFAC;' if 'LISTE_NOIRE_OFAC' in engine.alert_bits else ''
+    assert alertes[0] == ('SEUIL_REGLEMENTAIRE;CLIENT_RISQUE_ELEVE;CLIENT_PEP;PAYS_SANCTIONNE;'
+                          f'{liste_noire}MONTANT_EXCEPTIONNEL;')
+    assert alertes[1] == alertes[2] == ('CLIENT_RISQUE_ELEVE;CLIENT_PEP;PAYS_SANCTIONNE;'
+                                        f'{liste_noire}SUSPICION_STRUCTURING;')
+    # Chaque code décodé correspond à un bit levé, et réciproquement
+    for flags, libelle in zip(resultat['Alertes_Flags'], alertes):
+        assert [code for code, bit in engine.alert_bits.items() if flags & bit] == libelle.split(';')[:-1]
+
+
+def test_ordre_independant_des_coefficients():
+    config = RulesEngine()._get_default_config()
+    # Coefficients listés dans l'ordre inverse : l'ordre des bits ne change pas
+    config['coefficients_risque'] = dict(reversed(list(config['coefficients_risque'].items())))
+    assert list(compile_rules(config).alert_bits) == list(RulesEngine().alert_bits)
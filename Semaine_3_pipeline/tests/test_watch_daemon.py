@@ -0,0 +1,69 @@
+"""
+TESTS - MODE DÉMON
+BNP Paribas - Projet Automatisation RPA/IA
+Description : Un fichier qui ne peut pas être archivé ou dont le traitement
+              échoue de façon inattendue n'arrête pas le démon ; statut.json
+              est écrit et le fichier n'est pas retraité en boucle.
+"""
+
+import json
+import os
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC)
+
+from watch_daemon import FICHIER_STATUT, REPERTOIRE_TRAITES, WatchFolderDaemon  # noqa: E402
+
+
+class PipelineReussi:
+    """Pipeline minimal fourni par la fabrique du démon : exécution toujours réussie."""
+
+    def __init__(self, chemin, sortie):
+        self.output_files = {}
+
+    def use_resources(self, ressources):
+        pass
+
+    def run_pipeline(self):
+        return True
+
+
+def _demon(tmp_path):
+    entree = tmp_path / 'input'
+    os.makedirs(entree)
+    demon = WatchFolderDaemon(str(entree), PipelineReussi, output_dir=str(tmp_path / 'output'), intervalle=0)
+    demon.warm = lambda: None
+    return demon, entree
+
+
+def _statut(tmp_path, nom):
+    with open(tmp_path / 'output' / nom / FICHIER_STATUT, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_archivage_impossible(tmp_path):
+    demon, entree = _demon(tmp_path)
+    (entree / 'lot.csv').write_text('x\n', encoding='utf-8')
+    os.rmdir(entree / REPERTOIRE_TRAITES)
+
+    assert demon.process('lot.csv')
+    statut = _statut(tmp_path, 'lot')
+    assert statut['code_retour'] == 0
+    assert statut['fichier_archive'] is None
+    assert statut['erreur_archivage']
+    # Fichier resté en place : non retraité tant qu'il n'est pas modifié
+    assert demon.poll() == [] and demon.poll() == []
+
+
+def test_erreur_sur_un_fichier_n_arrete_pas_le_demon(tmp_path):
+    demon, entree = _demon(tmp_path)
+    for nom in ('a.csv', 'b.csv'):
+        (entree / nom).write_text('x\n', encoding='utf-8')
+    # Répertoire de sortie de a.csv impossible à créer
+    (tmp_path / 'output' / 'a').write_text('', encoding='utf-8')
+
+    assert demon.run(max_fichiers=2)
+    assert demon.etat['fichiers_en_echec'] == 1
+    assert demon.etat['fichiers_traites'] == 1
+    assert _statut(tmp_path, 'b')['fichier_archive'] is not None
@@ -668,32 +668,50 @@ st.markdown("""
 # ============================================================================
 # CHARGEMENT DES DONNÉES
 # ============================================================================
+def _corriger_colonnes(df):
+    """Corrige les noms de colonnes mal décodés (fichiers CSV)."""
+    df.columns = df.columns.str.replace('Ã©', 'é', regex=False)
+    df.columns = df.columns.str.replace('Ã¨', 'è', regex=False)
+    df.columns = df.columns.str.replace('Ã', 'à', regex=False)
+    df.columns = df.columns.str.replace('Â', '', regex=False)
+    return df
+
+def _lire_sortie(base_path, nom, fichiers_manifeste):
+    """
+    Lit un fichier de sortie du pipeline : Parquet (typé) s'il figure au
+    manifeste et que pyarrow est disponible, sinon CSV.
+    """
+    parquet_path = os.path.join(base_path, f"{nom}.parquet")
+    if f"{nom}.parquet" in fichiers_manifeste and os.path.exists(parquet_path):
+        try:
+            return pd.read_parquet(parquet_path)
+        except ImportError:
+            pass
+    csv_path = os.path.join(base_path, f"{nom}.csv")
+    if not os.path.exists(csv_path):
+        return None
+    return _corriger_colonnes(pd.read_csv(csv_path, sep=";", encoding='utf-8'))
+
 @st.cache_data
 def load_data():
-    """Charge les données des fichiers CSV générés par le pipeline."""
+    """Charge les données générées par le pipeline (Parquet ou CSV selon le manifeste)."""
     try:
         base_path = "Semaine_3_pipeline/output/"
         
-        # 1. Données d'alertes
-        alertes_path = os.path.join(base_path, "alertes_compliance.csv")
-        alertes_df = pd.read_csv(alertes_path, sep=";", encoding='utf-8')
+        # 0. Manifeste des fichiers générés (absent pour les anciennes sorties CSV)
+        try:
+            with open(os.path.join(base_path, "manifest.json"), 'r', encoding='utf-8') as f:
+                fichiers_manifeste = {entree['fichier'] for entree in json.load(f).get('fichiers', [])}
+        except (OSError, ValueError):
+            fichiers_manifeste = set()
         
-        # Correction des noms de colonnes
-        alertes_df.columns = alertes_df.columns.str.replace('Ã©', 'é', regex=False)
-        alertes_df.columns = alertes_df.columns.str.replace('Ã¨', 'è', regex=False)
-        alertes_df.columns = alertes_df.columns.str.replace('Ã', 'à', regex=False)
-        alertes_df.columns = alertes_df.columns.str.replace('Â', '', regex=False)
+        # 1. Données d'alertes
+        alertes_df = _lire_sortie(base_path, "alertes_compliance", fichiers_manifeste)
+        if alertes_df is None:
+            raise FileNotFoundError("alertes_compliance introuvable")
         
         # 2. Données enrichies
-        transactions_path = os.path.join(base_path, "transactions_enrichies.csv")
-        if os.path.exists(transactions_path):
-            transactions_df = pd.read_csv(transactions_path, sep=";", encoding='utf-8')
-            transactions_df.columns = transactions_df.columns.str.replace('Ã©', 'é', regex=False)
-            transactions_df.columns = transactions_df.columns.str.replace('Ã¨', 'è', regex=False)
-            transactions_df.columns = transactions_df.columns.str.replace('Ã', 'à', regex=False)
-            transactions_df.columns = transactions_df.columns.str.replace('Â', '', regex=False)
-        else:
-            transactions_df = None
+        transactions_df = _lire_sortie(base_path, "transactions_enrichies", fichiers_manifeste)
         
         # 3. Rapport synthétique
         rapport_path = os.path.join(base_path, "rapport_detaille.csv")
@@ -708,6 +726,34 @@ def load_data():
         st.error(f"❌ Erreur lors du chargement : {str(e)}")
         return None, None, None
 
+@st.cache_data
+def load_codes_alertes():
+    """Charge la correspondance code d'alerte -> bit depuis les statistiques du pipeline."""
+    stats_path = os.path.join("Semaine_3_pipeline/output/", "statistiques_pipeline.json")
+    try:
+        with open(stats_path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('codes_alertes', {})
+    except (OSError, ValueError):
+        return {}
+
+@st.cache_data
+def load_performance():
+    """Charge la section performance (mesures par étape) des statistiques du pipeline."""
+    stats_path = os.path.join("Semaine_3_pipeline/output/", "statistiques_pipeline.json")
+    try:
+        with open(stats_path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('performance') or {}
+    except (OSError, ValueError):
+        return {}
+
+def format_duree(secondes, unite='s'):
+    """Durée mesurée lisible ('n/d' si le pipeline ne l'a pas relevée)."""
+    if secondes is None:
+        return "n/d"
+    if unite == 'ms':
+        return f"{secondes * 1000:,.0f}ms"
+    return f"{secondes:.3f}s"
+
 # ============================================================================
 # CONFIGURATION PLOTLY - LIGHT THEME
 # ============================================================================
@@ -737,6 +783,16 @@ def get_plotly_theme():
         }
     }
 
+# ============================================================================
+# CHARGEMENT DES DONNÉES
+# ============================================================================
+# Avant la sidebar : la métrique de latence utilise la durée de la dernière exécution
+alertes_df, transactions_df, rapport_df = load_data()
+codes_alertes = load_codes_alertes()
+performance = load_performance()
+# Durée mesurée de la dernière exécution (None pour les sorties antérieures à l'instrumentation)
+temps_pipeline_s = (performance.get('total') or {}).get('duree_s')
+
 # ============================================================================
 # SIDEBAR
 # ============================================================================
@@ -781,13 +837,11 @@ with st.sidebar:
     with col_s1:
         st.metric("Uptime", "99.9%", delta="0.1%", delta_color="normal")
     with col_s2:
-        st.metric("Latence", "105ms", delta="-99.9%", delta_color="normal")
+        st.metric("Latence", format_duree(temps_pipeline_s, 'ms'), delta="-99.9%", delta_color="normal")
 
 # ============================================================================
-# CHARGEMENT DES DONNÉES
+# CONTRÔLE DES DONNÉES
 # ============================================================================
-alertes_df, transactions_df, rapport_df = load_data()
-
 if alertes_df is None:
     st.error("⚠️ Impossible de charger les données. Vérifiez la configuration.")
     st.stop()
@@ -843,7 +897,7 @@ with tab1:
     with col4:
         st.metric(
             label="⚡ Temps de Traitement",
-            value="0.105s",
+            value=format_duree(temps_pipeline_s),
             delta="-99.99% vs manuel",
             delta_color="normal"
         )
@@ -993,7 +1047,7 @@ with tab1:
     st.markdown("### 🚨 Alertes Critiques — Action Immédiate Requise")
     
     if 'Niveau_Alerte' in alertes_df.columns:
-        alertes_critiques = alertes_df[alertes_df['Niveau_Alerte'] == 'Critique'].copy()
+        alertes_critiques = alertes_df[alertes_df['Niveau_Alerte'] == 'Critique']
         
         if not alertes_critiques.empty:
             # Métriques des alertes critiques
@@ -1088,7 +1142,14 @@ with tab2:
                 filtre_montant = 0
         
         with col_f3:
-            if 'Alertes' in alertes_df.columns:
+            if 'Alertes_Flags' in alertes_df.columns and codes_alertes:
+                # Types présents calculés par opérations bit à bit
+                flags = alertes_df['Alertes_Flags'].to_numpy()
+                types_liste = ['Tous'] + sorted(
+                    code for code, bit in codes_alertes.items() if np.any(flags & bit)
+                )
+                filtre_type = st.selectbox("🏷️ Type d'Alerte", types_liste)
+            elif 'Alertes' in alertes_df.columns:
                 tous_types = set()
                 for alertes in alertes_df['Alertes'].dropna():
                     if isinstance(alertes, str):
@@ -1113,20 +1174,24 @@ with tab2:
             else:
                 filtre_score = 0
     
-    # Application des filtres
-    df_filtre = alertes_df.copy()
+    # Application des filtres : un seul masque combiné, une seule sélection (pas de copie intermédiaire)
+    masque = np.ones(len(alertes_df), dtype=bool)
     
-    if filtre_niveau != 'Tous' and 'Niveau_Alerte' in df_filtre.columns:
-        df_filtre = df_filtre[df_filtre['Niveau_Alerte'] == filtre_niveau]
+    if filtre_niveau != 'Tous' and 'Niveau_Alerte' in alertes_df.columns:
+        masque &= (alertes_df['Niveau_Alerte'] == filtre_niveau).to_numpy()
     
-    if 'Montant' in df_filtre.columns:
-        df_filtre = df_filtre[df_filtre['Montant'] >= filtre_montant]
+    if 'Montant' in alertes_df.columns:
+        masque &= (alertes_df['Montant'] >= filtre_montant).to_numpy()
     
-    if filtre_type != 'Tous' and 'Alertes' in df_filtre.columns:
-        df_filtre = df_filtre[df_filtre['Alertes'].str.contains(filtre_type, na=False)]
+    if filtre_type != 'Tous' and 'Alertes_Flags' in alertes_df.columns and filtre_type in codes_alertes:
+        masque &= ((alertes_df['Alertes_Flags'] & codes_alertes[filtre_type]) != 0).to_numpy()
+    elif filtre_type != 'Tous' and 'Alertes' in alertes_df.columns:
+        masque &= alertes_df['Alertes'].str.contains(filtre_type, na=False).to_numpy()
     
-    if 'Score_Risque' in df_filtre.columns:
-        df_filtre = df_filtre[df_filtre['Score_Risque'] >= filtre_score]
+    if 'Score_Risque' in alertes_df.columns:
+        masque &= (alertes_df['Score_Risque'] >= filtre_score).to_numpy()
+    
+    df_filtre = alertes_df[masque]
     
     # Résultats
     st.markdown(f"### 📋 Résultats : {len(df_filtre):,} alertes correspondantes")
@@ -1232,7 +1297,7 @@ with tab3:
         """, unsafe_allow_html=True)
     
     with col_comp2:
-        st.markdown("""
+        st.markdown(f"""
         <div class='premium-card' style='background: linear-gradient(135deg, var(--accent-success-light) 0%, rgba(255, 255, 255, 0) 100%); border-left: 4px solid var(--accent-success);'>
             <h3 style='color: var(--accent-success); margin-bottom: 1.25rem; font-size: 1.125rem; display: flex; align-items: center; gap: 0.5rem;'>
                 <span style='font-size: 1.5rem;'>✅</span> APRÈS — Solution Automatisée
@@ -1240,7 +1305,7 @@ with tab3:
             <div style='display: grid; gap: 1.25rem;'>
                 <div>
                     <div style='color: var(--text-muted); font-size: 0.75rem; font-weight: 700; text-transform: uppercase; margin-bottom: 0.375rem;'>Temps de traitement</div>
-                    <div style='font-size: 2rem; font-weight: 700; color: var(--accent-success); font-family: "Sora", sans-serif;'>0.105 seconde</div>
+                    <div style='font-size: 2rem; font-weight: 700; color: var(--accent-success); font-family: "Sora", sans-serif;'>{format_duree(temps_pipeline_s)}</div>
                 </div>
                 <div>
                     <div style='color: var(--text-muted); font-size: 0.75rem; font-weight: 700; text-transform: uppercase; margin-bottom: 0.375rem;'>Taux d'erreur</div>
@@ -1321,10 +1386,20 @@ with tab3:
     
     st.markdown("---")
     
+    # Mesures par étape de la dernière exécution (section performance du pipeline)
+    st.markdown("### 🧪 Mesures par Étape — Dernière Exécution")
+    
+    if performance.get('etapes'):
+        st.dataframe(pd.DataFrame(performance['etapes']), use_container_width=True, hide_index=True)
+    else:
+        st.info("Aucune mesure par étape : relancez le pipeline pour générer la section performance.")
+    
+    st.markdown("---")
+    
     # Métriques de performance
     st.markdown("### ⏱️ Gains de Productivité")
     
-    gain_temps = (1 - (0.105/60) / 180) * 100
+    gain_temps = (1 - ((temps_pipeline_s or 0) / 60) / 180) * 100
     
     col_perf1, col_perf2, col_perf3, col_perf4 = st.columns(4)
     